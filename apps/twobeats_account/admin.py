@@ -3,6 +3,8 @@ from .models import (
     User,
     MusicHistory,
     VideoHistory,
+    MusicPlayCount,
+    VideoPlayCount,
     MusicPlaylist,
     VideoPlaylist,
     PlaylistTrack,
@@ -46,13 +48,25 @@ class PlaylistClipAdmin(admin.ModelAdmin):
 
 @admin.register(MusicHistory)
 class MusicHistoryAdmin(admin.ModelAdmin):
-    list_display = ['user', 'music', 'played_at']
+    list_display = ['user', 'music', 'play_count', 'played_at']
     list_filter = ['played_at']
     search_fields = ['user__username', 'music__music_title']
 
 
 @admin.register(VideoHistory)
 class VideoHistoryAdmin(admin.ModelAdmin):
-    list_display = ['user', 'video', 'played_at']
+    list_display = ['user', 'video', 'play_count', 'played_at']
     list_filter = ['played_at']
     search_fields = ['user__username', 'video__video_title']
+
+
+@admin.register(MusicPlayCount)
+class MusicPlayCountAdmin(admin.ModelAdmin):
+    list_display = ['user', 'music', 'play_count', 'last_played_month']
+    search_fields = ['user__username', 'music__music_title']
+
+
+@admin.register(VideoPlayCount)
+class VideoPlayCountAdmin(admin.ModelAdmin):
+    list_display = ['user', 'video', 'play_count', 'last_played_month']
+    search_fields = ['user__username', 'video__video_title']
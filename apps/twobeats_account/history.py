@@ -0,0 +1,90 @@
+"""
+재생 기록(히스토리) 저장/조회
+
+재생 기록은 (유저, 곡/영상, 재생월)당 1행이며, 재생할 때마다
+INSERT ... ON CONFLICT (유저, 곡/영상, 재생월) DO UPDATE 한 문장으로
+재생 시각을 갱신하고 그 달의 play_count 를 1 올린다.
+누적 재생횟수는 (유저, 곡/영상)당 1행인 music_play_count/video_play_count 에
+같은 방식으로 올린다 (많이 들은 곡 순위, 추천용, 히스토리 보관 기간과 무관).
+(PostgreSQL, SQLite 3.24+ 공통 문법)
+
+PostgreSQL 에서는 재생월(played_month) 기준 월별 파티션 테이블이며
+(0009_partition_history 마이그레이션, manage_history_partitions 명령 참고)
+조회는 최근 파티션부터 (재생월, 재생시각, id) 커서로 넘겨 가며 읽는다 (apps/twobeats_upload/pagination.py).
+"""
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from apps.twobeats_upload.pagination import CursorPaginator
+
+from .models import MusicHistory, MusicPlayCount, VideoHistory, VideoPlayCount, month_of
+
+# 종류 -> (히스토리 모델, 누적 재생횟수 모델, 대상 FK 필드)
+HISTORY_TARGETS = {
+    'music': (MusicHistory, MusicPlayCount, 'music'),
+    'video': (VideoHistory, VideoPlayCount, 'video'),
+}
+
+HISTORY_PAGE_SIZE = 30
+
+
+def _upsert_play(cursor, model, conflict, values):
+    """
+    INSERT ... ON CONFLICT (conflict) DO UPDATE 한 문장
+    행이 없으면 play_count 1 로 추가, 있으면 play_count + 1 하고 나머지 값은 새 값으로
+    :param values: {필드 이름: 값} (play_count 제외)
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    fields = [model._meta.get_field(name) for name in values]
+    columns = [qn(field.column) for field in fields]
+    conflict_columns = [qn(model._meta.get_field(name).column) for name in conflict]
+    count_col = qn(model._meta.get_field('play_count').column)
+    updates = [f'{column} = EXCLUDED.{column}' for column in columns if column not in conflict_columns]
+
+    cursor.execute(
+        f'INSERT INTO {table} ({", ".join(columns)}, {count_col}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))}, 1) '
+        f'ON CONFLICT ({", ".join(conflict_columns)}) DO UPDATE SET '
+        f'{", ".join(updates + [f"{count_col} = {table}.{count_col} + 1"])}',
+        [field.get_db_prep_value(value, connection) for field, value in zip(fields, values.values())],
+    )
+
+
+def record_play(user, kind, pk):
+    """재생 기록 저장 (그 달의 기록과 누적 재생횟수를 한 트랜잭션에서 증가)"""
+    model, count_model, fk_name = HISTORY_TARGETS[kind]
+    now = timezone.now()
+    month = month_of(now)
+    item_id = f'{fk_name}_id'
+    with transaction.atomic(), connection.cursor() as cursor:
+        _upsert_play(
+            cursor, model, ['user_id', item_id, 'played_month'],
+            {'user_id': user.pk, item_id: int(pk), 'played_at': now, 'played_month': month},
+        )
+        _upsert_play(
+            cursor, count_model, ['user_id', item_id],
+            {'user_id': user.pk, item_id: int(pk), 'last_played_month': month},
+        )
+
+
+def recent_history(user, kind, cursor=None, size=HISTORY_PAGE_SIZE):
+    """
+    최근 재생 기록 한 페이지
+    재생월이 파티션 키이므로 재생월 내림차순으로 읽으면 최근 파티션부터 스캔하고 LIMIT 에서 멈춘다.
+    커서 다음 페이지는 재생월 <= 커서 재생월 조건이 붙어 이전 달 파티션만 읽는다 (파티션 프루닝, pagination.py)
+    곡(영상)마다 마지막으로 재생한 달의 행만 보여 주고, 재생횟수는 누적 값(total_plays)
+    :return: (기록 리스트, 다음 페이지 커서 또는 None)
+    """
+    model, count_model, fk_name = HISTORY_TARGETS[kind]
+    plays = count_model.objects.filter(user=OuterRef('user'), **{fk_name: OuterRef(fk_name)})
+    history = (
+        model.objects.filter(user=user)
+        .filter(Exists(plays.filter(last_played_month=OuterRef('played_month'))))
+        .annotate(total_plays=Subquery(plays.values('play_count')[:1]))
+        .select_related(fk_name)
+        .order_by('-played_month', '-played_at', '-id')
+    )
+    page = CursorPaginator(history, size).page(cursor)
+    return page.object_list, page.next_cursor
@@ -0,0 +1,148 @@
+import csv
+import os
+import re
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.twobeats_account.models import MusicHistory, VideoHistory
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = '재생 기록 월별 파티션 관리 (미래 파티션 생성, 보관 기간이 지난 파티션 보관/삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3, help='미리 만들어 둘 미래 파티션 수')
+        parser.add_argument(
+            '--retention-months', type=int, default=None,
+            help='보관 기간(개월, 이번 달 포함). 기본: settings.HISTORY_RETENTION_MONTHS'
+        )
+        parser.add_argument('--archive-dir', help='삭제 전 파티션을 CSV 로 저장할 디렉터리')
+        parser.add_argument('--dry-run', action='store_true', help='실행할 작업만 출력')
+
+    def handle(self, *args, **options):
+        retention = options['retention_months'] or settings.HISTORY_RETENTION_MONTHS
+        this_month = timezone.localdate().replace(day=1)
+        # 이 달보다 오래된 파티션은 보관 기간이 지난 것
+        cutoff = add_months(this_month, -(retention - 1))
+
+        self.dry_run = options['dry_run']
+        self.archive_dir = options['archive_dir']
+        if self.archive_dir and not self.dry_run:
+            os.makedirs(self.archive_dir, exist_ok=True)
+
+        for model in (MusicHistory, VideoHistory):
+            if connection.vendor == 'postgresql':
+                for offset in range(options['months_ahead'] + 1):
+                    self.ensure_partition(model, add_months(this_month, offset))
+                self.drop_expired_partitions(model, cutoff)
+            else:
+                # 파티션이 없는 DB(개발용 SQLite 등)는 오래된 행만 정리
+                self.delete_expired_rows(model, cutoff)
+
+        self.stdout.write(self.style.SUCCESS(f'히스토리 파티션 정리 완료! (보관 기준: {cutoff} 이후)'))
+
+    def partitions(self, table):
+        """{파티션 월: 파티션 테이블명}"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                'WHERE i.inhparent = %s::regclass',
+                [table],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        pattern = re.compile(rf'^{table}_p(\d{{4}})(\d{{2}})$')
+        found = {}
+        for name in names:
+            match = pattern.match(name)
+            if match:
+                found[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return found
+
+    def ensure_partition(self, model, month):
+        table = model._meta.db_table
+        if month in self.partitions(table):
+            return
+
+        name = f'{table}_p{month:%Y%m}'
+        month_col = model._meta.get_field('played_month').column
+        self.stdout.write(f'[생성] {name}')
+        if self.dry_run:
+            return
+
+        # 기본 파티션에 이미 들어간 같은 달 기록을 옮긴 뒤 파티션으로 붙인다
+        # (기본 파티션에 해당 월 행이 남아 있으면 ATTACH 가 실패함)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)')
+            cursor.execute(
+                f'WITH moved AS ('
+                f'DELETE FROM {table}_default WHERE {month_col} >= %s AND {month_col} < %s RETURNING *'
+                f') INSERT INTO {name} SELECT * FROM moved',
+                [month, add_months(month, 1)],
+            )
+            cursor.execute(
+                f'ALTER TABLE {table} ATTACH PARTITION {name} '
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+
+    def drop_expired_partitions(self, model, cutoff):
+        table = model._meta.db_table
+        for month, name in sorted(self.partitions(table).items()):
+            if month >= cutoff:
+                continue
+            self.stdout.write(f'[삭제] {name}')
+            if self.dry_run:
+                continue
+            if self.archive_dir:
+                self.archive(name, f'SELECT * FROM {name}', [])
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {name}')
+                cursor.execute(f'DROP TABLE {name}')
+
+        # 파티션이 없던 달에 기본 파티션으로 들어간 기록도 보관 기간이 지나면 삭제
+        month_col = model._meta.get_field('played_month').column
+        default = f'{table}_default'
+        expired = f'FROM {default} WHERE {month_col} < %s'
+        self.stdout.write(f'[삭제] {default}: {cutoff} 이전 기록')
+        if self.dry_run:
+            return
+        if self.archive_dir:
+            self.archive(f'{default}_before_{cutoff:%Y%m}', f'SELECT * {expired}', [cutoff])
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE {expired}', [cutoff])
+            self.stdout.write(f'       {cursor.rowcount}건 삭제')
+
+    def delete_expired_rows(self, model, cutoff):
+        expired = model.objects.filter(played_month__lt=cutoff)
+        self.stdout.write(f'[삭제] {model._meta.db_table}: {cutoff} 이전 기록')
+        if self.dry_run:
+            return
+        if self.archive_dir:
+            sql, params = expired.values_list(*[f.attname for f in model._meta.concrete_fields]).query.sql_with_params()
+            self.archive(f'{model._meta.db_table}_before_{cutoff:%Y%m}', sql, params)
+        deleted, _ = expired.delete()
+        self.stdout.write(f'       {deleted}건 삭제')
+
+    def archive(self, name, sql, params):
+        path = os.path.join(self.archive_dir, f'{name}.csv')
+        # chunked_cursor: PostgreSQL 에서는 서버측 커서로 나눠 읽어 메모리를 아낀다
+        with transaction.atomic(), connection.chunked_cursor() as cursor, \
+                open(path, 'w', newline='', encoding='utf-8') as archive_file:
+            cursor.execute(sql, params)
+            # 서버측 커서는 첫 fetch 후에야 컬럼 정보(description)가 채워짐
+            rows = cursor.fetchmany(5000)
+            writer = csv.writer(archive_file)
+            writer.writerow([column[0] for column in cursor.description])
+            while rows:
+                writer.writerows(rows)
+                rows = cursor.fetchmany(5000)
+        self.stdout.write(f'       보관: {path}')
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_history(apps, schema_editor):
+    # unique_together 추가 전에 (유저, 곡) 중복 행을 최신 1행으로 합치고 행 수를 재생횟수로 기록
+    for model_name, item_field in (('MusicHistory', 'music'), ('VideoHistory', 'video')):
+        model = apps.get_model('twobeats_account', model_name)
+        duplicates = (
+            model.objects.values('user', item_field)
+            .annotate(rows=Count('id'))
+            .filter(rows__gt=1)
+        )
+        for dup in duplicates:
+            rows = model.objects.filter(user=dup['user'], **{item_field: dup[item_field]}).order_by('-played_at', '-id')
+            keep = rows.first()
+            rows.exclude(pk=keep.pk).delete()
+            model.objects.filter(pk=keep.pk).update(play_count=dup['rows'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_account', '0007_rename_history_tables'),
+        ('twobeats_upload', '0004_counter_reconcile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='musichistory',
+            name='play_count',
+            field=models.IntegerField(db_column='historylist_play_count', default=1, verbose_name='재생횟수'),
+        ),
+        migrations.AddField(
+            model_name='videohistory',
+            name='play_count',
+            field=models.IntegerField(db_column='historyvideo_play_count', default=1, verbose_name='재생횟수'),
+        ),
+        migrations.RunPython(merge_duplicate_history, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='musichistory',
+            unique_together={('user', 'music')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='videohistory',
+            unique_together={('user', 'video')},
+        ),
+        migrations.AddIndex(
+            model_name='musichistory',
+            index=models.Index(fields=['user', '-play_count'], name='music_history_most_played'),
+        ),
+        migrations.AddIndex(
+            model_name='videohistory',
+            index=models.Index(fields=['user', '-play_count'], name='video_history_most_played'),
+        ),
+    ]
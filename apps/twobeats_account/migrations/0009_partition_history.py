@@ -0,0 +1,138 @@
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+# (테이블, 컬럼 접두사, 대상 FK 컬럼, 대상 테이블, 대상 PK 컬럼)
+HISTORY_TABLES = [
+    ('music_history', 'historylist', 'historylist_music_id', 'music', 'id'),
+    ('video_history', 'historyvideo', 'historyvideo_video_id', 'video', 'id'),
+]
+
+# 마이그레이션 시점에 미리 만들어 둘 미래 파티션 수 (이후는 manage_history_partitions 가 관리)
+MONTHS_AHEAD = 3
+
+
+def fill_played_month(apps, schema_editor):
+    for model_name in ('MusicHistory', 'VideoHistory'):
+        model = apps.get_model('twobeats_account', model_name)
+        model.objects.update(played_month=TruncMonth('played_at', output_field=models.DateField()))
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_history_tables(apps, schema_editor):
+    """기존 히스토리 테이블을 월별 RANGE 파티션 테이블로 교체 (PostgreSQL 전용)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        for table, prefix, item_col, item_table, item_pk in HISTORY_TABLES:
+            user_col = f'{prefix}_user_id'
+            month_col = f'{prefix}_played_month'
+            played_col = f'{prefix}_played_at'
+            count_col = f'{prefix}_play_count'
+            old_table = f'{table}_unpartitioned'
+            seq = f'{table}_partitioned_id_seq'
+
+            execute(f'ALTER TABLE {table} RENAME TO {old_table}')
+            execute(
+                f'CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS) '
+                f'PARTITION BY RANGE ({month_col})'
+            )
+            execute(f'CREATE SEQUENCE {seq} OWNED BY {table}.id')
+            execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{seq}')")
+
+            # 기존 데이터가 있는 달 ~ 이번 달 + MONTHS_AHEAD 까지 파티션 생성
+            cursor.execute(f'SELECT MIN({month_col}) FROM {old_table}')
+            first = cursor.fetchone()[0]
+            this_month = date.today().replace(day=1)
+            month = min(first, this_month) if first else this_month
+            while month <= _add_months(this_month, MONTHS_AHEAD):
+                execute(
+                    f'CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} '
+                    f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+                )
+                month = _add_months(month, 1)
+            # 파티션이 아직 없는 달의 기록을 받아 두는 기본 파티션
+            execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+            execute(f'INSERT INTO {table} SELECT * FROM {old_table}')
+            execute(f"SELECT setval('{seq}', COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)")
+            execute(f'DROP TABLE {old_table}')
+
+            # 제약/인덱스는 파티션 키를 포함해 부모 테이블에 생성 (모든 파티션에 전파)
+            execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, {month_col})')
+            execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {table}_user_item_month_uniq '
+                f'UNIQUE ({user_col}, {item_col}, {month_col})'
+            )
+            execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {table}_user_fk '
+                f'FOREIGN KEY ({user_col}) REFERENCES "user" (user_uid) DEFERRABLE INITIALLY DEFERRED'
+            )
+            execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {table}_item_fk '
+                f'FOREIGN KEY ({item_col}) REFERENCES {item_table} ({item_pk}) DEFERRABLE INITIALLY DEFERRED'
+            )
+            execute(f'CREATE INDEX {table}_user_id ON {table} ({user_col})')
+            execute(f'CREATE INDEX {table}_item_id ON {table} ({item_col})')
+            execute(f'CREATE INDEX {table}_most_played ON {table} ({user_col}, {count_col} DESC)')
+            execute(
+                f'CREATE INDEX {table}_recent ON {table} '
+                f'({user_col}, {month_col} DESC, {played_col} DESC, id DESC)'
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_account', '0008_history_play_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='musichistory',
+            name='played_month',
+            field=models.DateField(db_column='historylist_played_month', null=True, verbose_name='재생월'),
+        ),
+        migrations.AddField(
+            model_name='videohistory',
+            name='played_month',
+            field=models.DateField(db_column='historyvideo_played_month', null=True, verbose_name='재생월'),
+        ),
+        migrations.RunPython(fill_played_month, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='musichistory',
+            name='played_month',
+            field=models.DateField(db_column='historylist_played_month', verbose_name='재생월'),
+        ),
+        migrations.AlterField(
+            model_name='videohistory',
+            name='played_month',
+            field=models.DateField(db_column='historyvideo_played_month', verbose_name='재생월'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='musichistory',
+            unique_together={('user', 'music', 'played_month')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='videohistory',
+            unique_together={('user', 'video', 'played_month')},
+        ),
+        migrations.AddIndex(
+            model_name='musichistory',
+            index=models.Index(fields=['user', '-played_month', '-played_at', '-id'], name='music_history_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='videohistory',
+            index=models.Index(fields=['user', '-played_month', '-played_at', '-id'], name='video_history_recent'),
+        ),
+        # 파티션 교체 시 위 제약/인덱스를 같은 이름으로 다시 만들기 때문에 마지막에 실행
+        migrations.RunPython(partition_history_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, Sum
+
+
+def fill_play_counts(apps, schema_editor):
+    # 월별 기록을 (유저, 곡/영상)별로 합쳐 누적 재생횟수의 시작값으로 저장
+    for history_name, count_name, item_field in (
+        ('MusicHistory', 'MusicPlayCount', 'music'),
+        ('VideoHistory', 'VideoPlayCount', 'video'),
+    ):
+        history = apps.get_model('twobeats_account', history_name)
+        count_model = apps.get_model('twobeats_account', count_name)
+        totals = (
+            history.objects.order_by()
+            .values('user', item_field)
+            .annotate(total=Sum('play_count'), last_month=Max('played_month'))
+        )
+        count_model.objects.bulk_create(
+            [
+                count_model(
+                    user_id=row['user'],
+                    play_count=row['total'],
+                    last_played_month=row['last_month'],
+                    **{f'{item_field}_id': row[item_field]},
+                )
+                for row in totals.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_account', '0009_partition_history'),
+        ('twobeats_upload', '0012_counter_dirty_skip_synced'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusicPlayCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('play_count', models.IntegerField(db_column='musicplays_play_count', default=0, verbose_name='재생횟수')),
+                ('last_played_month', models.DateField(db_column='musicplays_last_played_month', verbose_name='마지막 재생월')),
+            ],
+            options={
+                'verbose_name': '음악 누적 재생횟수',
+                'verbose_name_plural': '음악 누적 재생횟수',
+                'db_table': 'music_play_count',
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoPlayCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('play_count', models.IntegerField(db_column='videoplays_play_count', default=0, verbose_name='재생횟수')),
+                ('last_played_month', models.DateField(db_column='videoplays_last_played_month', verbose_name='마지막 재생월')),
+            ],
+            options={
+                'verbose_name': '영상 누적 재생횟수',
+                'verbose_name_plural': '영상 누적 재생횟수',
+                'db_table': 'video_play_count',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='musichistory',
+            name='music_history_most_played',
+        ),
+        migrations.RemoveIndex(
+            model_name='videohistory',
+            name='video_history_most_played',
+        ),
+        migrations.AddField(
+            model_name='musicplaycount',
+            name='music',
+            field=models.ForeignKey(db_column='musicplays_music_id', on_delete=django.db.models.deletion.CASCADE, to='twobeats_upload.music', verbose_name='음악'),
+        ),
+        migrations.AddField(
+            model_name='musicplaycount',
+            name='user',
+            field=models.ForeignKey(db_column='musicplays_user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='사용자'),
+        ),
+        migrations.AddField(
+            model_name='videoplaycount',
+            name='user',
+            field=models.ForeignKey(db_column='videoplays_user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='사용자'),
+        ),
+        migrations.AddField(
+            model_name='videoplaycount',
+            name='video',
+            field=models.ForeignKey(db_column='videoplays_video_id', on_delete=django.db.models.deletion.CASCADE, to='twobeats_upload.video', verbose_name='영상'),
+        ),
+        migrations.AddIndex(
+            model_name='musicplaycount',
+            index=models.Index(fields=['user', '-play_count'], name='music_plays_most_played'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='musicplaycount',
+            unique_together={('user', 'music')},
+        ),
+        migrations.AddIndex(
+            model_name='videoplaycount',
+            index=models.Index(fields=['user', '-play_count'], name='video_plays_most_played'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='videoplaycount',
+            unique_together={('user', 'video')},
+        ),
+        migrations.RunPython(fill_play_counts, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,14 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 import uuid
 
 
+def month_of(value):
+    """재생 시각 -> 히스토리 파티션 키 (현지 시간 기준 그 달의 1일)"""
+    return timezone.localtime(value).date().replace(day=1)
+
+
 class User(AbstractUser):
     # 고유 UUID를 PK로 사용
     user_uid = models.UUIDField(
@@ -192,13 +198,35 @@ class MusicHistory(models.Model):
         verbose_name='재생일시',
         db_column='historylist_played_at',
     )
+    # 월별 파티션 키 (재생 월의 1일, PostgreSQL 에서 PARTITION BY RANGE)
+    played_month = models.DateField(
+        verbose_name='재생월',
+        db_column='historylist_played_month',
+    )
+    play_count = models.IntegerField(
+        default=1,
+        verbose_name='재생횟수',
+        db_column='historylist_play_count',
+    )
 
     class Meta:
         db_table = 'music_history'
         ordering = ['-played_at']
+        # 유저별 1곡(영상)당 월 1행, 재생할 때마다 play_count 증가 (그 달의 재생횟수, 누적은 MusicPlayCount/VideoPlayCount)
+        # (파티션 테이블의 유니크 제약에는 파티션 키가 포함되어야 함)
+        unique_together = ('user', 'music', 'played_month')
+        indexes = [
+            models.Index(fields=['user', '-played_month', '-played_at', '-id'], name='music_history_recent'),
+        ]
         verbose_name = '음악 재생 기록'
         verbose_name_plural = '음악 재생 기록'
 
+    def save(self, *args, **kwargs):
+        # 파티션 키는 재생 시각에서 정함 (record_play 밖에서 ORM 으로 만들 때도 채워지도록)
+        if self.played_month is None:
+            self.played_month = month_of(self.played_at or timezone.now())
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username} - {self.music.music_title}"
 
@@ -223,12 +251,112 @@ class VideoHistory(models.Model):
         verbose_name='재생일시',
         db_column='historyvideo_played_at',
     )
+    # 월별 파티션 키 (재생 월의 1일, PostgreSQL 에서 PARTITION BY RANGE)
+    played_month = models.DateField(
+        verbose_name='재생월',
+        db_column='historyvideo_played_month',
+    )
+    play_count = models.IntegerField(
+        default=1,
+        verbose_name='재생횟수',
+        db_column='historyvideo_play_count',
+    )
 
     class Meta:
         db_table = 'video_history'
         ordering = ['-played_at']
+        # 유저별 1곡(영상)당 월 1행, 재생할 때마다 play_count 증가 (그 달의 재생횟수, 누적은 MusicPlayCount/VideoPlayCount)
+        # (파티션 테이블의 유니크 제약에는 파티션 키가 포함되어야 함)
+        unique_together = ('user', 'video', 'played_month')
+        indexes = [
+            models.Index(fields=['user', '-played_month', '-played_at', '-id'], name='video_history_recent'),
+        ]
         verbose_name = '영상 재생 기록'
         verbose_name_plural = '영상 재생 기록'
 
+    def save(self, *args, **kwargs):
+        # 파티션 키는 재생 시각에서 정함 (record_play 밖에서 ORM 으로 만들 때도 채워지도록)
+        if self.played_month is None:
+            self.played_month = month_of(self.played_at or timezone.now())
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username} - {self.video.video_title}"
+
+
+class MusicPlayCount(models.Model):
+    """유저별 음악 누적 재생횟수 (월별 히스토리와 별도로 유지, 보관 기간이 지나도 남음)"""
+
+    user = models.ForeignKey(
+        'User',
+        on_delete=models.CASCADE,
+        verbose_name='사용자',
+        db_column='musicplays_user_id',
+    )
+    music = models.ForeignKey(
+        'twobeats_upload.Music',
+        on_delete=models.CASCADE,
+        verbose_name='음악',
+        db_column='musicplays_music_id',
+    )
+    play_count = models.IntegerField(
+        default=0,
+        verbose_name='재생횟수',
+        db_column='musicplays_play_count',
+    )
+    # 마지막으로 재생한 달 (히스토리 화면에서 곡마다 이 달의 행만 보여 줌)
+    last_played_month = models.DateField(
+        verbose_name='마지막 재생월',
+        db_column='musicplays_last_played_month',
+    )
+
+    class Meta:
+        db_table = 'music_play_count'
+        unique_together = ('user', 'music')
+        indexes = [
+            models.Index(fields=['user', '-play_count'], name='music_plays_most_played'),
+        ]
+        verbose_name = '음악 누적 재생횟수'
+        verbose_name_plural = '음악 누적 재생횟수'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.music.music_title} ({self.play_count})"
+
+
+class VideoPlayCount(models.Model):
+    """유저별 영상 누적 재생횟수 (월별 히스토리와 별도로 유지, 보관 기간이 지나도 남음)"""
+
+    user = models.ForeignKey(
+        'User',
+        on_delete=models.CASCADE,
+        verbose_name='사용자',
+        db_column='videoplays_user_id',
+    )
+    video = models.ForeignKey(
+        'twobeats_upload.Video',
+        on_delete=models.CASCADE,
+        verbose_name='영상',
+        db_column='videoplays_video_id',
+    )
+    play_count = models.IntegerField(
+        default=0,
+        verbose_name='재생횟수',
+        db_column='videoplays_play_count',
+    )
+    # 마지막으로 재생한 달 (히스토리 화면에서 영상마다 이 달의 행만 보여 줌)
+    last_played_month = models.DateField(
+        verbose_name='마지막 재생월',
+        db_column='videoplays_last_played_month',
+    )
+
+    class Meta:
+        db_table = 'video_play_count'
+        unique_together = ('user', 'video')
+        indexes = [
+            models.Index(fields=['user', '-play_count'], name='video_plays_most_played'),
+        ]
+        verbose_name = '영상 누적 재생횟수'
+        verbose_name_plural = '영상 누적 재생횟수'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.video.video_title} ({self.play_count})"
@@ -1,3 +1,61 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.twobeats_upload.models import Music
+
+from .history import record_play, recent_history
+from .models import MusicHistory, MusicPlayCount, User, month_of
+
+
+class HistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='listener', password='pw')
+        cls.other = User.objects.create_user(username='other', password='pw')
+        cls.musics = [
+            Music.objects.create(
+                music_title=f'곡 {i}', music_type='ballad', music_root='music/test.mp3', uploader=cls.user,
+            )
+            for i in range(3)
+        ]
+
+    def test_replay_updates_one_row(self):
+        music = self.musics[0]
+        for _ in range(3):
+            record_play(self.user, 'music', music.pk)
+        record_play(self.other, 'music', music.pk)
+
+        history = MusicHistory.objects.get(user=self.user, music=music)
+        self.assertEqual(history.play_count, 3)
+        self.assertEqual(history.played_month, month_of(timezone.now()))
+        tally = MusicPlayCount.objects.get(user=self.user, music=music)
+        self.assertEqual((tally.play_count, tally.last_played_month), (3, history.played_month))
+        self.assertEqual(MusicPlayCount.objects.get(user=self.other, music=music).play_count, 1)
+
+    def test_recent_history_shows_latest_month_with_lifetime_count(self):
+        music = self.musics[0]
+        # 지난달 기록 (누적 재생횟수에만 남고 목록에는 이번 달 행만)
+        last_month = (month_of(timezone.now()) - timedelta(days=1)).replace(day=1)
+        MusicHistory.objects.create(user=self.user, music=music, played_month=last_month, play_count=4)
+        MusicPlayCount.objects.create(user=self.user, music=music, play_count=4, last_played_month=last_month)
+        record_play(self.user, 'music', music.pk)
+        record_play(self.user, 'music', self.musics[1].pk)
+
+        items, next_cursor = recent_history(self.user, 'music')
+        self.assertEqual([item.music_id for item in items], [self.musics[1].pk, music.pk])
+        self.assertEqual([item.total_plays for item in items], [1, 5])
+        self.assertIsNone(next_cursor)
 
-# Create your tests here.
+    def test_recent_history_pages(self):
+        for music in self.musics:
+            record_play(self.user, 'music', music.pk)
+        items, next_cursor = recent_history(self.user, 'music', size=2)
+        rest, last_cursor = recent_history(self.user, 'music', cursor=next_cursor, size=2)
+        self.assertEqual(
+            [item.music_id for item in items + rest],
+            [music.pk for music in reversed(self.musics)],
+        )
+        self.assertIsNone(last_cursor)
+        self.assertEqual(recent_history(self.other, 'music'), ([], None))
@@ -16,9 +16,8 @@ from .forms import (
     SignupForm,
     VideoPlaylistCreateForm,
 )
+from .history import recent_history
 from .models import (
-    MusicHistory,
-    VideoHistory,
     MusicPlaylist,
     VideoPlaylist,
     PlaylistTrack,
@@ -123,15 +122,12 @@ def mylist(request):
 
 @login_required(login_url='/account/login/')
 def history(request):
-    music_history = (
-        MusicHistory.objects.filter(user=request.user)
-        .select_related('music')
-        .order_by('-played_at')
+    # 월별 파티션을 최근 달부터 읽고, 커서로 다음 페이지를 넘김 (history.py 참고)
+    music_history, music_next_cursor = recent_history(
+        request.user, 'music', request.GET.get('music_cursor')
     )
-    video_history = (
-        VideoHistory.objects.filter(user=request.user)
-        .select_related('video')
-        .order_by('-played_at')
+    video_history, video_next_cursor = recent_history(
+        request.user, 'video', request.GET.get('video_cursor')
     )
     return render(
         request,
@@ -139,6 +135,8 @@ def history(request):
         {
             'music_history': music_history,
             'video_history': video_history,
+            'music_next_cursor': music_next_cursor,
+            'video_next_cursor': video_next_cursor,
         },
     )
 
@@ -13,6 +13,8 @@ urlpatterns = [
     path('chart/popular/', views.chart_popular, name='chart_popular'),
     path('chart/latest/', views.chart_latest, name='chart_latest'),
     path('chart/liked/', views.chart_liked, name='chart_liked'),
+    path('chart/today/', views.chart_today, name='chart_today'),
+    path('chart/week/', views.chart_week, name='chart_week'),
     
     # 상세
     path('detail/<int:music_id>/', views.music_detail, name='detail'),
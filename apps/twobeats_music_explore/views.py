@@ -3,13 +3,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.contrib import messages
-from django.db.models import Q, F
-from django.core.paginator import Paginator
-from django.utils import timezone
-from apps.twobeats_upload.models import Music, Tag
-from apps.twobeats_account.models import MusicHistory, MusicPlaylist
+from apps.twobeats_upload.models import Music
+from apps.twobeats_upload.autocomplete import music_autocomplete
+from apps.twobeats_upload.charts import chart_items
+from apps.twobeats_upload.comments import create_comment, delete_comment
+from apps.twobeats_upload.counters import play_counter
+from apps.twobeats_upload.events import play_events
+from apps.twobeats_upload.facets import facet_counts
+from apps.twobeats_upload.dedup import first_play
+from apps.twobeats_upload.likes import toggle_like, liked_ids, like_status_batch
+from apps.twobeats_upload.pagination import CursorPaginator
+from apps.twobeats_upload.search import search
+from apps.twobeats_account.models import MusicPlaylist
+from apps.twobeats_account.history import record_play
 from .models import MusicLike,MusicComment
 
 
@@ -22,10 +30,8 @@ def search_music(request):
     musics = Music.objects.all()
     
     if query:
-        musics = musics.filter(
-            Q(music_title__icontains=query) | 
-            Q(music_singer__icontains=query)
-        )
+        # 제목/가수 검색 (PostgreSQL: n-gram/트라이그램 인덱스, 일치도+인기순, search.py 참고)
+        musics = search(musics, query)
     
     if genre:
         musics = musics.filter(music_type=genre)
@@ -33,44 +39,65 @@ def search_music(request):
     if tag:
         musics = musics.filter(tags__name=tag)
     
-    # 페이지네이션
-    paginator = Paginator(musics, 20)
-    page = request.GET.get('page', 1)
-    musics = paginator.get_page(page)
+    # 커서 페이지네이션 (COUNT/OFFSET 없이 마지막 곡의 정렬 키 다음부터, pagination.py 참고)
+    musics = CursorPaginator(musics, 20).page(request.GET.get('cursor'))
     
-    all_tags = Tag.objects.all().order_by('name')
+    # 장르/태그 필터별 결과 수 (검색어가 있으면 묶음 쿼리 1회, 없으면 미리 계산한 테이블, facets.py 참고)
+    facets = facet_counts(Music, query, genre, tag)
     
     context = {
         'musics': musics,
         'query': query,
         'genre': genre,
         'tag': tag,
-        'all_tags': all_tags,
+        'genre_facets': facets['genres'],
+        'tag_facets': facets['tags'],
+        # 이 페이지 곡들의 좋아요 여부 (요청당 1회, has_liked 필터도 이 결과를 씀: likes.py)
+        'liked_music_ids': liked_ids(request.user, 'music', [music.pk for music in musics]),
     }
     return render(request, 'music_explore/search.html', context)
 
 
+def _chart_genre(request):
+    """차트 장르 필터 (?genre=, 잘못된 값이면 전체)"""
+    genre = request.GET.get('genre', '')
+    return genre if genre in dict(Music.GENRE_CHOICES) else ''
+
+
 def chart_all(request):
     """통합 차트 (탭)"""
-    popular_musics = Music.objects.all().order_by('-music_count')[:50]
-    latest_musics = Music.objects.all().order_by('-music_created_at')[:50]
-    liked_musics = Music.objects.all().order_by('-music_like_count')[:50]
+    # 차트는 refresh_charts 가 미리 계산한 스냅샷에서 읽음 (charts.py 참고)
+    genre = _chart_genre(request)
+    popular_musics = chart_items('music_popular', genre)
+    latest_musics = chart_items('music_latest', genre)
+    liked_musics = chart_items('music_liked', genre)
+    # 오늘/주간 차트 (재생 이벤트 일 단위 집계 기준)
+    today_musics = chart_items('music_today', genre)
+    week_musics = chart_items('music_week', genre)
     
     context = {
         'popular_musics': popular_musics,
         'latest_musics': latest_musics,
         'liked_musics': liked_musics,
+        'today_musics': today_musics,
+        'week_musics': week_musics,
+        # 모든 탭의 곡 좋아요 여부를 요청당 1회로 (has_liked 필터도 이 결과를 씀: likes.py)
+        'liked_music_ids': liked_ids(request.user, 'music', [
+            music.pk for musics in (popular_musics, latest_musics, liked_musics, today_musics, week_musics)
+            for music in musics
+        ]),
     }
     return render(request, 'music_explore/chart_all.html', context)
 
 
 def chart_popular(request):
     """인기 차트 (재생수순)"""
-    musics = Music.objects.all().order_by('-music_count')[:50]
+    musics = chart_items('music_popular', _chart_genre(request))
     
     context = {
         'musics': musics,
         'chart_type': 'popular',
+        'liked_music_ids': liked_ids(request.user, 'music', [music.pk for music in musics]),
         'chart_title': '인기 차트',
     }
     return render(request, 'music_explore/chart.html', context)
@@ -78,11 +105,12 @@ def chart_popular(request):
 
 def chart_latest(request):
     """최신 차트 (업로드순)"""
-    musics = Music.objects.all().order_by('-music_created_at')[:50]
+    musics = chart_items('music_latest', _chart_genre(request))
     
     context = {
         'musics': musics,
         'chart_type': 'latest',
+        'liked_music_ids': liked_ids(request.user, 'music', [music.pk for music in musics]),
         'chart_title': '최신 차트',
     }
     return render(request, 'music_explore/chart.html', context)
@@ -90,16 +118,43 @@ def chart_latest(request):
 
 def chart_liked(request):
     """좋아요 차트 (좋아요순)"""
-    musics = Music.objects.all().order_by('-music_like_count')[:50]
+    musics = chart_items('music_liked', _chart_genre(request))
     
     context = {
         'musics': musics,
         'chart_type': 'liked',
+        'liked_music_ids': liked_ids(request.user, 'music', [music.pk for music in musics]),
         'chart_title': '좋아요 차트',
     }
     return render(request, 'music_explore/chart.html', context)
 
 
+def chart_today(request):
+    """오늘 차트 (오늘 재생/좋아요 이벤트순)"""
+    musics = chart_items('music_today', _chart_genre(request))
+    
+    context = {
+        'musics': musics,
+        'chart_type': 'today',
+        'liked_music_ids': liked_ids(request.user, 'music', [music.pk for music in musics]),
+        'chart_title': '오늘 차트',
+    }
+    return render(request, 'music_explore/chart.html', context)
+
+
+def chart_week(request):
+    """주간 차트 (최근 7일 재생/좋아요 이벤트순)"""
+    musics = chart_items('music_week', _chart_genre(request))
+    
+    context = {
+        'musics': musics,
+        'chart_type': 'week',
+        'liked_music_ids': liked_ids(request.user, 'music', [music.pk for music in musics]),
+        'chart_title': '주간 차트',
+    }
+    return render(request, 'music_explore/chart.html', context)
+
+
 def music_detail(request, music_id):
     """음악 상세 페이지"""
     music = get_object_or_404(Music, pk=music_id)
@@ -132,29 +187,16 @@ def music_detail(request, music_id):
 @login_required
 def music_like(request, music_id):
     """좋아요 토글"""
-    music = get_object_or_404(Music, pk=music_id)
-    
-    like = MusicLike.objects.filter(user=request.user, music=music)
-    
-    if like.exists():
-        like.delete()
-        Music.objects.filter(pk=music_id).update(
-            music_like_count=F('music_like_count') - 1
-        )
-        is_liked = False
-    else:
-        MusicLike.objects.create(user=request.user, music=music)
-        Music.objects.filter(pk=music_id).update(
-            music_like_count=F('music_like_count') + 1
-        )
-        is_liked = True
-    
-    music.refresh_from_db()
+    # 추가/삭제 + 좋아요수 증감을 한 번에 처리 (apps/twobeats_upload/likes.py)
+    result = toggle_like(request.user, 'music', music_id)
+    if result is None:
+        raise Http404('음악을 찾을 수 없습니다.')
+    is_liked, like_count = result
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
             'is_liked': is_liked,
-            'like_count': music.music_like_count,
+            'like_count': like_count,
         })
     
     return redirect('music_explore:detail', music_id)
@@ -167,11 +209,8 @@ def music_comment(request, music_id):
         content = request.POST.get('content', '').strip()
         
         if content:
-            MusicComment.objects.create(
-                user=request.user,
-                music=music,
-                content=content
-            )
+            # 댓글 추가 + 댓글수 증가를 한 트랜잭션에서 (apps/twobeats_upload/comments.py)
+            create_comment(request.user, 'music', music, content)
             messages.success(request, '댓글이 작성되었습니다.')
         else:
             messages.error(request, '댓글 내용을 입력해주세요.')
@@ -187,7 +226,7 @@ def comment_delete(request, comment_id):
     music_id = comment.music.id
     
     if comment.user == request.user:
-        comment.delete()
+        delete_comment('music', comment)
         messages.success(request, '댓글이 삭제되었습니다.')
     else:
         messages.error(request, '본인의 댓글만 삭제할 수 있습니다.')
@@ -220,16 +259,12 @@ def get_music_like_status(request, music_id):
     if not request.user.is_authenticated:
         return JsonResponse({'is_liked': False, 'like_count': 0})
     
-    music = get_object_or_404(Music, pk=music_id)
-    is_liked = MusicLike.objects.filter(
-        user=request.user,
-        music=music
-    ).exists()
+    # 좋아요 여부 + 좋아요수를 쿼리 1회로 조회 (여러 곡은 /upload/like-status/ 사용)
+    status = like_status_batch(request.user, 'music', [music_id]).get(music_id)
+    if status is None:
+        raise Http404('음악을 찾을 수 없습니다.')
     
-    return JsonResponse({
-        'is_liked': is_liked,
-        'like_count': music.music_like_count
-    })
+    return JsonResponse(status)
 
 def search_autocomplete(request):
     """검색 자동완성 API"""
@@ -238,15 +273,8 @@ def search_autocomplete(request):
     if len(query) < 1:
         return JsonResponse({'results': []})
     
-    # 제목 검색
-    titles = Music.objects.filter(
-        music_title__icontains=query
-    ).values_list('music_title', flat=True)[:5]
-    
-    # 가수 검색
-    singers = Music.objects.filter(
-        music_singer__icontains=query
-    ).values_list('music_singer', flat=True).distinct()[:5]
+    # 제목/가수 검색 (워커 메모리 인덱스, 앞부분 일치 먼저 재생수 순, autocomplete.py 참고)
+    titles, singers = music_autocomplete.suggest(query, 5)
     
     results = []
     for title in titles:
@@ -258,26 +286,17 @@ def search_autocomplete(request):
 
 def increase_play_count(request, music_id):
     """재생수 증가 API"""
-    # 재생수 증가는 세션으로 중복 방지
-    played_key = f'played_music_{music_id}'
-    if not request.session.get(played_key):
-        Music.objects.filter(pk=music_id).update(
-            music_count=F('music_count') + 1
-        )
-        request.session[played_key] = True
+    # 재생수 증가는 방문자별 블룸 필터로 중복 방지 (세션 쓰기 없음)
+    if first_play(request, 'music_play', music_id):
+        # 재생수는 버퍼에 모았다가 일괄 반영 (인기곡 행 락 경합 방지)
+        play_counter.incr('music_play', music_id)
+        play_events.record('music_play', music_id)
 
-    # 히스토리는 세션과 관계없이 항상 업데이트 (로그인 사용자만)
+    # 히스토리는 중복 방지와 관계없이 항상 업데이트 (로그인 사용자만)
     if request.user.is_authenticated:
         try:
-            # 기존 히스토리가 있으면 재생 시각만 업데이트
-            updated = MusicHistory.objects.filter(
-                user=request.user,
-                music_id=music_id
-            ).update(played_at=timezone.now())
-
-            # 기존 히스토리가 없으면 새로 생성
-            if not updated:
-                MusicHistory.objects.create(user=request.user, music_id=music_id)
+            # 없으면 추가, 있으면 재생 시각 갱신 + 재생횟수 증가 (upsert 한 문장)
+            record_play(request.user, 'music', music_id)
         except Exception:
             pass
 
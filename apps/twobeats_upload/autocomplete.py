@@ -0,0 +1,238 @@
+"""
+검색 자동완성 인덱스 (곡/영상 제목, 가수)
+
+키 입력마다 icontains 쿼리를 두 번 보내지 않도록 워커 메모리에 제목/가수 목록을 들고 DB 없이 답한다.
+
+- 종류(제목/가수)별로 중복 없는 문자열을 소문자 기준 정렬 배열에 두고
+  앞부분 일치는 이진 탐색 구간 안에서 인기 상위 k개,
+  중간 일치는 글자 2-gram(한 글자면 1-gram) 위치 목록의 교집합 후보를 인기순으로 확인
+- 가중치: 같은 문자열을 가진 항목들의 인기 최댓값 (곡: 재생수, 영상: 인기 점수)
+- 초성/자모 검색용으로 저장된 초성/자모 키로 정렬한 배열도 함께 둠
+- 워커 시작 시 적재(config/wsgi.py), 곡/영상이 저장/삭제되면 세대 번호(invalidation.py)가 바뀌어
+  그 사이 수정된 행만 다시 읽어 반영, 인기 가중치는 FULL_RELOAD 마다 전체 다시 읽음
+- 적재된 뒤의 반영은 백그라운드 스레드가 새 인덱스를 만들어 통째로 바꿔 끼우고 (워커당 한 번에 하나)
+  그동안 요청은 이전 인덱스로 바로 답한다 (처음 적재만 요청이 기다림)
+- 삭제된 행을 걸러 내는 pk 전체 조회는 삭제 세대 번호(곡/영상 삭제 시에만 바뀜)가 바뀐 경우에만
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection
+from django.utils import timezone
+
+from .hangul import chosung_key, has_jamo, is_chosung_query, jamo_key
+from .invalidation import generations
+from .models import Music, Video
+
+logger = logging.getLogger(__name__)
+
+# 모델 -> (제목 필드, 가수 필드, 인기 필드, 수정 시각 필드)
+AUTOCOMPLETE_FIELDS = {
+    Music: ('music_title', 'music_singer', 'music_count', 'music_updated_at'),
+    Video: ('video_title', 'video_singer', 'video_popularity', 'video_updated_at'),
+}
+
+# 인기 가중치를 새로 읽는 주기(초)
+FULL_RELOAD = 60 * 60
+# 증분 반영 시 수정 시각 비교 여유 (워커/DB 시계 차이, 커밋 지연)
+SYNC_SLACK = timedelta(minutes=1)
+
+
+def autocomplete_scope(model):
+    return f'autocomplete:{model._meta.model_name}'
+
+
+def autocomplete_deleted_scope(model):
+    return f'autocomplete:{model._meta.model_name}:deleted'
+
+
+def _grams(text):
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class _Entries:
+    """한 종류(제목 또는 가수)의 정렬 배열 + n-gram 위치 목록"""
+
+    def __init__(self, weights, keys=None):
+        # keys: 문자열 -> 검색 키 (초성/자모 키), None 이면 소문자
+        key_of = keys.__getitem__ if keys is not None else str.lower
+        self.texts = sorted(weights, key=lambda text: (key_of(text), text))
+        self.keys = [key_of(text) for text in self.texts]
+        self.weights = np.array([weights[text] for text in self.texts], dtype=np.int64)
+
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for gram in _grams(key) | set(key):
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()}
+
+    def _by_weight(self, positions):
+        """위치 배열을 인기 내림차순(같으면 문자열 순)으로"""
+        return positions[np.lexsort((positions, -self.weights[positions]))]
+
+    def prefix(self, query, limit):
+        low = bisect_left(self.keys, query)
+        high = bisect_left(self.keys, query + '\U0010ffff', low)
+        positions = np.arange(low, high)
+        if len(positions) > limit:
+            positions = positions[np.argpartition(-self.weights[low:high], limit - 1)[:limit]]
+        return self._by_weight(positions).tolist()
+
+    def infix(self, query, limit, exclude=()):
+        lists = []
+        for gram in _grams(query):
+            if gram not in self.postings:
+                return []
+            lists.append(self.postings[gram])
+        lists.sort(key=len)
+        candidates = lists[0]
+        for positions in lists[1:]:
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        found = []
+        for position in self._by_weight(candidates).tolist():
+            if position not in exclude and query in self.keys[position]:
+                found.append(position)
+                if len(found) == limit:
+                    break
+        return found
+
+    def lookup(self, query, limit):
+        """앞부분 일치 먼저, 모자라면 중간 일치 (인기순)"""
+        positions = self.prefix(query, limit)
+        if len(positions) < limit:
+            positions += self.infix(query, limit - len(positions), set(positions))
+        return [self.texts[position] for position in positions]
+
+
+class AutocompleteIndex:
+    def __init__(self, model, background=True):
+        self.model = model
+        # background: 적재 후 반영을 백그라운드 스레드로 (False 면 요청 안에서 바로, 테스트용)
+        self.background = background
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._items = {}
+        self._entries = None
+        self._state = None
+        self._synced_at = None
+        self._loaded_at = 0.0
+
+    def _rows(self, queryset):
+        title, singer, popularity, _ = AUTOCOMPLETE_FIELDS[self.model]
+        # 초성/자모 키는 저장 시 계산해 둔 값을 그대로 읽음
+        keys = [f'{source}_{suffix}' for source in (title, singer) for suffix in ('chosung', 'jamo')]
+        for pk, title, singer, weight, *key_values in (
+            queryset.values_list('pk', title, singer, popularity, *keys).iterator(chunk_size=10000)
+        ):
+            yield pk, (title, singer, weight, *key_values)
+
+    @staticmethod
+    def _build_entries(items):
+        """{검색 방식: (제목 _Entries, 가수 _Entries)} (검색 방식: text, chosung, jamo)"""
+        weights = ({}, {})
+        keys = {'chosung': ({}, {}), 'jamo': ({}, {})}
+        for title, singer, weight, title_chosung, title_jamo, singer_chosung, singer_jamo in items.values():
+            for kind, text, chosung, jamo in ((0, title, title_chosung, title_jamo), (1, singer, singer_chosung, singer_jamo)):
+                if not text:
+                    continue
+                weights[kind][text] = max(weights[kind].get(text, weight), weight)
+                keys['chosung'][kind][text] = chosung
+                keys['jamo'][kind][text] = jamo
+        entries = {'text': tuple(_Entries(weights[kind]) for kind in (0, 1))}
+        for mode, mode_keys in keys.items():
+            entries[mode] = tuple(_Entries(weights[kind], mode_keys[kind]) for kind in (0, 1))
+        return entries
+
+    def _refresh(self, state, full):
+        """
+        새 인덱스를 만든 뒤 바꿔 끼움 (만드는 동안 조회는 이전 인덱스를 그대로 씀)
+        :param state: (저장 세대 번호, 삭제 세대 번호), 읽기 전에 구한 값
+        """
+        started = timezone.now()
+        if full:
+            items = dict(self._rows(self.model.objects.all()))
+            loaded_at = time.monotonic()
+        else:
+            updated_field = AUTOCOMPLETE_FIELDS[self.model][3]
+            items = dict(self._items)
+            items.update(self._rows(self.model.objects.filter(**{f'{updated_field}__gte': self._synced_at - SYNC_SLACK})))
+            if state[1] != self._state[1]:
+                alive = set(self.model.objects.values_list('pk', flat=True))
+                items = {pk: item for pk, item in items.items() if pk in alive}
+            loaded_at = self._loaded_at
+        entries = self._build_entries(items)
+        self._items, self._entries = items, entries
+        self._state, self._synced_at, self._loaded_at = state, started, loaded_at
+
+    def _refresh_in_background(self, state, full):
+        try:
+            self._refresh(state, full)
+        except Exception:
+            logger.exception('자동완성 인덱스 갱신 실패: %s', self.model.__name__)
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def sync(self):
+        """세대 번호가 바뀌었으면 수정된 행만, 적재 후 FULL_RELOAD 가 지났으면 전체 다시 읽음"""
+        state = tuple(generations(autocomplete_scope(self.model), autocomplete_deleted_scope(self.model)))
+        full = time.monotonic() - self._loaded_at > FULL_RELOAD
+        if self._entries is not None and state == self._state and not full:
+            return self._entries
+
+        if self._entries is None or not self.background:
+            with self._lock:
+                if self._entries is None or state != self._state or full:
+                    self._refresh(state, self._entries is None or full)
+            return self._entries
+
+        with self._lock:
+            if self._refreshing:
+                return self._entries
+            self._refreshing = True
+        threading.Thread(
+            target=self._refresh_in_background, args=(state, full),
+            name=f'autocomplete-refresh-{self.model.__name__}', daemon=True,
+        ).start()
+        return self._entries
+
+    def suggest(self, query, limit=5):
+        """
+        초성만("ㅅㄱㅇ") 또는 낱자가 섞인("아이ㅇ") 검색어는 초성/자모 키로 찾음 (hangul.py)
+        :return: (제목 리스트, 가수 리스트) 각각 최대 limit 개, 앞부분 일치 먼저 인기순
+        """
+        query = query.strip().lower()
+        if not query:
+            return [], []
+        if is_chosung_query(query):
+            mode, query = 'chosung', chosung_key(query)
+        elif has_jamo(query):
+            mode, query = 'jamo', jamo_key(query)
+        else:
+            mode = 'text'
+        titles, singers = self.sync()[mode]
+        return titles.lookup(query, limit), singers.lookup(query, limit)
+
+    def warm(self):
+        try:
+            self.sync()
+        except Exception:
+            logger.exception('자동완성 인덱스 적재 실패: %s', self.model.__name__)
+        finally:
+            connection.close()
+
+
+music_autocomplete = AutocompleteIndex(Music)
+video_autocomplete = AutocompleteIndex(Video)
+
+
+def warm_up():
+    """워커 시작 시 백그라운드로 인덱스 적재 (첫 요청이 적재를 기다리지 않도록)"""
+    for index in (music_autocomplete, video_autocomplete):
+        threading.Thread(target=index.warm, name=f'autocomplete-warm-{index.model.__name__}', daemon=True).start()
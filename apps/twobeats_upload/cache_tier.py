@@ -0,0 +1,260 @@
+"""
+2단 캐시 (워커 메모리 L1 + 공유 캐시)
+
+settings.CACHES['default'] 로 쓰는 캐시 백엔드.
+모든 값은 공유 캐시(CACHES['shared'], Redis/DB/파일 등 CACHE_URL 로 선택)에 두어
+레플리카/gunicorn 워커가 같은 캐시를 보고, 읽기 위주인 키 계열만 워커 메모리(L1)에 몇 초 더 둔다.
+
+- 키 계열: 키의 첫 ':' 앞부분 (예: top_videos:mv:: -> top_videos)
+- L1: OPTIONS['L1_FAMILIES'] 에 있는 계열만, L1_TIMEOUT 초 / 최대 L1_MAX_ENTRIES 개 (오래 안 쓴 것부터 버림)
+  (읽고 고쳐 쓰는 키(재생 중복 방지 필터, 월드컵 후보곡 풀 등)는 워커마다 값이 달라지므로 넣지 않음)
+- 계열별 L1 적중/공유 캐시 적중/미스 횟수를 워커 메모리에 모았다가 공유 캐시에 합산 (cache_stats 명령으로 확인)
+  (합산 주기는 CACHE_METRICS_FLUSH_INTERVAL)
+- 공유 캐시가 locmem 이면 워커마다 따로이므로 워커가 여럿이면 시작할 때 오류 (check_shared_cache)
+"""
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+from .counters import BufferedWriter
+
+_MISSING = object()
+
+OUTCOMES = ('l1_hit', 'hit', 'miss')
+STATS_PREFIX = 'cache_stats'
+
+
+def key_family(key):
+    return str(key).split(':', 1)[0]
+
+
+class CacheMetrics(BufferedWriter):
+    """계열별 적중/미스 횟수를 모아 두었다가 공유 캐시 카운터에 더하는 버퍼"""
+
+    thread_name = 'cache-metrics-flush'
+    interval_setting = 'CACHE_METRICS_FLUSH_INTERVAL'
+
+    def __init__(self, shared_alias='shared', interval=None, autoflush=True):
+        super().__init__(interval, autoflush)
+        self.shared_alias = shared_alias
+        self._pending = defaultdict(int)
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def record(self, family, outcome):
+        with self._lock:
+            self._pending[(family, outcome)] += 1
+        self._schedule_flush()
+
+    def flush(self):
+        """
+        모아 둔 횟수를 공유 캐시에 합산
+        :return: 합산한 (계열, 결과) 수
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, defaultdict(int)
+
+        shared = self.shared
+        families = set(shared.get(f'{STATS_PREFIX}:families', ()))
+        new_families = {family for family, _ in pending} - families
+        if new_families:
+            shared.set(f'{STATS_PREFIX}:families', sorted(families | new_families), None)
+        for (family, outcome), count in pending.items():
+            key = f'{STATS_PREFIX}:{family}:{outcome}'
+            shared.add(key, 0, None)
+            shared.incr(key, count)
+        return len(pending)
+
+    def report(self):
+        """{계열: {결과: 횟수}} (전체 워커 합계, 아직 합산되지 않은 이 워커의 횟수는 제외)"""
+        shared = self.shared
+        families = shared.get(f'{STATS_PREFIX}:families', ())
+        keys = [f'{STATS_PREFIX}:{family}:{outcome}' for family in families for outcome in OUTCOMES]
+        values = shared.get_many(keys)
+        return {
+            family: {outcome: values.get(f'{STATS_PREFIX}:{family}:{outcome}', 0) for outcome in OUTCOMES}
+            for family in families
+        }
+
+    def reset(self):
+        shared = self.shared
+        families = shared.get(f'{STATS_PREFIX}:families', ())
+        shared.delete_many(
+            [f'{STATS_PREFIX}:{family}:{outcome}' for family in families for outcome in OUTCOMES]
+            + [f'{STATS_PREFIX}:families']
+        )
+
+
+def check_shared_cache(alias='shared'):
+    """
+    WSGI 워커 시작 시 호출: gunicorn 워커가 여럿(WEB_CONCURRENCY)인데 공유 캐시가 워커 메모리(locmem)면 오류
+    (재생 중복 방지, 월드컵 후보곡 풀, 캐시 무효화 세대 번호가 워커마다 달라짐)
+    """
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    if workers > 1 and isinstance(caches[alias], LocMemCache):
+        raise ImproperlyConfigured(
+            f'워커 {workers}개가 캐시를 공유하지 못합니다. CACHE_URL 을 redis:// 등 공유 캐시로 설정하세요.'
+        )
+
+
+class TieredCache(BaseCache):
+    """
+    OPTIONS
+    - SHARED: 공유 캐시 alias (기본 'shared')
+    - L1_FAMILIES: L1 에 둘 키 계열 목록
+    - L1_TIMEOUT: L1 보관 시간(초)
+    - L1_MAX_ENTRIES: L1 최대 항목 수
+    """
+
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS') or {})
+        self._shared_alias = options.pop('SHARED', 'shared')
+        self._l1_families = frozenset(options.pop('L1_FAMILIES', ()))
+        self._l1_timeout = options.pop('L1_TIMEOUT', 5)
+        self._l1_max_entries = options.pop('L1_MAX_ENTRIES', 1000)
+        super().__init__({**params, 'OPTIONS': options})
+        self._l1 = _l1_stores.setdefault(location or 'default', OrderedDict())
+        self._l1_lock = _l1_lock
+        self.metrics = _metrics.get(self._shared_alias)
+        if self.metrics is None:
+            self.metrics = _metrics[self._shared_alias] = CacheMetrics(self._shared_alias)
+            atexit.register(self.metrics.shutdown)
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # --- L1 ---
+
+    def _l1_get(self, key):
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._l1[key]
+                return _MISSING
+            self._l1.move_to_end(key)
+            return value
+
+    def _l1_set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        if key_family(key[0]) not in self._l1_families:
+            return
+        ttl = self._l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._l1_delete(key)
+            return
+        with self._l1_lock:
+            self._l1[key] = (time.monotonic() + ttl, value)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._l1_lock:
+            self._l1.pop(key, None)
+
+    # --- 캐시 API (값은 모두 공유 캐시에, 키/버전 처리도 공유 캐시가 함) ---
+
+    def get(self, key, default=None, version=None):
+        family = key_family(key)
+        l1_key = (key, version)
+        if family in self._l1_families:
+            value = self._l1_get(l1_key)
+            if value is not _MISSING:
+                self.metrics.record(family, 'l1_hit')
+                return value
+
+        value = self.shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            self.metrics.record(family, 'miss')
+            return default
+        self.metrics.record(family, 'hit')
+        self._l1_set(l1_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remaining = []
+        for key in keys:
+            value = self._l1_get((key, version)) if key_family(key) in self._l1_families else _MISSING
+            if value is _MISSING:
+                remaining.append(key)
+            else:
+                self.metrics.record(key_family(key), 'l1_hit')
+                found[key] = value
+
+        shared_found = self.shared.get_many(remaining, version) if remaining else {}
+        for key in remaining:
+            if key in shared_found:
+                self.metrics.record(key_family(key), 'hit')
+                self._l1_set((key, version), shared_found[key])
+            else:
+                self.metrics.record(key_family(key), 'miss')
+        found.update(shared_found)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version)
+        self._l1_set((key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_delete((key, version))
+        return self.shared.add(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version)
+        for key, value in data.items():
+            if key not in failed:
+                self._l1_set((key, version), value, timeout)
+        return failed
+
+    def delete(self, key, version=None):
+        self._l1_delete((key, version))
+        return self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._l1_delete((key, version))
+        return self.shared.delete_many(keys, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def has_key(self, key, version=None):
+        if key_family(key) in self._l1_families and self._l1_get((key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_delete((key, version))
+        return self.shared.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        self._l1_delete((key, version))
+        return self.shared.decr(key, delta, version)
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        return self.shared.clear()
+
+
+# 캐시 객체는 스레드마다 새로 만들어지므로 L1 과 지표 버퍼는 워커(프로세스) 단위로 공유
+_l1_stores = {}
+_l1_lock = threading.Lock()
+_metrics = {}
@@ -0,0 +1,156 @@
+"""
+음악/영상 차트 스냅샷
+
+차트는 (차트 종류, 장르, 순위, 대상 id) 행으로 chart_snapshot 테이블에 미리 계산해 두고
+(refresh_charts 명령, 스케줄러에서 주기 실행)
+화면에서는 스냅샷 순위 -> PK 조회만 하므로 곡/영상 수가 늘어도 응답 시간이 일정하다.
+(차트, 장르)마다 순위 0 행을 갱신 표시로 함께 저장하므로 곡이 없는 장르도 빈 차트로 바로 보여 주고,
+스냅샷이 아직 없으면(배포 직후 등) 한 워커가 계산해 1분간 캐싱한 결과를 보여 준다.
+
+오늘/주간 차트는 누적 카운터 대신 이벤트 일 단위 집계(events.py)로 순위를 매긴다.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+from django.utils import timezone
+
+from .models import ChartSnapshot, EventRollup, Music, Video
+from .singleflight import cached
+from .topn import top_per_group
+
+CHART_SIZE = 50
+
+# 갱신 표시 행의 순위 (이 (차트, 장르)는 갱신됨, 대상 id 는 쓰지 않음)
+REFRESHED_POSITION = 0
+
+
+# 차트 종류 -> (대상 모델, 장르 필드, 정렬 기준)
+# 동점일 때 순위가 갱신마다 바뀌지 않도록 마지막에 -id 로 고정
+CHARTS = {
+    'music_popular': (Music, 'music_type', ['-music_count', '-id']),
+    'music_latest': (Music, 'music_type', ['-music_created_at', '-id']),
+    'music_liked': (Music, 'music_type', ['-music_like_count', '-id']),
+    'video_popular': (Video, 'video_type', ['-video_popularity', '-id']),  # 저장된 인기 점수 (scores.py)
+    'video_latest': (Video, 'video_type', ['-video_created_at', '-id']),
+    'video_liked': (Video, 'video_type', ['-video_like_count', '-id']),
+}
+
+
+# 기간 차트 종류 -> (대상 모델, 장르 필드, 집계 일수)
+TRENDING_CHARTS = {
+    'music_today': (Music, 'music_type', 1),
+    'music_week': (Music, 'music_type', 7),
+    'video_today': (Video, 'video_type', 1),
+    'video_week': (Video, 'video_type', 7),
+}
+
+# 기간 차트 점수 = 이벤트 수 x 가중치 (영상은 누적 인기 점수와 같은 비율)
+TRENDING_WEIGHTS = {
+    Music: {'music_play': 1, 'music_like': 4},
+    Video: {'video_view': 3, 'video_play': 2, 'video_like': 4},
+}
+
+
+def chart_model(chart_type):
+    if chart_type in TRENDING_CHARTS:
+        return TRENDING_CHARTS[chart_type][0]
+    return CHARTS[chart_type][0]
+
+
+def _trending(chart_type, genre, limit):
+    model, genre_field, days = TRENDING_CHARTS[chart_type]
+    weights = TRENDING_WEIGHTS[model]
+    # 오늘 0시(현지 시간)부터 거꾸로 days 일
+    since = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+
+    rollups = EventRollup.objects.filter(granularity='day', kind__in=weights, bucket__gte=since)
+    if genre:
+        rollups = rollups.filter(item_id__in=model.objects.filter(**{genre_field: genre}).values('pk'))
+    return list(
+        rollups.values('item_id')
+        .annotate(score=Sum(Case(
+            *[When(kind=kind, then=F('count') * weight) for kind, weight in weights.items()],
+            output_field=IntegerField(),
+        )))
+        .order_by('-score', '-item_id')
+        .values_list('item_id', flat=True)[:limit]
+    )
+
+
+def compute_chart(chart_type, genre='', limit=CHART_SIZE):
+    """현재 데이터로 차트 id 목록 계산 (순위순)"""
+    if chart_type in TRENDING_CHARTS:
+        return _trending(chart_type, genre, limit)
+
+    model, genre_field, ordering = CHARTS[chart_type]
+    items = model.objects.all()
+    if genre:
+        items = items.filter(**{genre_field: genre})
+    return list(items.order_by(*ordering).values_list('pk', flat=True)[:limit])
+
+
+def _compute_all_genres(chart_type):
+    """{장르('' = 전체): id 목록} (누적 차트의 장르별 순위는 윈도 함수 쿼리 1회)"""
+    model = chart_model(chart_type)
+    genres = [value for value, _ in model.GENRE_CHOICES]
+    if chart_type in TRENDING_CHARTS:
+        return {genre: compute_chart(chart_type, genre) for genre in [''] + genres}
+
+    _, genre_field, ordering = CHARTS[chart_type]
+    result = {'': compute_chart(chart_type)}
+    result.update({genre: [] for genre in genres})
+    for genre, pk in top_per_group(model.objects.all(), genre_field, ordering, CHART_SIZE).values_list(genre_field, 'pk'):
+        result[genre].append(pk)
+    return result
+
+
+def refresh_charts(chart_types=None):
+    """
+    차트 스냅샷 갱신 (전체 + 장르별)
+    차트 하나를 트랜잭션 하나로 교체하므로 조회 중인 화면은 이전/새 스냅샷 중 하나만 본다.
+    :return: {차트 종류: 저장한 행 수}
+    """
+    result = {}
+    for chart_type in chart_types or [*CHARTS, *TRENDING_CHARTS]:
+        now = timezone.now()
+        rows = []
+        for genre, ids in _compute_all_genres(chart_type).items():
+            rows.append(ChartSnapshot(chart_type=chart_type, genre=genre, position=REFRESHED_POSITION,
+                                      item_id=0, refreshed_at=now))
+            rows += [
+                ChartSnapshot(chart_type=chart_type, genre=genre, position=position,
+                              item_id=pk, refreshed_at=now)
+                for position, pk in enumerate(ids, start=1)
+            ]
+
+        with transaction.atomic():
+            ChartSnapshot.objects.filter(chart_type=chart_type).delete()
+            ChartSnapshot.objects.bulk_create(rows, batch_size=1000)
+        result[chart_type] = sum(row.position != REFRESHED_POSITION for row in rows)
+    return result
+
+
+def chart_items(chart_type, genre='', limit=CHART_SIZE, queryset=None):
+    """
+    차트 (모델 객체 리스트, 순위순)
+    스냅샷 id 를 PK 로 한 번에 가져오며, 갱신 이후 삭제된 곡/영상은 건너뛴다.
+    :param queryset: select_related/prefetch_related 를 붙인 기본 쿼리셋 (선택)
+    """
+    if queryset is None:
+        queryset = chart_model(chart_type).objects.all()
+    rows = list(
+        ChartSnapshot.objects.filter(chart_type=chart_type, genre=genre, position__lte=limit)
+        .order_by('position').values_list('position', 'item_id')
+    )
+    ids = [pk for position, pk in rows if position != REFRESHED_POSITION]
+    if not rows:
+        # 갱신 표시도 없으면(스냅샷 없음) 요청마다 집계하지 않도록 1분 캐싱 (한 워커만 계산)
+        ids = cached(
+            f'chart_fallback:{chart_type}:{genre}:{limit}',
+            lambda: compute_chart(chart_type, genre, limit),
+            60,
+        )
+
+    items = queryset.in_bulk(ids)
+    return [items[pk] for pk in ids if pk in items]
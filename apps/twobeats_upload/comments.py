@@ -0,0 +1,70 @@
+"""
+음악/영상 댓글 작성/삭제 공용 서비스
+
+댓글 행 추가/삭제와 댓글수(music_comment_count, video_comment_count) 증감을 한 트랜잭션에서 처리하고
+저장된 댓글수를 돌려준다 (화면에 이미 불러온 객체의 값 + 1 이 아니라 DB 값).
+
+카운터를 같은 트랜잭션에서 맞추므로 counter_dirty 트리거가 기록하지 않도록 표시한다
+(mark_counters_synced, 트리거는 관리자 화면/연쇄 삭제 등 앱 밖의 변경만 기록).
+"""
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from apps.twobeats_music_explore.models import MusicComment
+from apps.twobeats_video_explore.models import VideoComment
+
+from .models import Music, Video
+from .reconcile import mark_counters_synced
+
+# 종류 -> (댓글 모델, 댓글 모델의 대상 FK 필드, 대상 모델, 댓글수 필드)
+COMMENT_TARGETS = {
+    'music': (MusicComment, 'music', Music, 'music_comment_count'),
+    'video': (VideoComment, 'video', Video, 'video_comment_count'),
+}
+
+
+def _add_to_count(kind, pk, delta):
+    """댓글수 증감 후 저장된 값 (PostgreSQL: UPDATE ... RETURNING 한 문장)"""
+    _, _, target_model, count_field = COMMENT_TARGETS[kind]
+    if connection.vendor == 'postgresql':
+        qn = connection.ops.quote_name
+        table = qn(target_model._meta.db_table)
+        column = qn(target_model._meta.get_field(count_field).column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET {column} = GREATEST({column} + %s, 0) '
+                f'WHERE {qn(target_model._meta.pk.column)} = %s RETURNING {column}',
+                [delta, pk],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    target_model.objects.filter(pk=pk).update(**{count_field: Greatest(F(count_field) + delta, 0)})
+    return target_model.objects.filter(pk=pk).values_list(count_field, flat=True).first() or 0
+
+
+def create_comment(user, kind, target, content):
+    """
+    댓글 작성
+    :return: (댓글, 저장된 댓글수)
+    """
+    comment_model, fk_name, _, _ = COMMENT_TARGETS[kind]
+    with transaction.atomic():
+        mark_counters_synced()
+        comment = comment_model.objects.create(user=user, content=content, **{fk_name: target})
+        comment_count = _add_to_count(kind, target.pk, 1)
+    return comment, comment_count
+
+
+def delete_comment(kind, comment):
+    """
+    댓글 삭제
+    :return: 저장된 댓글수
+    """
+    _, fk_name, _, _ = COMMENT_TARGETS[kind]
+    target_id = getattr(comment, f'{fk_name}_id')
+    with transaction.atomic():
+        mark_counters_synced()
+        comment.delete()
+        return _add_to_count(kind, target_id, -1)
@@ -0,0 +1,202 @@
+"""
+재생수/조회수 write-behind 버퍼
+
+재생 API가 호출될 때마다 music/video 행을 바로 UPDATE 하지 않고
+워커 메모리에 증가분을 모아 두었다가 N초마다 한 번에 반영한다.
+(인기곡 한 행에 UPDATE가 몰려 락 경합이 생기는 것을 방지)
+
+- PostgreSQL: UPDATE ... FROM (VALUES ...) 한 문장으로 일괄 반영
+- 그 외 DB(SQLite 등 개발용): 행별 F() UPDATE 로 대체
+- 워커 종료 시(atexit) 남은 증가분을 모두 반영, 반영 실패 시 버퍼에 되돌림
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+
+from .models import Music, Video
+from .scores import refresh_scores
+
+logger = logging.getLogger(__name__)
+
+# 카운터 이름 -> (모델, 증가시킬 필드)
+COUNTER_FIELDS = {
+    'music_play': (Music, 'music_count'),
+    'video_play': (Video, 'video_play_count'),
+    'video_view': (Video, 'video_views'),
+}
+
+# VALUES 목록이 너무 길어지지 않도록 한 문장에 담는 최대 행 수
+FLUSH_BATCH_SIZE = 1000
+
+
+class BufferedWriter:
+    """
+    메모리에 모아 두었다가 주기적으로 DB에 반영하는 버퍼의 공통 부분
+    (백그라운드 반영 스레드, 종료 시 반영). 하위 클래스는 flush() 를 구현한다.
+    """
+
+    thread_name = 'buffer-flush'
+    # 반영 주기 설정 이름 (하위 클래스마다 따로 둘 수 있음)
+    interval_setting = 'PLAY_COUNTER_FLUSH_INTERVAL'
+
+    def __init__(self, interval=None, autoflush=True):
+        # interval: 반영 주기(초). None이면 settings 의 interval_setting 값,
+        #           0 이하이면 버퍼링 없이 즉시 반영
+        self._interval = interval
+        self._autoflush = autoflush
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def interval(self):
+        if self._interval is None:
+            return getattr(settings, self.interval_setting, 5)
+        return self._interval
+
+    def flush(self):
+        raise NotImplementedError
+
+    def _schedule_flush(self):
+        """적립 직후 호출: 즉시 반영하거나 반영 스레드를 띄움"""
+        if self._autoflush:
+            if self.interval <= 0:
+                self.flush()
+            else:
+                self._ensure_worker()
+
+    # --- 백그라운드 반영 스레드 ---
+
+    def _ensure_worker(self):
+        # gunicorn fork 이후에는 스레드가 복제되지 않으므로 pid 기준으로 다시 띄움
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name=self.thread_name, daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+    def shutdown(self):
+        """워커 종료 시 호출: 스레드 정지 후 남은 내용 반영"""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+
+class PlayCounterBuffer(BufferedWriter):
+    """카운터 증가분을 모아 두었다가 일괄 반영하는 버퍼"""
+
+    thread_name = 'play-counter-flush'
+
+    def __init__(self, interval=None, autoflush=True):
+        super().__init__(interval, autoflush)
+        self._pending = defaultdict(int)
+
+    def incr(self, counter, pk, amount=1):
+        """
+        증가분 적립
+        :return: 아직 DB에 반영되지 않은 해당 항목의 누적 증가분 (이번 증가 포함)
+        """
+        if counter not in COUNTER_FIELDS:
+            raise ValueError(f'알 수 없는 카운터: {counter}')
+
+        with self._lock:
+            self._pending[(counter, int(pk))] += amount
+            pending = self._pending[(counter, int(pk))]
+
+        self._schedule_flush()
+        return pending
+
+    def pending(self, counter, pk):
+        """아직 반영되지 않은 증가분"""
+        with self._lock:
+            return self._pending.get((counter, int(pk)), 0)
+
+    def flush(self):
+        """
+        모아 둔 증가분을 DB에 반영
+        :return: 실제로 갱신된 행 수
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, defaultdict(int)
+
+        grouped = defaultdict(list)
+        for (counter, pk), delta in pending.items():
+            if delta:
+                grouped[counter].append((pk, delta))
+
+        written = 0
+        try:
+            with transaction.atomic():
+                for counter, rows in grouped.items():
+                    # id 순으로 정렬해 여러 워커가 동시에 반영할 때 데드락 방지
+                    rows.sort()
+                    written += self._write(counter, rows)
+                # 조회수/재생수가 바뀐 영상의 인기/트렌딩 점수도 같은 트랜잭션에서 갱신
+                refresh_scores(ids=sorted({
+                    pk for counter, rows in grouped.items()
+                    if COUNTER_FIELDS[counter][0] is Video
+                    for pk, _ in rows
+                }))
+        except Exception:
+            # 반영 실패 시 증가분을 버퍼에 되돌려 다음 주기에 재시도
+            logger.exception('재생수 일괄 반영 실패 (%d건 보류)', len(pending))
+            with self._lock:
+                for key, delta in pending.items():
+                    self._pending[key] += delta
+            return 0
+        return written
+
+    def _write(self, counter, rows):
+        model, field = COUNTER_FIELDS[counter]
+
+        if connection.vendor != 'postgresql':
+            written = 0
+            for pk, delta in rows:
+                written += model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+            return written
+
+        qn = connection.ops.quote_name
+        table = qn(model._meta.db_table)
+        column = qn(model._meta.get_field(field).column)
+        pk_column = qn(model._meta.pk.column)
+
+        written = 0
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+                batch = rows[start:start + FLUSH_BATCH_SIZE]
+                values = ', '.join(['(%s::bigint, %s::integer)'] * len(batch))
+                params = [value for row in batch for value in row]
+                cursor.execute(
+                    f'UPDATE {table} SET {column} = {table}.{column} + v.delta '
+                    f'FROM (VALUES {values}) AS v(id, delta) '
+                    f'WHERE {table}.{pk_column} = v.id',
+                    params,
+                )
+                written += cursor.rowcount
+        return written
+
+
+play_counter = PlayCounterBuffer()
+atexit.register(play_counter.shutdown)
@@ -0,0 +1,100 @@
+"""
+재생/조회 중복 집계 방지 저장소
+
+세션에 played_music_<id> 같은 키를 곡마다 쓰면 재생할 때마다 세션 행 전체가 다시 저장되고
+오래 쓴 세션은 키가 수백 개로 불어난다.
+대신 방문자(로그인 유저 또는 세션/접속 정보)별로 시간 구간마다 고정 크기 블룸 필터를 캐시에 둔다.
+
+- 방문자 1명당 메모리: 구간 2개 x PLAY_DEDUP_BITS 비트 (기본 2KB)
+- 현재 구간과 직전 구간 필터에 모두 없을 때만 새 재생으로 집계
+  (중복 방지 기간은 PLAY_DEDUP_WINDOW ~ 2배)
+- 블룸 필터 특성상 드물게(기본 설정에서 수백 곡 재생 시 0.1% 내외) 새 재생을 중복으로 판단할 수 있음
+- 확인과 기록은 한 번에 처리해야 동시 요청이 서로의 비트를 덮어쓰지 않는다
+  공유 캐시가 Redis 면 GETBIT/SETBIT 를 Lua 스크립트 하나로 원자적으로 실행하고,
+  그 외 백엔드는 워커 안에서만 잠금으로 순서를 맞춘다 (locmem 은 워커마다 필터가 따로라 개발용,
+  워커/레플리카가 여럿이면 CACHE_URL=redis://... 필요: docker-compose.yml, 2beats-k3s.yaml)
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+
+HASH_COUNT = 5
+
+# KEYS: 현재 구간 필터, 직전 구간 필터 / ARGV: 보관 시간(초), 비트 위치...
+# 두 필터 중 하나에 모든 비트가 있으면 0, 아니면 현재 구간에 비트를 켜고 1
+FIRST_PLAY_SCRIPT = """
+local seen_current, seen_previous = 1, 1
+for i = 2, #ARGV do
+    if redis.call('GETBIT', KEYS[1], ARGV[i]) == 0 then seen_current = 0 end
+    if redis.call('GETBIT', KEYS[2], ARGV[i]) == 0 then seen_previous = 0 end
+end
+if seen_current == 1 or seen_previous == 1 then
+    return 0
+end
+for i = 2, #ARGV do
+    redis.call('SETBIT', KEYS[1], ARGV[i], 1)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+_lock = threading.Lock()
+
+
+def visitor_key(request):
+    """로그인 유저는 유저 id, 비로그인은 세션 키 (없으면 접속 IP + User-Agent)"""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    if request.session.session_key:
+        return f'session:{request.session.session_key}'
+    raw = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'anon:' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def _bit_positions(counter, pk, bits):
+    # 128비트 해시 하나를 둘로 나눠 이중 해싱으로 HASH_COUNT 개 위치 생성
+    digest = hashlib.blake2b(f'{counter}:{pk}'.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(HASH_COUNT)]
+
+
+def _contains(bloom, positions):
+    return all(bloom[p >> 3] & (1 << (p & 7)) for p in positions)
+
+
+def first_play(request, counter, pk):
+    """
+    이 방문자의 첫 재생(조회)인지 확인하고 기록
+    :return: 처음이면 True (집계 대상), 최근에 이미 집계했으면 False
+    """
+    bits = settings.PLAY_DEDUP_BITS
+    window = settings.PLAY_DEDUP_WINDOW
+    index = int(time.time() // window)
+    prefix = f'play_dedup:{visitor_key(request)}'
+    current_key, previous_key = f'{prefix}:{index}', f'{prefix}:{index - 1}'
+
+    positions = _bit_positions(counter, pk, bits)
+    # 직전 구간으로 참조될 때까지 살아 있도록 구간 2개만큼 보관
+    timeout = window * 2
+
+    shared = getattr(cache, 'shared', cache)
+    if isinstance(shared, RedisCache):
+        keys = [shared.make_and_validate_key(current_key), shared.make_and_validate_key(previous_key)]
+        client = shared._cache.get_client(keys[0], write=True)
+        return bool(client.register_script(FIRST_PLAY_SCRIPT)(keys=keys, args=[timeout, *positions]))
+
+    with _lock:
+        filters = cache.get_many([current_key, previous_key])
+        if any(_contains(filters[key], positions) for key in filters):
+            return False
+
+        bloom = bytearray(filters.get(current_key) or bytes(bits // 8))
+        for p in positions:
+            bloom[p >> 3] |= 1 << (p & 7)
+        cache.set(current_key, bytes(bloom), timeout)
+    return True
@@ -0,0 +1,152 @@
+"""
+재생/조회/좋아요 이벤트 로그와 시간/일 단위 집계
+
+- 재생 API 는 이벤트를 워커 메모리에 모으기만 하고 (music/video 행은 건드리지 않음)
+  N초마다 PostgreSQL COPY 한 번으로 play_event 테이블에 적재한다.
+- rollup_events 명령이 최근 몇 시간의 이벤트를 시간 단위로, 그 시간 집계를 다시 일 단위로
+  event_rollup 테이블에 집계한다. (다시 실행해도 같은 결과가 나오도록 구간을 통째로 교체)
+- 오늘/주간 차트는 일 단위 집계만 읽는다 (charts.py 참고)
+"""
+import atexit
+import io
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .counters import BufferedWriter
+from .models import EventRollup, PlayEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_KINDS = {'music_play', 'video_play', 'video_view', 'music_like', 'video_like'}
+
+# DB 장애가 길어질 때 워커 메모리가 끝없이 늘지 않도록 보류할 최대 이벤트 수
+MAX_PENDING_EVENTS = 100000
+
+
+class EventBuffer(BufferedWriter):
+    """이벤트를 모아 두었다가 일괄 적재하는 버퍼"""
+
+    thread_name = 'play-event-flush'
+
+    def __init__(self, interval=None, autoflush=True):
+        super().__init__(interval, autoflush)
+        self._pending = []
+
+    def record(self, kind, pk, occurred_at=None):
+        """이벤트 적립 (발생 시각은 적립 시점)"""
+        if kind not in EVENT_KINDS:
+            raise ValueError(f'알 수 없는 이벤트: {kind}')
+
+        with self._lock:
+            self._pending.append((kind, int(pk), occurred_at or timezone.now()))
+        self._schedule_flush()
+
+    def flush(self):
+        """
+        모아 둔 이벤트를 DB에 적재
+        :return: 적재한 이벤트 수
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+
+        try:
+            with transaction.atomic():
+                self._write(pending)
+        except Exception:
+            logger.exception('재생 이벤트 적재 실패 (%d건 보류)', len(pending))
+            with self._lock:
+                # 오래된 이벤트부터 버림
+                self._pending = (pending + self._pending)[-MAX_PENDING_EVENTS:]
+            return 0
+        return len(pending)
+
+    def _write(self, rows):
+        if connection.vendor != 'postgresql':
+            PlayEvent.objects.bulk_create(
+                [PlayEvent(kind=kind, item_id=pk, occurred_at=when) for kind, pk, when in rows],
+                batch_size=1000,
+            )
+            return
+
+        qn = connection.ops.quote_name
+        meta = PlayEvent._meta
+        columns = ', '.join(qn(meta.get_field(name).column) for name in ('kind', 'item_id', 'occurred_at'))
+        data = io.StringIO()
+        for kind, pk, when in rows:
+            data.write(f'{kind}\t{pk}\t{when.isoformat()}\n')
+        data.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {qn(meta.db_table)} ({columns}) FROM STDIN', data)
+
+
+play_events = EventBuffer()
+atexit.register(play_events.shutdown)
+
+
+def _floor_hour(value):
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def _floor_day(value):
+    return _floor_hour(value).replace(hour=0)
+
+
+def rollup(since):
+    """
+    since 가 속한 시간부터 현재까지 시간 집계, since 가 속한 날부터 일 집계를 다시 계산
+    :return: (시간 집계 행 수, 일 집계 행 수)
+    """
+    hour_start = _floor_hour(since)
+    day_start = _floor_day(since)
+
+    with transaction.atomic():
+        hourly = (
+            PlayEvent.objects.filter(occurred_at__gte=hour_start)
+            .annotate(bucket=TruncHour('occurred_at'))
+            .values('kind', 'item_id', 'bucket')
+            .annotate(total=Count('id'))
+        )
+        EventRollup.objects.filter(granularity='hour', bucket__gte=hour_start).delete()
+        hour_rows = EventRollup.objects.bulk_create([
+            EventRollup(granularity='hour', kind=row['kind'], item_id=row['item_id'],
+                        bucket=row['bucket'], count=row['total'])
+            for row in hourly
+        ], batch_size=1000)
+
+        daily = (
+            EventRollup.objects.filter(granularity='hour', bucket__gte=day_start)
+            .annotate(day=TruncDay('bucket'))
+            .values('kind', 'item_id', 'day')
+            .annotate(total=Sum('count'))
+        )
+        EventRollup.objects.filter(granularity='day', bucket__gte=day_start).delete()
+        day_rows = EventRollup.objects.bulk_create([
+            EventRollup(granularity='day', kind=row['kind'], item_id=row['item_id'],
+                        bucket=row['day'], count=row['total'])
+            for row in daily
+        ], batch_size=1000)
+
+    return len(hour_rows), len(day_rows)
+
+
+def purge(event_days, hour_days, day_days):
+    """
+    보관 기간이 지난 이벤트/집계 삭제
+    :return: (이벤트, 시간 집계, 일 집계) 삭제 수
+    """
+    now = timezone.now()
+    events, _ = PlayEvent.objects.filter(occurred_at__lt=now - timedelta(days=event_days)).delete()
+    hours, _ = EventRollup.objects.filter(
+        granularity='hour', bucket__lt=now - timedelta(days=hour_days)
+    ).delete()
+    days, _ = EventRollup.objects.filter(
+        granularity='day', bucket__lt=now - timedelta(days=day_days)
+    ).delete()
+    return events, hours, days
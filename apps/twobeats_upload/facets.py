@@ -0,0 +1,177 @@
+"""
+검색 필터 개수 (장르/태그별 결과 수)
+
+검색 화면의 장르/태그 필터 옆에 현재 검색 조건의 결과 수를 보여 준다.
+요청마다 태그 M2M 테이블 전체를 태그별로 세지 않도록
+
+- 검색어가 있으면: 검색 결과를 장르별/태그별로 묶은 두 GROUP BY 를 UNION ALL 로 합쳐 쿼리 1회
+  장르 개수에는 선택한 태그 조건만, 태그 개수에는 선택한 장르 조건만 적용
+  (다른 장르/태그로 바꿨을 때 나올 결과 수)
+- 검색어가 없으면: refresh_facets 명령이 미리 계산한 facet_count 테이블에서 읽음
+  (장르 x 태그 조합별 수까지 저장해 두므로 장르/태그 필터만 있는 경우도 테이블에서 끝남)
+  테이블이 아직 비어 있으면(배포 직후 등) 검색어가 있을 때와 같은 쿼리로 계산
+- 결과는 정규화한 검색어(소문자, 공백 하나로) + 장르 + 태그별로 5분 캐싱
+  곡/영상 업로드·수정·삭제, 태그 변경, 테이블 갱신 시 facets:<대상> 세대 번호로 무효화 (invalidation.py)
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import CharField, Count, F, Q, Value
+from django.utils import timezone
+
+from .invalidation import generations, invalidate
+from .models import FacetCount, Music, Video
+from .search import search
+from .singleflight import cached
+
+# 모델 -> (facet_count.target, 장르 필드)
+FACET_TARGETS = {
+    Music: ('music', 'music_type'),
+    Video: ('video', 'video_type'),
+}
+
+FACET_CACHE_TIMEOUT = 60 * 5
+
+
+def facet_scope(model):
+    return f'facets:{FACET_TARGETS[model][0]}'
+
+
+def normalize_query(query):
+    """캐시 키용 검색어 (대소문자/공백 차이는 같은 검색)"""
+    return ' '.join(query.lower().split())
+
+
+def _grouped_counts(model, query, genre, tag):
+    """
+    검색 결과의 장르별/태그별 수를 쿼리 1회로 계산
+    :return: ({장르: 수}, {태그: 수})
+    """
+    _, genre_field = FACET_TARGETS[model]
+    items = search(model.objects.all(), query) if query else model.objects.all()
+
+    by_genre = items.filter(tags__name=tag) if tag else items
+    by_tag = items.filter(**{genre_field: genre}) if genre else items
+    label = CharField()
+    # 검색 쿼리셋의 정렬/일치 점수는 묶음 쿼리에 필요 없으므로 values() 로 가리고 정렬은 지움
+    genre_rows = (
+        by_genre.order_by()
+        .annotate(facet=Value('genre', output_field=label), value=F(genre_field))
+        .values('facet', 'value')
+        .annotate(n=Count('pk'))
+    )
+    tag_rows = (
+        by_tag.order_by()
+        .annotate(facet=Value('tag', output_field=label), value=F('tags__name'))
+        .filter(value__isnull=False)
+        .values('facet', 'value')
+        .annotate(n=Count('pk'))
+    )
+
+    genres, tags = {}, {}
+    for facet, value, count in genre_rows.union(tag_rows, all=True).values_list('facet', 'value', 'n'):
+        (genres if facet == 'genre' else tags)[value] = count
+    return genres, tags
+
+
+def _stored_counts(model, genre, tag):
+    """
+    facet_count 테이블에서 장르별/태그별 수 (행이 하나도 없으면 None)
+    장르 개수는 (장르, 선택한 태그 또는 '') 행, 태그 개수는 (선택한 장르 또는 '', 태그) 행
+    """
+    target, _ = FACET_TARGETS[model]
+    rows = FacetCount.objects.filter(target=target).filter(
+        Q(tag=tag, genre__gt='') | Q(genre=genre, tag__gt='') | Q(genre='', tag='')
+    ).values_list('genre', 'tag', 'count')
+
+    genres, tags = {}, {}
+    found = False
+    for row_genre, row_tag, count in rows:
+        found = True
+        if row_genre and row_tag == tag:
+            genres[row_genre] = count
+        if row_tag and row_genre == genre:
+            tags[row_tag] = count
+    return (genres, tags) if found else None
+
+
+def _compute(model, query, genre, tag):
+    counts = None if query else _stored_counts(model, genre, tag)
+    if counts is None:
+        counts = _grouped_counts(model, query, genre, tag)
+    genres, tags = counts
+
+    result = {
+        'genres': [
+            {'value': value, 'label': label, 'count': genres.get(value, 0)}
+            for value, label in model.GENRE_CHOICES
+        ],
+        'tags': [
+            {'name': name, 'count': count}
+            for name, count in sorted(tags.items(), key=lambda item: (-item[1], item[0]))
+            if count > 0
+        ],
+    }
+    # 선택한 태그는 결과가 0개여도 필터 목록에서 빠지지 않게 남김
+    if tag and tag not in tags:
+        result['tags'].append({'name': tag, 'count': 0})
+    return result
+
+
+def facet_counts(model, query='', genre='', tag=''):
+    """
+    현재 검색 조건의 필터별 결과 수
+    :return: {'genres': [{'value', 'label', 'count'}] (장르 선택지 순),
+              'tags': [{'name', 'count'}] (개수 많은 순, 0개 제외)}
+    """
+    query = normalize_query(query)
+    generation, = generations(facet_scope(model))
+    return cached(
+        f'facets:{FACET_TARGETS[model][0]}:{genre}:{tag}:{query}',
+        lambda: _compute(model, query, genre, tag),
+        FACET_CACHE_TIMEOUT,
+        generation=generation,
+    )
+
+
+def refresh_facets(models=None):
+    """
+    facet_count 테이블 갱신 (장르별, 태그별, 장르 x 태그별 수)
+    대상 하나를 트랜잭션 하나로 교체하므로 조회 중인 화면은 이전/새 값 중 하나만 본다.
+    :return: {대상: 저장한 행 수}
+    """
+    result = {}
+    for model in models or FACET_TARGETS:
+        target, genre_field = FACET_TARGETS[model]
+        through = model.tags.through
+        item_field = model._meta.model_name
+
+        genres = dict(
+            model.objects.order_by().values(genre_field).annotate(n=Count('pk')).values_list(genre_field, 'n')
+        )
+        # 곡/영상은 장르가 하나뿐이므로 태그별 수 = 장르 x 태그 수의 합
+        pairs = (
+            through.objects.order_by()
+            .values(f'{item_field}__{genre_field}', 'tag__name')
+            .annotate(n=Count('pk'))
+            .values_list(f'{item_field}__{genre_field}', 'tag__name', 'n')
+        )
+        counts = {(genre, ''): count for genre, count in genres.items()}
+        counts[('', '')] = sum(genres.values())
+        tags = defaultdict(int)
+        for genre, tag, count in pairs:
+            counts[(genre, tag)] = count
+            tags[tag] += count
+        counts.update({('', tag): count for tag, count in tags.items()})
+
+        now = timezone.now()
+        rows = [
+            FacetCount(target=target, genre=genre, tag=tag, count=count, refreshed_at=now)
+            for (genre, tag), count in counts.items()
+        ]
+        with transaction.atomic():
+            FacetCount.objects.filter(target=target).delete()
+            FacetCount.objects.bulk_create(rows, batch_size=1000)
+            invalidate(facet_scope(model))
+        result[target] = len(rows)
+    return result
@@ -0,0 +1,69 @@
+"""
+한글 초성/자모 검색 키
+
+"ㅅㄱㅇ" 처럼 초성만 치거나 "아이ㅇ" 처럼 글자를 치는 중이어도 찾을 수 있도록
+제목/가수를 초성 키, 자모 키로 풀어 저장해 두고(업로드/수정 시 signals.py) 같은 방식으로 푼 검색어로 찾는다.
+
+- 초성 키: 완성형 글자 -> 초성, 그 외 글자는 소문자 그대로 (공백 제외)
+  "사랑의 노래" -> "ㅅㄹㅇㄴㄹ"
+- 자모 키: 완성형 글자 -> 초성+중성+종성, 겹받침/이중모음은 낱자로 (공백 제외)
+  "닭" -> "ㄷㅏㄹㄱ" (치는 중인 "달ㄱ" 과 같아짐)
+"""
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSUNG = ['', *'ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ']
+
+# 겹받침/이중모음 -> 낱자 (키보드로 치는 순서)
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+# 호환용 자모 (키보드로 치는 낱자) 범위
+JAMO_FIRST = 0x3131
+JAMO_LAST = 0x318E
+
+
+def _split(char):
+    code = ord(char) - SYLLABLE_BASE
+    return CHOSUNG[code // 588], JUNGSUNG[code // 28 % 21], JONGSUNG[code % 28]
+
+
+def _is_syllable(char):
+    return SYLLABLE_BASE <= ord(char) <= SYLLABLE_LAST
+
+
+def _is_jamo(char):
+    return JAMO_FIRST <= ord(char) <= JAMO_LAST
+
+
+def chosung_key(text):
+    return ''.join(
+        _split(char)[0] if _is_syllable(char) else char
+        for char in (text or '').lower() if not char.isspace()
+    )
+
+
+def jamo_key(text):
+    parts = []
+    for char in (text or '').lower():
+        if char.isspace():
+            continue
+        for jamo in (_split(char) if _is_syllable(char) else (char,)):
+            parts.append(COMPOUND_JAMO.get(jamo, jamo))
+    return ''.join(parts)
+
+
+def is_chosung_query(query):
+    """공백을 뺀 검색어가 모두 자음 낱자인지 (초성 검색)"""
+    chars = [char for char in query if not char.isspace()]
+    return bool(chars) and all(char in CHOSUNG for char in chars)
+
+
+def has_jamo(query):
+    """검색어에 낱자가 섞여 있는지 (글자를 치는 중, 자모 검색)"""
+    return any(_is_jamo(char) for char in query)
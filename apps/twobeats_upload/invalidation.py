@@ -0,0 +1,110 @@
+"""
+이벤트 기반 캐시 무효화 (세대 번호)
+
+TTL 이 끝날 때까지 업로드/좋아요/태그 변경이 안 보이지 않도록
+데이터가 바뀌면(signals.py, 좋아요 토글) 영향받는 범위(scope)의 세대 번호만 바꾼다.
+
+- 캐시 키에 범위별 세대 번호를 넣어 두면(generations) 번호가 바뀌는 순간 이전 키는 더 읽히지 않고
+  TTL 로 조용히 사라진다 (검색어 등으로 키가 여러 개여도 범위 단위로 한 번에 무효화)
+- 세대 번호는 공유 캐시(cache_tier.py)에 있으므로 다른 레플리카/워커에도 바로 보인다
+  (LISTEN/NOTIFY 같은 별도 전파가 필요 없음, L1 에 두는 키도 새 번호로 키가 바뀜)
+- 트랜잭션 커밋 후에 바꾸고(커밋 전 데이터로 새 키가 채워지는 것 방지),
+  좋아요처럼 잦은 변경은 BufferedWriter 로 모아 주기마다 한 번만 바꾼다
+
+범위
+- top_videos:<영상 타입>, top_videos:all  영상 리스트 인기 영상 TOP3
+- wc_pool:genre:<장르>, wc_pool:genre:all  월드컵 후보곡 풀
+- wc_pool:custom:<코드>                     커스텀 월드컵 후보곡 풀
+- tag_index:music, tag_index:video          태그 비트셋 인덱스 (tag_index.py)
+- autocomplete:music, autocomplete:video    검색 자동완성 인덱스 (autocomplete.py)
+- autocomplete:<music|video>:deleted        자동완성 인덱스의 삭제 행 정리 (곡/영상 삭제 시에만)
+- facets:music, facets:video                검색 필터 장르/태그별 개수 (facets.py)
+"""
+import atexit
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .counters import BufferedWriter
+from .models import Video
+
+logger = logging.getLogger(__name__)
+
+GENERATION_PREFIX = 'cache_gen'
+
+
+def generation_key(scope):
+    return f'{GENERATION_PREFIX}:{scope}'
+
+
+def generations(*scopes):
+    """범위별 현재 세대 번호 (한 번도 무효화되지 않았으면 0), 캐시 키에 넣어 씀"""
+    values = cache.get_many([generation_key(scope) for scope in scopes])
+    return tuple(values.get(generation_key(scope), 0) for scope in scopes)
+
+
+def video_scopes(video_type):
+    return {f'top_videos:{video_type}', 'top_videos:all'}
+
+
+def music_scopes(music_type):
+    return {f'wc_pool:genre:{music_type}', 'wc_pool:genre:all'}
+
+
+class Invalidator(BufferedWriter):
+    """무효화할 범위를 모아 두었다가 세대 번호를 바꾸는 버퍼"""
+
+    thread_name = 'cache-invalidate'
+
+    def __init__(self, interval=None, autoflush=True):
+        super().__init__(interval, autoflush)
+        self._scopes = set()
+        self._video_ids = set()
+
+    def add(self, scopes=(), video_ids=()):
+        with self._lock:
+            self._scopes.update(scopes)
+            self._video_ids.update(video_ids)
+        self._schedule_flush()
+
+    def flush(self):
+        """
+        모아 둔 범위의 세대 번호 변경
+        :return: 바꾼 범위 수
+        """
+        with self._lock:
+            if not self._scopes and not self._video_ids:
+                return 0
+            scopes, self._scopes = self._scopes, set()
+            video_ids, self._video_ids = self._video_ids, set()
+
+        try:
+            # 영상 id 로 받은 것(좋아요)은 한 번에 타입을 조회해 범위로 바꿈
+            if video_ids:
+                for video_type in set(
+                    Video.objects.filter(pk__in=video_ids).values_list('video_type', flat=True)
+                ):
+                    scopes |= video_scopes(video_type)
+            generation = time.time_ns()
+            cache.set_many({generation_key(scope): generation for scope in scopes}, None)
+        except Exception:
+            logger.exception('캐시 무효화 실패: %s', sorted(scopes))
+            return 0
+        return len(scopes)
+
+
+invalidator = Invalidator()
+atexit.register(invalidator.shutdown)
+
+
+def invalidate(*scopes):
+    """범위 무효화 (트랜잭션 안이면 커밋 후)"""
+    transaction.on_commit(lambda: invalidator.add(scopes=scopes))
+
+
+def invalidate_videos(video_ids):
+    """영상이 속한 타입의 인기 영상 캐시 무효화 (트랜잭션 안이면 커밋 후)"""
+    video_ids = [int(pk) for pk in video_ids]
+    transaction.on_commit(lambda: invalidator.add(video_ids=video_ids))
@@ -0,0 +1,176 @@
+"""
+음악/영상 좋아요 공용 서비스
+
+좋아요 토글은 PostgreSQL 에서 CTE 한 문장으로 처리한다.
+(삭제 시도 -> 없으면 추가 -> 좋아요수 증감 -> 새 상태/좋아요수 반환)
+MusicLike/VideoLike 의 unique_together(user, 대상) 제약을 ON CONFLICT 로 활용해
+동시에 여러 번 눌러도 좋아요수가 실제 행 수와 어긋나지 않는다.
+"""
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Greatest
+
+from apps.twobeats_music_explore.models import MusicLike
+from apps.twobeats_video_explore.models import VideoLike
+
+from .events import play_events
+from .models import Music, Video
+from .reconcile import COUNTERS_SYNCED_SQL
+from .scores import refresh_scores
+from .signals import invalidate_like
+
+# 종류 -> (좋아요 모델, 좋아요 모델의 대상 FK 필드, 대상 모델, 좋아요수 필드)
+LIKE_TARGETS = {
+    'music': (MusicLike, 'music', Music, 'music_like_count'),
+    'video': (VideoLike, 'video', Video, 'video_like_count'),
+}
+
+
+def toggle_like(user, kind, pk):
+    """
+    좋아요 토글
+    :param kind: 'music' 또는 'video'
+    :return: (is_liked, like_count), 대상이 없으면 None
+    """
+    if connection.vendor == 'postgresql':
+        result = _toggle_like_sql(user, kind, pk)
+    else:
+        result = _toggle_like_orm(user, kind, pk)
+
+    # 좋아요수가 바뀌었으므로 영상 인기/트렌딩 점수 갱신
+    if result is not None and kind == 'video':
+        refresh_scores(ids=[int(pk)])
+
+    # 좋아요 추가만 이벤트로 남김 (오늘/주간 차트 집계용)
+    if result is not None and result[0]:
+        play_events.record(f'{kind}_like', pk)
+
+    # 이번 요청에서 이미 확인한 좋아요 여부가 있으면 함께 갱신
+    checked = getattr(user, _liked_ids_attr(kind), None)
+    if result is not None and checked is not None:
+        checked[int(pk)] = result[0]
+    return result
+
+
+def _liked_ids_attr(kind):
+    return f'_liked_{kind}_ids'
+
+
+def liked_ids(user, kind, ids):
+    """
+    ids 중 사용자가 좋아요한 음악/영상 id 집합 (화면에 그리는 id 만 넘김)
+    확인한 결과를 request.user 객체에 저장해 두므로 한 요청 안에서 같은 id 는 다시 조회하지 않고,
+    처음 보는 id 만 모아 쿼리 1회로 확인한다.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    attr = _liked_ids_attr(kind)
+    checked = getattr(user, attr, None)
+    if checked is None:
+        checked = {}
+        setattr(user, attr, checked)
+
+    ids = {int(pk) for pk in ids}
+    missing = ids - checked.keys()
+    if missing:
+        like_model, fk_name, _, _ = LIKE_TARGETS[kind]
+        liked = set(
+            like_model.objects.filter(user=user, **{f'{fk_name}_id__in': missing})
+            .values_list(f'{fk_name}_id', flat=True)
+        )
+        checked.update({pk: pk in liked for pk in missing})
+    return {pk for pk in ids if checked[pk]}
+
+
+def like_status_batch(user, kind, ids):
+    """
+    여러 음악/영상의 좋아요 여부와 좋아요수를 쿼리 1회로 조회
+    :return: {id: {'is_liked': bool, 'like_count': int}} (존재하지 않는 id 는 제외)
+    """
+    like_model, fk_name, target_model, count_field = LIKE_TARGETS[kind]
+    targets = target_model.objects.filter(pk__in=ids)
+
+    if user.is_authenticated:
+        targets = targets.annotate(is_liked=Exists(
+            like_model.objects.filter(user=user, **{fk_name: OuterRef('pk')})
+        ))
+        rows = targets.values_list('pk', count_field, 'is_liked')
+    else:
+        rows = ((pk, like_count, False) for pk, like_count in targets.values_list('pk', count_field))
+
+    return {
+        pk: {'is_liked': is_liked, 'like_count': like_count}
+        for pk, like_count, is_liked in rows
+    }
+
+
+def _toggle_like_sql(user, kind, pk):
+    like_model, fk_name, target_model, count_field = LIKE_TARGETS[kind]
+    qn = connection.ops.quote_name
+
+    like_table = qn(like_model._meta.db_table)
+    user_col = qn(like_model._meta.get_field('user').column)
+    fk_col = qn(like_model._meta.get_field(fk_name).column)
+    created_col = qn(like_model._meta.get_field('created_at').column)
+    target_table = qn(target_model._meta.db_table)
+    target_pk = qn(target_model._meta.pk.column)
+    count_col = qn(target_model._meta.get_field(count_field).column)
+
+    # del 이 비어 있고 ins 도 비어 있으면 = 동시 요청이 먼저 추가한 것 (ON CONFLICT) -> 좋아요 상태
+    # 좋아요수를 같은 문장에서 맞추므로 counter_dirty 트리거는 건너뛰도록 표시 (같은 왕복, reconcile.py)
+    sql = f"""
+        {COUNTERS_SYNCED_SQL};
+        WITH del AS (
+            DELETE FROM {like_table}
+            WHERE {user_col} = %(user)s AND {fk_col} = %(pk)s
+            RETURNING 1
+        ), ins AS (
+            INSERT INTO {like_table} ({user_col}, {fk_col}, {created_col})
+            SELECT %(user)s, %(pk)s, NOW()
+            WHERE NOT EXISTS (SELECT 1 FROM del)
+            ON CONFLICT ({user_col}, {fk_col}) DO NOTHING
+            RETURNING 1
+        )
+        UPDATE {target_table}
+        SET {count_col} = GREATEST(
+            {count_col} + (SELECT COUNT(*) FROM ins) - (SELECT COUNT(*) FROM del), 0
+        )
+        WHERE {target_pk} = %(pk)s
+        RETURNING EXISTS (SELECT 1 FROM ins) OR NOT EXISTS (SELECT 1 FROM del), {count_col}
+    """
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'user': user.pk, 'pk': pk})
+            row = cursor.fetchone()
+        if row is None:
+            # 대상이 없음: FK 검사(커밋 시점)에 걸리기 전에 롤백
+            transaction.set_rollback(True)
+            return None
+        # ORM 을 거치지 않아 post_save/post_delete 가 오지 않으므로 같은 무효화를 직접 (signals.py)
+        invalidate_like(like_model, like_model(user=user, **{f'{fk_name}_id': int(pk)}))
+    return bool(row[0]), row[1]
+
+
+def _toggle_like_orm(user, kind, pk):
+    """PostgreSQL 이 아닌 DB(개발용 SQLite 등)에서의 대체 구현"""
+    like_model, fk_name, target_model, count_field = LIKE_TARGETS[kind]
+
+    with transaction.atomic():
+        target = target_model.objects.select_for_update().filter(pk=pk).first()
+        if target is None:
+            return None
+
+        deleted, _ = like_model.objects.filter(user=user, **{fk_name: target}).delete()
+        if deleted:
+            delta = -1
+        else:
+            like_model.objects.create(user=user, **{fk_name: target})
+            delta = 1
+
+        target_model.objects.filter(pk=pk).update(
+            **{count_field: Greatest(F(count_field) + delta, 0)}
+        )
+        like_count = target_model.objects.filter(pk=pk).values_list(count_field, flat=True).get()
+    return not deleted, like_count
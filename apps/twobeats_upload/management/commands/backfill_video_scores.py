@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.twobeats_upload.scores import id_ranges, refresh_scores
+
+
+class Command(BaseCommand):
+    help = '영상 인기/트렌딩 점수 채우기 (기존 영상, 점수 공식 변경 시)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000, help='한 문장에서 처리할 id 구간 크기')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='인기 점수가 같은 영상도 트렌딩 점수까지 다시 계산'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = 0
+        # 구간마다 커밋해 긴 트랜잭션으로 video 테이블을 오래 잠그지 않음
+        for start, end in id_ranges(options['chunk_size']):
+            with transaction.atomic():
+                updated += refresh_scores(id_range=(start, end), force=options['force'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'영상 점수 갱신 완료! ({updated}건, {elapsed:.2f}s)'))
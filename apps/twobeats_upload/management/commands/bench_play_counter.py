@@ -0,0 +1,85 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+
+from apps.twobeats_upload.counters import PlayCounterBuffer
+from apps.twobeats_upload.models import Music
+
+
+class UpdateCounter:
+    """실행된 UPDATE 문 수와 갱신된 행 수 집계"""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.lstrip().upper().startswith('UPDATE'):
+            self.statements += 1
+            self.rows += max(context['cursor'].rowcount, 0)
+        return result
+
+
+class Command(BaseCommand):
+    help = '재생수 반영 방식 비교 (행별 UPDATE vs write-behind 버퍼), 실행 후 롤백'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plays', type=int, default=10000, help='재생 횟수')
+        parser.add_argument('--tracks', type=int, default=100, help='대상 곡 수')
+        parser.add_argument(
+            '--flush-every', type=int, default=1000,
+            help='버퍼 반영 주기 (N초 동안 들어오는 재생 수를 가정)'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        track_ids = list(
+            Music.objects.order_by('id').values_list('id', flat=True)[:options['tracks']]
+        )
+        if not track_ids:
+            self.stdout.write(self.style.ERROR('음악이 없습니다. 먼저 create_sample_music 을 실행하세요.'))
+            return
+
+        # 인기곡에 재생이 몰리는 분포 (순위 r 의 가중치 1/r)
+        rng = random.Random(options['seed'])
+        weights = [1 / rank for rank in range(1, len(track_ids) + 1)]
+        plays = rng.choices(track_ids, weights=weights, k=options['plays'])
+
+        with transaction.atomic():
+            before = self._run_direct(plays)
+            after = self._run_buffered(plays, options['flush_every'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'재생 {len(plays)}회 / 곡 {len(track_ids)}개 / DB: {connection.vendor}')
+        for label, (counter, elapsed) in (('행별 UPDATE', before), ('write-behind', after)):
+            self.stdout.write(
+                f'{label:>14}: UPDATE {counter.statements}회, 갱신 행 {counter.rows}개, {elapsed * 1000:.1f}ms'
+            )
+        if after[0].rows:
+            self.stdout.write(self.style.SUCCESS(
+                f'갱신 행 {before[0].rows / after[0].rows:.1f}배 감소'
+            ))
+
+    def _run_direct(self, plays):
+        counter = UpdateCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            for music_id in plays:
+                Music.objects.filter(pk=music_id).update(music_count=F('music_count') + 1)
+        return counter, time.perf_counter() - started
+
+    def _run_buffered(self, plays, flush_every):
+        buffer = PlayCounterBuffer(autoflush=False)
+        counter = UpdateCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            for index, music_id in enumerate(plays, start=1):
+                buffer.incr('music_play', music_id)
+                if index % flush_every == 0:
+                    buffer.flush()
+            buffer.flush()
+        return counter, time.perf_counter() - started
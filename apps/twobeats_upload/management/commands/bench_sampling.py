@@ -0,0 +1,99 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from apps.twobeats_upload.models import Music
+from apps.twobeats_upload.sampling import sample_ids
+
+# 자유도 9 (10구간) 카이제곱 분포의 유의수준 1% 임계값
+CHI2_CRITICAL_DF9 = 21.666
+
+
+class Command(BaseCommand):
+    help = '무작위 샘플링 비교 (ORDER BY RANDOM() vs id 범위 샘플링) 및 균등성 검사, 실행 후 롤백'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='곡 수 (부족하면 임시로 채움)')
+        parser.add_argument('--count', type=int, default=16, help='한 번에 뽑을 곡 수')
+        parser.add_argument('--runs', type=int, default=200, help='id 범위 샘플링 반복 횟수')
+        parser.add_argument('--random-runs', type=int, default=3, help='ORDER BY RANDOM() 반복 횟수')
+        parser.add_argument('--uniformity-runs', type=int, default=2000, help='균등성 검사 반복 횟수')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['count']
+
+        with transaction.atomic():
+            self._fill(options['rows'], rng)
+            genre = Music.GENRE_CHOICES[0][0]
+            querysets = (
+                ('전체', Music.objects.all()),
+                (f'장르={genre}', Music.objects.filter(music_type=genre)),
+            )
+            self.stdout.write(f'곡 {Music.objects.count()}개 / {count}곡 추출 / DB: {connection.vendor}')
+
+            for label, queryset in querysets:
+                random_ms = self._time(
+                    lambda: list(queryset.order_by('?').values_list('pk', flat=True)[:count]),
+                    options['random_runs'],
+                )
+                sample_ms = self._time(lambda: sample_ids(queryset, count, rng), options['runs'])
+                self.stdout.write(
+                    f'{label:>12}: ORDER BY RANDOM() {random_ms:.2f}ms, id 범위 샘플링 {sample_ms:.3f}ms '
+                    f'({random_ms / sample_ms:.0f}배)'
+                )
+
+            self._check_uniformity(querysets[1][1], count, options['uniformity_runs'], rng)
+            transaction.set_rollback(True)
+
+    def _fill(self, rows, rng):
+        """곡이 rows 개보다 적으면 임시 곡으로 채우고 일부를 지워 id 사이에 빈칸을 만듦"""
+        missing = rows - Music.objects.count()
+        if missing <= 0:
+            return
+        User = get_user_model()
+        uploader = User.objects.first() or User.objects.create_user(username='bench-sampling', password=None)
+        genres = [value for value, _ in Music.GENRE_CHOICES]
+        for start in range(0, missing, 10000):
+            Music.objects.bulk_create([
+                Music(music_title=f'bench {start + i}', music_singer='bench', music_type=rng.choice(genres),
+                      music_root='music/bench.mp3', uploader=uploader)
+                for i in range(min(10000, missing - start))
+            ])
+        # 삭제된 곡 흉내 (id 의 약 1/10 이 비어 있음)
+        Music.objects.filter(music_singer='bench', music_title__endswith='7').delete()
+
+    def _time(self, func, runs):
+        started = time.perf_counter()
+        for _ in range(runs):
+            func()
+        return (time.perf_counter() - started) * 1000 / runs
+
+    def _check_uniformity(self, queryset, count, runs, rng):
+        """id 범위를 10구간으로 나눠 뽑힌 횟수가 구간별 곡 수에 비례하는지 카이제곱 검정"""
+        bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+        width = (bounds['high'] - bounds['low']) // 10 + 1
+        population = [0] * 10
+        for pk in queryset.values_list('pk', flat=True).iterator():
+            population[(pk - bounds['low']) // width] += 1
+
+        observed = [0] * 10
+        for _ in range(runs):
+            for pk in sample_ids(queryset, count, rng):
+                observed[(pk - bounds['low']) // width] += 1
+
+        total = sum(observed)
+        size = sum(population)
+        chi2 = sum(
+            (observed[i] - total * population[i] / size) ** 2 / (total * population[i] / size)
+            for i in range(10) if population[i]
+        )
+        style = self.style.SUCCESS if chi2 < CHI2_CRITICAL_DF9 else self.style.ERROR
+        self.stdout.write(style(
+            f'균등성: {runs}회 x {count}곡, 카이제곱 {chi2:.2f} (자유도 9, 1% 임계값 {CHI2_CRITICAL_DF9})'
+        ))
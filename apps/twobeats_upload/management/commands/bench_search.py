@@ -0,0 +1,91 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.twobeats_upload.models import Music
+from apps.twobeats_upload.search import search
+
+SYLLABLES = '가나다라마바사아자차카타파하사랑이별밤별꿈너나우리하늘바다노래봄여름겨울'
+WORDS = ['love', 'night', 'dream', 'blue', 'summer', 'remix', 'live', 'acoustic']
+
+
+class Command(BaseCommand):
+    help = '곡 검색 지연 시간 비교 (icontains vs 검색 인덱스, p50/p95), 실행 후 롤백'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='곡 수 (부족하면 임시로 채움)')
+        parser.add_argument('--queries', type=int, default=200, help='검색어 수')
+        parser.add_argument('--icontains-queries', type=int, default=20, help='icontains 로 돌릴 검색어 수')
+        parser.add_argument('--limit', type=int, default=20, help='한 페이지 결과 수')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        limit = options['limit']
+
+        with transaction.atomic():
+            self._fill(options['rows'], rng)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE music')
+            else:
+                self.stdout.write(self.style.WARNING('PostgreSQL 이 아니므로 검색 인덱스 없이 icontains 로 대체됨'))
+
+            titles = list(Music.objects.order_by('?').values_list('music_title', flat=True)[:options['queries']])
+            queries = [self._substring(title, rng) for title in titles]
+            self.stdout.write(f'곡 {Music.objects.count()}개 / 검색어 {len(queries)}개 / DB: {connection.vendor}')
+
+            def icontains(query):
+                return list(Music.objects.filter(
+                    Q(music_title__icontains=query) | Q(music_singer__icontains=query)
+                ).values_list('pk', flat=True)[:limit])
+
+            def indexed(query):
+                return list(search(Music.objects.all(), query).values_list('pk', flat=True)[:limit])
+
+            for label, func, sample in (
+                ('icontains', icontains, queries[:options['icontains_queries']]),
+                ('검색 인덱스', indexed, queries),
+            ):
+                timings = sorted(self._time(func, query) for query in sample)
+                p50 = timings[len(timings) // 2]
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(f'{label:>10}: p50 {p50:.2f}ms, p95 {p95:.2f}ms ({len(timings)}회)')
+            transaction.set_rollback(True)
+
+    def _fill(self, rows, rng):
+        """곡이 rows 개보다 적으면 한글/영문이 섞인 임시 곡으로 채움"""
+        missing = rows - Music.objects.count()
+        if missing <= 0:
+            return
+        User = get_user_model()
+        uploader = User.objects.first() or User.objects.create_user(username='bench-search', password=None)
+        genres = [value for value, _ in Music.GENRE_CHOICES]
+
+        def word():
+            if rng.random() < 0.3:
+                return rng.choice(WORDS)
+            return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+        for start in range(0, missing, 10000):
+            Music.objects.bulk_create([
+                Music(music_title=' '.join(word() for _ in range(rng.randint(1, 3))),
+                      music_singer=word(), music_type=rng.choice(genres), music_count=rng.randint(0, 10000),
+                      music_root='music/bench.mp3', uploader=uploader)
+                for _ in range(min(10000, missing - start))
+            ])
+
+    def _substring(self, title, rng):
+        """제목의 일부 (키 입력 중인 검색어 흉내, 2~4글자)"""
+        size = min(len(title), rng.randint(2, 4))
+        start = rng.randint(0, len(title) - size)
+        return title[start:start + size].strip() or title
+
+    def _time(self, func, query):
+        started = time.perf_counter()
+        func(query)
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = '캐시 키 계열별 적중/미스 횟수 (모든 워커 합계, 수 초 단위로 합산됨)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='출력 후 횟수 초기화')
+
+    def handle(self, *args, **options):
+        metrics = cache.metrics
+        report = metrics.report()
+        if not report:
+            self.stdout.write('기록된 캐시 조회가 없습니다.')
+            return
+
+        self.stdout.write(f'{"계열":<20}{"L1 적중":>10}{"공유 적중":>10}{"미스":>10}{"적중률":>10}')
+        for family, counts in sorted(report.items()):
+            total = sum(counts.values())
+            rate = (counts['l1_hit'] + counts['hit']) / total if total else 0
+            self.stdout.write(
+                f'{family:<20}{counts["l1_hit"]:>10}{counts["hit"]:>10}{counts["miss"]:>10}{rate:>10.1%}'
+            )
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS('횟수 초기화 완료'))
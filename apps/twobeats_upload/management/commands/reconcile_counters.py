@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.twobeats_upload.reconcile import (
+    RECONCILE_TARGETS,
+    reconcile_full,
+    reconcile_incremental,
+)
+
+
+class Command(BaseCommand):
+    help = '좋아요/댓글 카운터를 실제 좋아요/댓글 수로 재집계 (구간별 일괄 UPDATE)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', choices=sorted(RECONCILE_TARGETS),
+            help='재집계할 카운터 (여러 번 지정 가능, 기본: 전체)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=50000, help='한 문장에서 처리할 id 구간 크기')
+        parser.add_argument('--workers', type=int, default=1, help='id 구간 병렬 처리 스레드 수')
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='마지막 실행 이후 좋아요/댓글이 바뀐 항목만 재집계 (PostgreSQL)'
+        )
+
+    def handle(self, *args, **options):
+        targets = options['target'] or list(RECONCILE_TARGETS)
+        incremental = options['incremental']
+
+        if incremental and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                '변경 기록 트리거는 PostgreSQL 에서만 동작합니다. 전체 재집계로 진행합니다.'
+            ))
+            incremental = False
+
+        for target in targets:
+            started = time.perf_counter()
+            if incremental:
+                processed, updated = reconcile_incremental(target, options['chunk_size'])
+                detail = f'변경 {processed}건 확인, {updated}건 갱신'
+            else:
+                updated = reconcile_full(target, options['chunk_size'], options['workers'])
+                detail = f'{updated}건 갱신'
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'[OK] {target}: {detail} ({elapsed:.2f}s)')
+
+        self.stdout.write(self.style.SUCCESS('카운터 재집계 완료!'))
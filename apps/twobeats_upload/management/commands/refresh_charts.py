@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.twobeats_upload.charts import CHARTS, TRENDING_CHARTS, refresh_charts
+
+
+class Command(BaseCommand):
+    help = '음악/영상 차트 스냅샷 갱신 (차트/장르별 상위 순위를 미리 계산)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chart', action='append', choices=sorted([*CHARTS, *TRENDING_CHARTS]),
+            help='갱신할 차트 (여러 번 지정 가능, 기본: 전체)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        for chart_type, count in refresh_charts(options['chart']).items():
+            self.stdout.write(f'[OK] {chart_type}: {count}행')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'차트 스냅샷 갱신 완료! ({elapsed:.2f}s)'))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.twobeats_upload.facets import FACET_TARGETS, refresh_facets
+
+
+class Command(BaseCommand):
+    help = '검색 필터 개수 갱신 (장르/태그/장르 x 태그별 곡·영상 수를 미리 계산)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', choices=sorted(target for target, _ in FACET_TARGETS.values()),
+            help='갱신할 대상 (여러 번 지정 가능, 기본: 전체)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        models = [model for model, (target, _) in FACET_TARGETS.items() if target in (options['target'] or [target])]
+        for target, count in refresh_facets(models).items():
+            self.stdout.write(f'[OK] {target}: {count}행')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'검색 필터 개수 갱신 완료! ({elapsed:.2f}s)'))
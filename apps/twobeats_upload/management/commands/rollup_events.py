@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.twobeats_upload.events import purge, rollup
+
+
+class Command(BaseCommand):
+    help = '재생 이벤트를 시간/일 단위로 집계하고 보관 기간이 지난 이벤트/집계를 삭제'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=2,
+            help='다시 집계할 최근 시간 수 (늦게 적재된 이벤트까지 포함하도록 실행 주기보다 길게)'
+        )
+        parser.add_argument('--event-retention-days', type=int, default=3, help='원본 이벤트 보관 일수')
+        parser.add_argument('--hour-retention-days', type=int, default=7, help='시간 집계 보관 일수')
+        parser.add_argument('--day-retention-days', type=int, default=90, help='일 집계 보관 일수')
+
+    def handle(self, *args, **options):
+        # 일 집계는 그날의 시간 집계를 다시 더해 만들므로 어제 시간 집계까지는 남아 있어야 함
+        if options['hour_retention_days'] < 2:
+            raise CommandError('--hour-retention-days 는 2일 이상이어야 합니다.')
+
+        started = time.perf_counter()
+        hours, days = rollup(timezone.now() - timedelta(hours=options['hours']))
+        self.stdout.write(f'[OK] 집계: 시간 {hours}행, 일 {days}행')
+
+        events, hour_rows, day_rows = purge(
+            options['event_retention_days'],
+            options['hour_retention_days'],
+            options['day_retention_days'],
+        )
+        self.stdout.write(f'[OK] 삭제: 이벤트 {events}건, 시간 집계 {hour_rows}행, 일 집계 {day_rows}행')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'재생 이벤트 집계 완료! ({elapsed:.2f}s)'))
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:39
+
+from django.db import migrations, models
+
+
+# (대상 테이블, 카운터 이름, 대상 FK 컬럼)
+DIRTY_TRIGGERS = [
+    ('music_like', 'music_like', 'ml_music_id'),
+    ('video_like', 'video_like', 'vl_video_id'),
+    ('music_comment', 'music_comment', 'mc_music_id'),
+    ('video_comment', 'video_comment', 'vc_video_id'),
+]
+
+
+def backfill_comment_counts(apps, schema_editor):
+    schema_editor.execute(
+        'UPDATE music SET music_comment_count = '
+        '(SELECT COUNT(*) FROM music_comment WHERE music_comment.mc_music_id = music.id)'
+    )
+    schema_editor.execute(
+        'UPDATE video SET video_comment_count = '
+        '(SELECT COUNT(*) FROM video_comment WHERE video_comment.vc_video_id = video.id)'
+    )
+
+
+def create_dirty_triggers(apps, schema_editor):
+    # 트리거는 PostgreSQL 에서만 사용 (다른 DB는 --incremental 대신 전체 재집계)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("""
+        CREATE OR REPLACE FUNCTION mark_counter_dirty() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO counter_dirty (target, item_id, marked_at)
+                VALUES (TG_ARGV[0], (to_jsonb(NEW) ->> TG_ARGV[1])::bigint, NOW())
+                ON CONFLICT (target, item_id) DO NOTHING;
+            END IF;
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                INSERT INTO counter_dirty (target, item_id, marked_at)
+                VALUES (TG_ARGV[0], (to_jsonb(OLD) ->> TG_ARGV[1])::bigint, NOW())
+                ON CONFLICT (target, item_id) DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table, target, column in DIRTY_TRIGGERS:
+        schema_editor.execute(
+            f'CREATE TRIGGER {table}_counter_dirty '
+            f'AFTER INSERT OR DELETE OR UPDATE OF {column} ON {table} '
+            f"FOR EACH ROW EXECUTE FUNCTION mark_counter_dirty('{target}', '{column}')"
+        )
+
+
+def drop_dirty_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, _, _ in DIRTY_TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_counter_dirty ON {table}')
+    schema_editor.execute('DROP FUNCTION IF EXISTS mark_counter_dirty()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0003_video_video_like_count'),
+        ('twobeats_music_explore', '0001_initial'),
+        ('twobeats_video_explore', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='music',
+            name='music_comment_count',
+            field=models.IntegerField(default=0, verbose_name='댓글수'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_comment_count',
+            field=models.IntegerField(default=0, verbose_name='댓글수'),
+        ),
+        migrations.CreateModel(
+            name='CounterDirty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(max_length=30, verbose_name='카운터')),
+                ('item_id', models.BigIntegerField(verbose_name='대상 id')),
+                ('marked_at', models.DateTimeField(auto_now_add=True, verbose_name='기록일')),
+            ],
+            options={
+                'verbose_name': '카운터 재집계 대상',
+                'verbose_name_plural': '카운터 재집계 대상',
+                'db_table': 'counter_dirty',
+                'unique_together': {('target', 'item_id')},
+            },
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+        migrations.RunPython(create_dirty_triggers, drop_dirty_triggers),
+    ]
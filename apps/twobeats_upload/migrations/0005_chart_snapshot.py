@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0004_counter_reconcile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chart_type', models.CharField(max_length=30, verbose_name='차트')),
+                ('genre', models.CharField(blank=True, default='', max_length=20, verbose_name='장르')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='순위')),
+                ('item_id', models.BigIntegerField(verbose_name='대상 id')),
+                ('refreshed_at', models.DateTimeField(verbose_name='갱신일')),
+            ],
+            options={
+                'verbose_name': '차트 스냅샷',
+                'verbose_name_plural': '차트 스냅샷',
+                'db_table': 'chart_snapshot',
+                'ordering': ['chart_type', 'genre', 'position'],
+                'unique_together': {('chart_type', 'genre', 'position')},
+            },
+        ),
+    ]
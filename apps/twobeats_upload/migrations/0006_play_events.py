@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:52
+
+from django.db import migrations, models
+
+
+def create_occurred_at_index(apps, schema_editor):
+    # 추가 전용 + 시간순 적재 테이블이므로 PostgreSQL 에서는 작고 갱신 비용이 거의 없는 BRIN 인덱스 사용
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX play_event_occurred_at ON play_event USING brin (occurred_at)')
+    else:
+        schema_editor.execute('CREATE INDEX play_event_occurred_at ON play_event (occurred_at)')
+
+
+def drop_occurred_at_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX play_event_occurred_at')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0005_chart_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20, verbose_name='종류')),
+                ('item_id', models.BigIntegerField(verbose_name='대상 id')),
+                ('occurred_at', models.DateTimeField(verbose_name='발생일')),
+            ],
+            options={
+                'verbose_name': '재생 이벤트',
+                'verbose_name_plural': '재생 이벤트',
+                'db_table': 'play_event',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', '시간'), ('day', '일')], max_length=10, verbose_name='단위')),
+                ('kind', models.CharField(max_length=20, verbose_name='종류')),
+                ('bucket', models.DateTimeField(verbose_name='구간 시작')),
+                ('item_id', models.BigIntegerField(verbose_name='대상 id')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='횟수')),
+            ],
+            options={
+                'verbose_name': '재생 이벤트 집계',
+                'verbose_name_plural': '재생 이벤트 집계',
+                'db_table': 'event_rollup',
+                'unique_together': {('granularity', 'kind', 'bucket', 'item_id')},
+            },
+        ),
+        migrations.RunPython(create_occurred_at_index, drop_occurred_at_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0006_play_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='video_popularity',
+            field=models.IntegerField(default=0, verbose_name='인기 점수'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_trending_score',
+            field=models.FloatField(default=0, verbose_name='트렌딩 점수'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['video_popularity', 'id'], name='video_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['video_type', 'video_popularity', 'id'], name='video_type_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['video_trending_score', 'id'], name='video_trending_idx'),
+        ),
+    ]
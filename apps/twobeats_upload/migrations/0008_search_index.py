@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:41
+
+from django.db import migrations
+
+
+# (테이블, n-gram 컬럼, 제목 컬럼, 가수 컬럼)
+SEARCH_TABLES = [
+    ('music', 'music_search', 'music_title', 'music_singer'),
+    ('video', 'video_search', 'video_title', 'video_singer'),
+]
+
+
+def create_search_index(apps, schema_editor):
+    # 검색 인덱스는 PostgreSQL 에서만 사용 (다른 DB는 icontains, search.py 참고)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # 공백으로 나눈 단어별 글자 1-gram + 2-gram
+    schema_editor.execute(r"""
+        CREATE OR REPLACE FUNCTION twobeats_ngrams(txt text) RETURNS tsvector AS $$
+            SELECT COALESCE(array_to_tsvector(array_agg(DISTINCT substr(word, i, n))), ''::tsvector)
+            FROM regexp_split_to_table(lower(COALESCE(txt, '')), '\s+') AS word,
+                 generate_series(1, 2) AS n,
+                 generate_series(1, char_length(word)) AS i
+            WHERE word <> '' AND i + n - 1 <= char_length(word)
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+    for table, vector, title, singer in SEARCH_TABLES:
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD COLUMN {vector} tsvector '
+            f"GENERATED ALWAYS AS (twobeats_ngrams({title} || ' ' || {singer})) STORED"
+        )
+        schema_editor.execute(f'CREATE INDEX {vector}_gin ON {table} USING gin ({vector})')
+        schema_editor.execute(f'CREATE INDEX {title}_trgm ON {table} USING gin ({title} gin_trgm_ops)')
+        schema_editor.execute(f'CREATE INDEX {singer}_trgm ON {table} USING gin ({singer} gin_trgm_ops)')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, vector, title, singer in SEARCH_TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {title}_trgm')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {singer}_trgm')
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS {vector}')
+    schema_editor.execute('DROP FUNCTION IF EXISTS twobeats_ngrams(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0007_video_scores'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
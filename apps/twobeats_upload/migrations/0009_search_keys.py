@@ -0,0 +1,145 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:25
+
+from django.db import migrations, models
+
+# 백필용 초성/자모 키 함수 (apps/twobeats_upload/hangul.py 의 이 시점 복사본,
+# 이후 hangul.py 가 바뀌어도 이 마이그레이션의 결과는 달라지지 않도록 그대로 둠)
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSUNG = ['', *'ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ']
+
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+
+def _split(char):
+    code = ord(char) - SYLLABLE_BASE
+    return CHOSUNG[code // 588], JUNGSUNG[code // 28 % 21], JONGSUNG[code % 28]
+
+
+def _is_syllable(char):
+    return SYLLABLE_BASE <= ord(char) <= SYLLABLE_LAST
+
+
+def chosung_key(text):
+    return ''.join(
+        _split(char)[0] if _is_syllable(char) else char
+        for char in (text or '').lower() if not char.isspace()
+    )
+
+
+def jamo_key(text):
+    parts = []
+    for char in (text or '').lower():
+        if char.isspace():
+            continue
+        for jamo in (_split(char) if _is_syllable(char) else (char,)):
+            parts.append(COMPOUND_JAMO.get(jamo, jamo))
+    return ''.join(parts)
+
+
+# (모델, 테이블, 키를 만들 원본 필드 접두어)
+SEARCH_KEY_MODELS = [
+    ('Music', 'music', 'music'),
+    ('Video', 'video', 'video'),
+]
+
+
+def backfill_search_keys(apps, schema_editor):
+    for model_name, _, prefix in SEARCH_KEY_MODELS:
+        model = apps.get_model('twobeats_upload', model_name)
+        # (키 필드, 원본 필드, 키 함수, 최대 길이)
+        keys = [
+            (f'{prefix}_{source}_{suffix}', f'{prefix}_{source}', key_func,
+             model._meta.get_field(f'{prefix}_{source}_{suffix}').max_length)
+            for source in ('title', 'singer')
+            for suffix, key_func in (('chosung', chosung_key), ('jamo', jamo_key))
+        ]
+        batch = []
+        for item in model.objects.only('pk', f'{prefix}_title', f'{prefix}_singer').iterator(chunk_size=2000):
+            for field, source, key_func, max_length in keys:
+                setattr(item, field, key_func(getattr(item, source))[:max_length])
+            batch.append(item)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, [field for field, *_ in keys])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [field for field, *_ in keys])
+
+
+def create_search_key_indexes(apps, schema_editor):
+    # 부분 문자열 검색(LIKE '%...%')용 트라이그램 인덱스는 PostgreSQL 에서만 (pg_trgm 은 0008 에서 생성)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, table, prefix in SEARCH_KEY_MODELS:
+        for source in ('title', 'singer'):
+            for suffix in ('chosung', 'jamo'):
+                column = f'{prefix}_{source}_{suffix}'
+                schema_editor.execute(f'CREATE INDEX {column}_trgm ON {table} USING gin ({column} gin_trgm_ops)')
+
+
+def drop_search_key_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, _, prefix in SEARCH_KEY_MODELS:
+        for source in ('title', 'singer'):
+            for suffix in ('chosung', 'jamo'):
+                schema_editor.execute(f'DROP INDEX IF EXISTS {prefix}_{source}_{suffix}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='music',
+            name='music_singer_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='가수 초성'),
+        ),
+        migrations.AddField(
+            model_name='music',
+            name='music_singer_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500, verbose_name='가수 자모'),
+        ),
+        migrations.AddField(
+            model_name='music',
+            name='music_title_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='제목 초성'),
+        ),
+        migrations.AddField(
+            model_name='music',
+            name='music_title_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1000, verbose_name='제목 자모'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_singer_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='가수 초성'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_singer_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500, verbose_name='가수 자모'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_title_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='제목 초성'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_title_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1000, verbose_name='제목 자모'),
+        ),
+        migrations.RunPython(backfill_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(create_search_key_indexes, drop_search_key_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0009_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='music',
+            index=models.Index(fields=['music_created_at', 'id'], name='music_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='music',
+            index=models.Index(fields=['music_type', 'music_created_at', 'id'], name='music_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['video_created_at', 'id'], name='video_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['video_type', 'video_created_at', 'id'], name='video_type_created_idx'),
+        ),
+    ]
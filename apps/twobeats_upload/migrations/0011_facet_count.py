@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0010_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(max_length=10, verbose_name='대상')),
+                ('genre', models.CharField(blank=True, default='', max_length=20, verbose_name='장르')),
+                ('tag', models.CharField(blank=True, default='', max_length=50, verbose_name='태그')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='개수')),
+                ('refreshed_at', models.DateTimeField(verbose_name='갱신일')),
+            ],
+            options={
+                'verbose_name': '검색 필터 개수',
+                'verbose_name_plural': '검색 필터 개수',
+                'db_table': 'facet_count',
+                'unique_together': {('target', 'genre', 'tag')},
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:30
+
+from django.db import migrations
+
+# 0004 의 mark_counter_dirty 에 twobeats.counters_synced 확인만 추가
+# (좋아요 토글/댓글 작성·삭제는 같은 트랜잭션에서 카운터를 맞추므로 기록하지 않음, reconcile.py)
+FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION mark_counter_dirty() RETURNS trigger AS $$
+    BEGIN
+        {skip}
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO counter_dirty (target, item_id, marked_at)
+            VALUES (TG_ARGV[0], (to_jsonb(NEW) ->> TG_ARGV[1])::bigint, NOW())
+            ON CONFLICT (target, item_id) DO NOTHING;
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            INSERT INTO counter_dirty (target, item_id, marked_at)
+            VALUES (TG_ARGV[0], (to_jsonb(OLD) ->> TG_ARGV[1])::bigint, NOW())
+            ON CONFLICT (target, item_id) DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+SKIP_SYNCED = """
+        IF current_setting('twobeats.counters_synced', true) = 'on' THEN
+            RETURN NULL;
+        END IF;
+"""
+
+
+def skip_synced(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(FUNCTION_SQL.format(skip=SKIP_SYNCED))
+
+
+def always_mark(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(FUNCTION_SQL.format(skip=''))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0011_facet_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(skip_synced, always_mark),
+    ]
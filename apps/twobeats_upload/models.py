@@ -34,6 +34,36 @@ class Music(models.Model):
         verbose_name='가수'
     )
 
+    # 초성/자모 검색 키 (저장 시 자동 계산, hangul.py / signals.py 참고)
+    music_title_chosung = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='제목 초성'
+    )
+    music_title_jamo = models.CharField(
+        max_length=1000,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='제목 자모'
+    )
+    music_singer_chosung = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='가수 초성'
+    )
+    music_singer_jamo = models.CharField(
+        max_length=500,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='가수 자모'
+    )
+
     # 장르 (선택형 - 하나만 선택!)
     GENRE_CHOICES = [
         ('ballad', '발라드'),
@@ -75,6 +105,10 @@ class Music(models.Model):
         default=0,
         verbose_name='좋아요수'
     )
+    music_comment_count = models.IntegerField(
+        default=0,
+        verbose_name='댓글수'
+    )
     
     # 업로더
     uploader = models.ForeignKey(
@@ -106,6 +140,11 @@ class Music(models.Model):
     class Meta:
         db_table = 'music'
         ordering = ['-music_created_at']
+        indexes = [
+            # 커서 페이지네이션 (ORDER BY 생성일 DESC, id DESC 다음 페이지를 인덱스 범위 스캔으로 처리)
+            models.Index(fields=['music_created_at', 'id'], name='music_created_idx'),
+            models.Index(fields=['music_type', 'music_created_at', 'id'], name='music_type_created_idx'),
+        ]
         verbose_name = '음악'
         verbose_name_plural = '음악'
     
@@ -125,6 +164,36 @@ class Video(models.Model):
         verbose_name='아티스트'
     )
 
+    # 초성/자모 검색 키 (저장 시 자동 계산, hangul.py / signals.py 참고)
+    video_title_chosung = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='제목 초성'
+    )
+    video_title_jamo = models.CharField(
+        max_length=1000,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='제목 자모'
+    )
+    video_singer_chosung = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='가수 초성'
+    )
+    video_singer_jamo = models.CharField(
+        max_length=500,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='가수 자모'
+    )
+
     GENRE_CHOICES = [
         ('mv', '뮤직비디오'),
         ('performance', '퍼포먼스'),
@@ -173,6 +242,19 @@ class Video(models.Model):
         default=0,
         verbose_name='좋아요수'
     )
+    video_comment_count = models.IntegerField(
+        default=0,
+        verbose_name='댓글수'
+    )
+    # 인기/트렌딩 점수 (카운터가 바뀔 때 다시 계산해 저장, scores.py 참고)
+    video_popularity = models.IntegerField(
+        default=0,
+        verbose_name='인기 점수'
+    )
+    video_trending_score = models.FloatField(
+        default=0,
+        verbose_name='트렌딩 점수'
+    )
     
     # 업로더
     video_user = models.ForeignKey(
@@ -204,12 +286,195 @@ class Video(models.Model):
     class Meta:
         db_table = 'video'
         ordering = ['-video_created_at']
+        indexes = [
+            # 상위 N 조회 (ORDER BY 점수 DESC, id DESC 를 인덱스 역방향 스캔으로 처리)
+            models.Index(fields=['video_popularity', 'id'], name='video_popularity_idx'),
+            models.Index(fields=['video_type', 'video_popularity', 'id'], name='video_type_popularity_idx'),
+            models.Index(fields=['video_trending_score', 'id'], name='video_trending_idx'),
+            # 커서 페이지네이션 (최신순 목록)
+            models.Index(fields=['video_created_at', 'id'], name='video_created_idx'),
+            models.Index(fields=['video_type', 'video_created_at', 'id'], name='video_type_created_idx'),
+        ]
         verbose_name = '영상'
         verbose_name_plural = '영상'
     
     def __str__(self):
         return self.video_title
-    
+
+
+class CounterDirty(models.Model):
+    """
+    카운터 재집계 대상 (좋아요/댓글 테이블이 바뀐 음악/영상 id)
+    - PostgreSQL 트리거가 music_like, video_like, music_comment, video_comment 변경 시 기록
+    - reconcile_counters --incremental 이 읽고 지움
+    """
+
+    target = models.CharField(
+        max_length=30,
+        verbose_name='카운터'
+    )
+    item_id = models.BigIntegerField(
+        verbose_name='대상 id'
+    )
+    marked_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='기록일'
+    )
+
+    class Meta:
+        db_table = 'counter_dirty'
+        unique_together = ('target', 'item_id')
+        verbose_name = '카운터 재집계 대상'
+        verbose_name_plural = '카운터 재집계 대상'
+
+    def __str__(self):
+        return f"{self.target}:{self.item_id}"
+
+
+class ChartSnapshot(models.Model):
+    """
+    차트 스냅샷 (차트/장르별 순위 -> 음악/영상 id)
+    - refresh_charts 명령이 주기적으로 통째로 다시 계산해 교체
+    - 차트 화면은 전체 테이블 정렬 대신 이 테이블의 순위만 읽는다 (charts.py 참고)
+    - 순위 0 행은 (차트, 장르) 갱신 표시 (결과가 없는 장르도 갱신된 빈 차트로 구분)
+    """
+
+    chart_type = models.CharField(
+        max_length=30,
+        verbose_name='차트'
+    )
+    genre = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        verbose_name='장르'  # '' = 전체
+    )
+    position = models.PositiveSmallIntegerField(
+        verbose_name='순위'
+    )
+    item_id = models.BigIntegerField(
+        verbose_name='대상 id'
+    )
+    refreshed_at = models.DateTimeField(
+        verbose_name='갱신일'
+    )
+
+    class Meta:
+        db_table = 'chart_snapshot'
+        unique_together = ('chart_type', 'genre', 'position')
+        ordering = ['chart_type', 'genre', 'position']
+        verbose_name = '차트 스냅샷'
+        verbose_name_plural = '차트 스냅샷'
+
+    def __str__(self):
+        return f"{self.chart_type}[{self.genre or 'all'}] #{self.position}"
+
+
+class PlayEvent(models.Model):
+    """
+    재생/조회/좋아요 이벤트 로그 (추가 전용)
+    - 워커 메모리에 모았다가 COPY 로 일괄 적재 (events.py 참고)
+    - rollup_events 명령이 시간/일 단위로 집계한 뒤 보관 기간이 지나면 삭제
+    """
+
+    kind = models.CharField(
+        max_length=20,
+        verbose_name='종류'  # music_play, video_play, video_view, music_like, video_like
+    )
+    item_id = models.BigIntegerField(
+        verbose_name='대상 id'
+    )
+    occurred_at = models.DateTimeField(
+        verbose_name='발생일'
+    )
+
+    class Meta:
+        db_table = 'play_event'
+        verbose_name = '재생 이벤트'
+        verbose_name_plural = '재생 이벤트'
+
+    def __str__(self):
+        return f"{self.kind}:{self.item_id} @ {self.occurred_at}"
+
+
+class EventRollup(models.Model):
+    """재생 이벤트 시간/일 단위 집계 (오늘/주간 차트용)"""
+
+    GRANULARITY_CHOICES = [
+        ('hour', '시간'),
+        ('day', '일'),
+    ]
+
+    granularity = models.CharField(
+        max_length=10,
+        choices=GRANULARITY_CHOICES,
+        verbose_name='단위'
+    )
+    kind = models.CharField(
+        max_length=20,
+        verbose_name='종류'
+    )
+    bucket = models.DateTimeField(
+        verbose_name='구간 시작'
+    )
+    item_id = models.BigIntegerField(
+        verbose_name='대상 id'
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='횟수'
+    )
+
+    class Meta:
+        db_table = 'event_rollup'
+        unique_together = ('granularity', 'kind', 'bucket', 'item_id')
+        verbose_name = '재생 이벤트 집계'
+        verbose_name_plural = '재생 이벤트 집계'
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket} {self.kind}:{self.item_id} = {self.count}"
+
+class FacetCount(models.Model):
+    """
+    검색 필터 개수 (대상/장르/태그별 곡·영상 수)
+    - refresh_facets 명령이 주기적으로 통째로 다시 계산해 교체
+    - 검색어가 없을 때 장르/태그 필터 옆 개수를 이 테이블에서 읽는다 (facets.py 참고)
+    - genre/tag 가 '' 이면 전체: (장르, '') 장르별 수, ('', 태그) 태그별 수, (장르, 태그) 장르 안의 태그별 수
+    """
+
+    target = models.CharField(
+        max_length=10,
+        verbose_name='대상'  # music / video
+    )
+    genre = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        verbose_name='장르'
+    )
+    tag = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='태그'
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='개수'
+    )
+    refreshed_at = models.DateTimeField(
+        verbose_name='갱신일'
+    )
+
+    class Meta:
+        db_table = 'facet_count'
+        unique_together = ('target', 'genre', 'tag')
+        verbose_name = '검색 필터 개수'
+        verbose_name_plural = '검색 필터 개수'
+
+    def __str__(self):
+        return f"{self.target}[{self.genre or 'all'}/{self.tag or 'all'}] = {self.count}"
+
 # class MusicLike(models.Model):
 #     """음악 좋아요 (유저별 1곡당 1번)"""
 #     user = models.ForeignKey(
@@ -0,0 +1,220 @@
+"""
+커서(키셋) 페이지네이션
+
+Paginator 는 페이지마다 COUNT(*) 를 세고 OFFSET 만큼 행을 읽고 버리므로 뒤 페이지일수록 느려진다.
+여기서는 마지막으로 본 행의 (정렬 키..., id) 를 커서에 담아 그 다음 행부터 LIMIT 만큼만 읽는다.
+
+- 정렬은 쿼리셋의 order_by(없으면 모델 Meta.ordering)를 그대로 쓰고, 마지막 키가 pk 가 아니면 마지막 키 방향으로 pk 를 붙여 순서를 고정
+  (정렬 키는 NULL 이 없는 필드/annotate 값이어야 함: search_rank, video_created_at 등)
+- 커서는 정렬 키 값 + 방향(다음/이전) + 예상 전체 개수를 base64 로 감싼 문자열 (내용은 템플릿에서 쓰지 않음)
+- 예상 전체 개수(estimate=True): PostgreSQL 은 EXPLAIN 의 행 수 추정, 그 외 DB(개발용)는 COUNT(*)
+  첫 페이지에서 한 번만 구해 커서에 실어 보내므로 다음 페이지부터는 다시 세지 않는다
+- 잘못된 커서(쿼리 조건이 바뀐 커서 포함)는 첫 페이지부터
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Q
+
+# 커서 방향
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def _parse_ordering(queryset):
+    """쿼리셋 정렬 -> [(필드 이름, 내림차순 여부)] (pk 로 끝나도록)"""
+    keys = []
+    ordering = queryset.query.order_by
+    if not ordering and queryset.query.default_ordering:
+        ordering = queryset.model._meta.ordering
+    for item in ordering:
+        if not isinstance(item, str):
+            raise ValueError(f'커서 페이지네이션은 문자열 정렬만 지원합니다: {item!r}')
+        descending = item.startswith('-')
+        name = item.lstrip('-')
+        if name == 'id' or name == queryset.model._meta.pk.name:
+            name = 'pk'
+        keys.append((name, descending))
+    if not keys:
+        keys = [('pk', True)]
+    if keys[-1][0] != 'pk':
+        keys.append(('pk', keys[-1][1]))
+    return keys
+
+
+def _dump(value):
+    # DjangoJSONEncoder 는 datetime 을 밀리초로 자르므로 경계 행이 어긋나지 않게 isoformat 을 그대로 씀
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, direction, total=None):
+    payload = json.dumps({'v': [_dump(value) for value in values], 'd': direction, 't': total})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(value):
+    """커서 -> (정렬 키 값 리스트, 방향, 예상 전체 개수), 잘못된 커서는 None"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(value.encode()).decode())
+        values, direction, total = payload['v'], payload['d'], payload['t']
+    except (ValueError, UnicodeDecodeError, TypeError, KeyError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        return None
+    # 정렬 키 값은 _dump 가 만든 문자열/숫자뿐 (null/객체/배열은 손으로 만든 커서)
+    if not all(isinstance(item, (str, int, float)) for item in values):
+        return None
+    if total is not None and (not isinstance(total, int) or isinstance(total, bool)):
+        return None
+    return values, direction, total
+
+
+# 마지막 페이지 커서 (정렬을 뒤집어 처음부터 읽음)
+LAST_CURSOR = encode_cursor([], PREVIOUS)
+
+
+def estimated_count(queryset):
+    """
+    예상 전체 개수
+    PostgreSQL: EXPLAIN 최상위 노드의 행 수 추정 (실행하지 않으므로 결과 수와 관계없이 일정)
+    """
+    queryset = queryset.order_by()
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPage:
+    """한 페이지 (템플릿에서 for 로 순회, next_cursor/previous_cursor 로 링크)"""
+
+    last_cursor = LAST_CURSOR
+
+    def __init__(self, object_list, next_cursor, previous_cursor, estimated_total):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.estimated_total = estimated_total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    (정렬 키, id) 키셋 페이지네이터
+    사용: CursorPaginator(qs.order_by('-video_created_at'), 16).page(request.GET.get('cursor'))
+    """
+
+    def __init__(self, queryset, per_page, estimate=False):
+        self.keys = _parse_ordering(queryset)
+        self.queryset = queryset.order_by(*[('-' if descending else '') + name for name, descending in self.keys])
+        self.per_page = per_page
+        self.estimate = estimate
+
+    def _convert(self, values):
+        """커서에서 읽은 값 -> 비교에 쓸 파이썬 값 (모델 필드는 필드의, annotate 값은 output_field 의 to_python)"""
+        meta = self.queryset.model._meta
+        annotations = self.queryset.query.annotations
+        converted = []
+        for (name, _), value in zip(self.keys, values):
+            if name == 'pk':
+                field = meta.pk
+            elif name in annotations:
+                field = annotations[name].output_field
+            else:
+                try:
+                    field = meta.get_field(name)
+                except FieldDoesNotExist:
+                    field = None
+            converted.append(field.to_python(value) if field is not None else value)
+        return converted
+
+    def _after(self, values, reverse):
+        """
+        정렬 순서상 values 다음(reverse 면 이전) 행 조건
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... 에 첫 키 범위 조건을 더해 인덱스 범위 스캔이 되게 함
+        """
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first_name, first_descending = self.keys[0]
+        bound = 'lte' if first_descending != reverse else 'gte'
+        return Q(**{f'{first_name}__{bound}': values[0]}) & condition
+
+    def _values_of(self, item):
+        return [getattr(item, name) for name, _ in self.keys]
+
+    def page(self, cursor=None):
+        """
+        커서 위치의 한 페이지 (커서가 없으면 첫 페이지, LAST_CURSOR 면 마지막 페이지)
+        앞뒤 페이지 유무는 한 행 더 읽어서 판단하므로 COUNT(*) 가 필요 없다.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        if position and position[0] and len(position[0]) != len(self.keys):
+            position = None
+        if position and not position[0] and position[1] != PREVIOUS:
+            position = None
+
+        values, direction, total = position or ([], NEXT, None)
+        reverse = direction == PREVIOUS
+        queryset = self.queryset
+        try:
+            if values:
+                # 조회 조건을 만들 때(get_prep_value) 나는 오류도 잘못된 커서로 봄
+                queryset = queryset.filter(self._after(self._convert(values), reverse))
+        except (ValidationError, TypeError, ValueError):
+            values, direction, total = [], NEXT, None
+            reverse, queryset = False, self.queryset
+
+        if self.estimate and total is None:
+            total = estimated_count(self.queryset)
+
+        if reverse:
+            queryset = queryset.reverse()
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if reverse:
+            items.reverse()
+        if not items:
+            return CursorPage(items, None, None, total)
+
+        # 다음으로 왔으면 이전 페이지는 항상 있고, 이전으로 왔으면 다음 페이지가 항상 있음
+        # (첫 페이지는 이전이 없고, 마지막 페이지는 다음이 없음)
+        has_next = has_more if not reverse else bool(values)
+        has_previous = has_more if reverse else bool(values)
+        next_cursor = encode_cursor(self._values_of(items[-1]), NEXT, total) if has_next else None
+        previous_cursor = encode_cursor(self._values_of(items[0]), PREVIOUS, total) if has_previous else None
+        return CursorPage(items, next_cursor, previous_cursor, total)
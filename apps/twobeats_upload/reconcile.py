@@ -0,0 +1,178 @@
+"""
+좋아요/댓글 카운터 재집계 엔진
+
+music.music_like_count 같은 비정규화 카운터를 실제 좋아요/댓글 행 수로 다시 맞춘다.
+행마다 save() 하지 않고 id 구간별로 UPDATE ... FROM (집계 서브쿼리) 한 문장씩 실행하며,
+값이 다른 행만 갱신한다.
+
+- 전체 모드: id 구간(chunk)으로 나눠 실행, 필요하면 구간별 병렬 처리
+- 증분 모드: counter_dirty(트리거가 기록)에 쌓인 id만 재집계 (PostgreSQL)
+  좋아요 토글/댓글 작성·삭제처럼 같은 트랜잭션에서 카운터를 맞추는 경로는 mark_counters_synced() 로
+  표시해 트리거가 기록하지 않는다 (관리자 화면, 연쇄 삭제 등 앱 밖의 변경만 기록)
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+
+from apps.twobeats_music_explore.models import MusicComment, MusicLike
+from apps.twobeats_video_explore.models import VideoComment, VideoLike
+
+from .models import CounterDirty, Music, Video
+from .scores import POPULARITY_WEIGHTS, refresh_scores
+
+# 카운터 이름 -> (대상 모델, 카운터 필드, 집계할 모델, 집계할 모델의 대상 FK 필드)
+RECONCILE_TARGETS = {
+    'music_like': (Music, 'music_like_count', MusicLike, 'music'),
+    'video_like': (Video, 'video_like_count', VideoLike, 'video'),
+    'music_comment': (Music, 'music_comment_count', MusicComment, 'music'),
+    'video_comment': (Video, 'video_comment_count', VideoComment, 'video'),
+}
+
+
+# 이 트랜잭션에서 카운터를 직접 맞췄다는 표시 (트리거 mark_counter_dirty 가 확인, 마이그레이션 0012)
+COUNTERS_SYNCED_SETTING = 'twobeats.counters_synced'
+COUNTERS_SYNCED_SQL = f"SELECT set_config('{COUNTERS_SYNCED_SETTING}', 'on', true)"
+
+
+def mark_counters_synced():
+    """
+    현재 트랜잭션의 좋아요/댓글 변경은 counter_dirty 에 기록하지 않음 (PostgreSQL, 트랜잭션 안에서 호출)
+    set_config(..., true) 는 트랜잭션이 끝나면 사라지므로 같은 연결의 다음 요청에는 영향이 없다.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(COUNTERS_SYNCED_SQL)
+
+
+def _update_sql(target, where):
+    """where 조건(대상 테이블 별칭 m)에 해당하는 행의 카운터를 재집계하는 UPDATE 문"""
+    model, count_field, child_model, fk_name = RECONCILE_TARGETS[target]
+    qn = connection.ops.quote_name
+
+    table = qn(model._meta.db_table)
+    pk = qn(model._meta.pk.column)
+    column = qn(model._meta.get_field(count_field).column)
+    child_table = qn(child_model._meta.db_table)
+    child_fk = qn(child_model._meta.get_field(fk_name).column)
+
+    return (
+        f'UPDATE {table} AS t SET {column} = s.cnt '
+        f'FROM ('
+        f'SELECT m.{pk} AS id, COUNT(c.{child_fk}) AS cnt '
+        f'FROM {table} m LEFT JOIN {child_table} c ON c.{child_fk} = m.{pk} '
+        f'WHERE {where} GROUP BY m.{pk}'
+        f') AS s '
+        f'WHERE t.{pk} = s.id AND t.{column} <> s.cnt'
+    )
+
+
+def reconcile_range(target, start, end):
+    """id 가 [start, end) 구간인 행 재집계, 갱신된 행 수 반환"""
+    model = RECONCILE_TARGETS[target][0]
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(_update_sql(target, f'm.{pk} >= %s AND m.{pk} < %s'), [start, end])
+        updated = cursor.rowcount
+    if updated and _affects_scores(target):
+        refresh_scores(id_range=(start, end))
+    return updated
+
+
+def reconcile_ids(target, ids):
+    """지정한 id 들만 재집계, 갱신된 행 수 반환"""
+    if not ids:
+        return 0
+    model = RECONCILE_TARGETS[target][0]
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    if connection.vendor == 'postgresql':
+        # 파라미터 개수 제한을 피하기 위해 배열 하나로 전달
+        where, params = f'm.{pk} = ANY(%s)', [list(ids)]
+    else:
+        where, params = f'm.{pk} IN ({", ".join(["%s"] * len(ids))})', list(ids)
+    with connection.cursor() as cursor:
+        cursor.execute(_update_sql(target, where), params)
+        updated = cursor.rowcount
+    if updated and _affects_scores(target):
+        refresh_scores(ids=ids)
+    return updated
+
+
+def _affects_scores(target):
+    """영상 인기 점수에 들어가는 카운터인지 (video_like)"""
+    model, field, _, _ = RECONCILE_TARGETS[target]
+    return model is Video and field in POPULARITY_WEIGHTS
+
+
+def id_ranges(target, chunk_size):
+    """대상 테이블의 id 범위를 chunk_size 구간으로 분할"""
+    model = RECONCILE_TARGETS[target][0]
+    bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    return [
+        (start, min(start + chunk_size, bounds['high'] + 1))
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size)
+    ]
+
+
+def _reconcile_range_in_thread(target, start, end):
+    # 스레드마다 별도 DB 연결을 쓰므로 끝나면 닫아 준다
+    try:
+        with transaction.atomic():
+            return reconcile_range(target, start, end)
+    finally:
+        connections.close_all()
+
+
+def reconcile_full(target, chunk_size=50000, workers=1):
+    """전체 재집계, 갱신된 행 수 반환"""
+    ranges = id_ranges(target, chunk_size)
+
+    # SQLite 는 동시 쓰기를 지원하지 않으므로 순차 처리
+    if workers <= 1 or connection.vendor == 'sqlite':
+        updated = 0
+        for start, end in ranges:
+            with transaction.atomic():
+                updated += reconcile_range(target, start, end)
+        return updated
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda r: _reconcile_range_in_thread(target, *r), ranges)
+        return sum(results)
+
+
+def reconcile_incremental(target, chunk_size=10000):
+    """
+    counter_dirty 에 기록된 id 만 재집계, (처리한 id 수, 갱신된 행 수) 반환
+    기록 삭제와 재집계를 같은 트랜잭션에서 처리하므로 실패하면 기록이 남는다.
+    """
+    processed = updated = 0
+    while True:
+        with transaction.atomic():
+            ids = _pop_dirty_ids(target, chunk_size)
+            if not ids:
+                break
+            updated += reconcile_ids(target, ids)
+        processed += len(ids)
+    return processed, updated
+
+
+def _pop_dirty_ids(target, limit):
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(CounterDirty._meta.db_table)
+        with connection.cursor() as cursor:
+            # SKIP LOCKED: 여러 프로세스가 동시에 돌아도 같은 id 를 중복 처리하지 않음
+            cursor.execute(
+                f'DELETE FROM {table} WHERE id IN ('
+                f'SELECT id FROM {table} WHERE target = %s '
+                f'ORDER BY item_id LIMIT %s FOR UPDATE SKIP LOCKED'
+                f') RETURNING item_id',
+                [target, limit],
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+    dirty = CounterDirty.objects.filter(target=target).order_by('item_id')[:limit]
+    ids = list(dirty.values_list('item_id', flat=True))
+    CounterDirty.objects.filter(target=target, item_id__in=ids).delete()
+    return ids
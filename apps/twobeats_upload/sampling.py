@@ -0,0 +1,80 @@
+"""
+무작위 샘플링 (ORDER BY RANDOM() 대체)
+
+order_by('?') 는 조건에 맞는 모든 행에 난수를 붙여 정렬하므로 곡 수에 비례해 느려진다.
+여기서는 id 범위(pk 인덱스의 양 끝)에서 임의의 id 를 뽑아 pk IN (...) 으로 확인하고
+조건(장르, 커스텀 월드컵 등)에 맞는 행만 뽑은 순서대로 받는다 (거부 샘플링).
+
+- id 를 중복 없이 균등하게 뽑아 맞는 행만 남기므로, 맞는 행들의 무작위 순열 앞부분을 취하는 것과 같다
+  (id 사이 빈칸이 있어도 균등)
+- 맞는 행이 범위에 비해 너무 드물면 (작은 커스텀 월드컵 등) 조건에 맞는 id 만 읽어 파이썬에서 뽑는다
+- TABLESAMPLE SYSTEM 은 블록 단위라 결과가 몰리고, BERNOULLI 는 결국 전체를 읽으므로 쓰지 않는다
+"""
+import math
+import random
+
+# 한 번에 확인할 최대 id 수 (pk IN (...) 파라미터 수, SQLite 제한 32766 이하)
+MAX_BATCH = 5000
+# 적중률로 계산한 필요량보다 더 뽑는 배수
+OVERSAMPLE = 1.5
+# id 범위 샘플링 최대 시도 횟수
+MAX_ROUNDS = 6
+# 적중률이 이보다 낮으면 조건에 맞는 id 를 전부 읽어 뽑음
+MIN_HIT_RATE = 0.01
+
+
+def sample_ids(queryset, k, rng=random):
+    """
+    queryset 에서 중복 없이 무작위 k개의 pk (뽑힌 순서)
+    조건에 맞는 행이 k개보다 적으면 전부 돌려준다.
+    :param rng: random 모듈 또는 random.Random (벤치마크에서 시드 고정용)
+    """
+    if k <= 0:
+        return []
+    # MIN/MAX 를 한 쿼리로 묻으면 SQLite 는 전체를 읽으므로 pk 인덱스 양 끝을 따로 조회
+    pks = queryset.model._default_manager.values_list('pk', flat=True)
+    low = pks.order_by('pk').first()
+    if low is None:
+        return []
+
+    high = pks.order_by('-pk').first()
+    span = high - low + 1
+    ids = queryset.order_by()
+    tried = set()
+    picked = []
+    hit_count = 0
+    hit_rate = 1.0
+
+    for _ in range(MAX_ROUNDS):
+        need = k - len(picked)
+        if need <= 0:
+            return picked
+        if hit_rate < MIN_HIT_RATE:
+            break
+        size = min(math.ceil(need / hit_rate * OVERSAMPLE), MAX_BATCH)
+        # 남은 범위의 절반 이상을 확인해야 하면 id 를 전부 읽는 편이 낫다
+        if size * 2 > span - len(tried):
+            break
+
+        draw = [pk for pk in rng.sample(range(low, high + 1), size) if pk not in tried]
+        tried.update(draw)
+
+        hits = set(ids.filter(pk__in=draw).values_list('pk', flat=True))
+        picked += [pk for pk in draw if pk in hits][:need]
+        # 지금까지 확인한 id 전체 기준 적중률 (한 번도 안 맞았을 때 0 이 되지 않도록 +1)
+        hit_count += len(hits)
+        hit_rate = (hit_count + 1) / (len(tried) + 1)
+
+    need = k - len(picked)
+    if need <= 0:
+        return picked
+    # 아직 확인하지 않은 id 중에서 뽑으므로 앞에서 뽑은 것과 합쳐도 균등
+    rest = [pk for pk in ids.values_list('pk', flat=True) if pk not in tried]
+    return picked + rng.sample(rest, min(need, len(rest)))
+
+
+def sample(queryset, k, rng=random):
+    """queryset 에서 중복 없이 무작위 k개 (모델 객체 리스트, 뽑힌 순서)"""
+    picked = sample_ids(queryset, k, rng)
+    found = queryset.in_bulk(picked)
+    return [found[pk] for pk in picked if pk in found]
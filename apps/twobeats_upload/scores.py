@@ -0,0 +1,120 @@
+"""
+영상 인기/트렌딩 점수
+
+매 요청마다 전체 영상에 대해 점수를 계산해 정렬하지 않도록 video 테이블에 저장하고
+B-tree 인덱스로 상위 N개를 읽는다.
+
+- 인기 점수 = 조회수*3 + 재생수*2 + 좋아요*4
+- 트렌딩 점수 = log10(max(인기 점수, 1)) + (업로드 시각 - 기준 시각) / TRENDING_DECAY
+  업로드가 TRENDING_DECAY 초 늦을 때마다 인기 점수 10배만큼 앞서므로 오래된 영상은 자연히 내려간다.
+  (시간이 지나도 값이 변하지 않아 인기 점수가 바뀔 때만 다시 계산하면 됨)
+
+카운터가 바뀌는 곳(write-behind 반영, 좋아요 토글, 좋아요 재집계)과 영상 생성 시(post_save, signals.py) refresh_scores 로 갱신하고
+기존 데이터/공식 변경은 backfill_video_scores 명령으로 채운다.
+영상 목록의 트렌딩순 정렬(?sort=trending)이 트렌딩 점수 인덱스를 쓴다.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.db.models import Max, Min
+
+from .models import Video
+
+POPULARITY_WEIGHTS = {
+    'video_views': 3,
+    'video_play_count': 2,
+    'video_like_count': 4,
+}
+
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+TRENDING_DECAY = 45000  # 초 (12.5시간)
+
+
+def popularity_of(video):
+    return sum(getattr(video, field) * weight for field, weight in POPULARITY_WEIGHTS.items())
+
+
+def trending_score(popularity, created_at):
+    return math.log10(max(popularity, 1)) + (created_at - TRENDING_EPOCH).total_seconds() / TRENDING_DECAY
+
+
+def refresh_scores(ids=None, id_range=None, force=False):
+    """
+    인기/트렌딩 점수 다시 계산
+    :param ids: 대상 id 목록
+    :param id_range: 대상 id 구간 (start, end), ids 와 함께 주지 않음
+    :param force: 인기 점수가 같아도 트렌딩 점수까지 다시 계산 (공식 변경 시)
+    :return: 갱신된 행 수
+    """
+    if ids is not None and not ids:
+        return 0
+    if connection.vendor != 'postgresql':
+        return _refresh_scores_orm(ids, id_range, force)
+
+    qn = connection.ops.quote_name
+    meta = Video._meta
+    pk = qn(meta.pk.column)
+    created = qn(meta.get_field('video_created_at').column)
+    popularity_col = qn(meta.get_field('video_popularity').column)
+    trending_col = qn(meta.get_field('video_trending_score').column)
+    popularity = ' + '.join(
+        f'{qn(meta.get_field(field).column)} * {weight}' for field, weight in POPULARITY_WEIGHTS.items()
+    )
+    trending = (
+        f'LOG(GREATEST({popularity}, 1)::double precision) '
+        f'+ EXTRACT(EPOCH FROM ({created} - %s)) / {TRENDING_DECAY}'
+    )
+
+    params = [TRENDING_EPOCH]
+    if ids is not None:
+        # 파라미터 개수 제한을 피하기 위해 배열 하나로 전달
+        where = f'{pk} = ANY(%s)'
+        params.append(list(ids))
+    elif id_range is not None:
+        where = f'{pk} >= %s AND {pk} < %s'
+        params += list(id_range)
+    else:
+        where = 'TRUE'
+    if not force:
+        # 새로 올라온 영상은 트렌딩 점수가 아직 0
+        where += f' AND ({popularity_col} <> {popularity} OR {trending_col} = 0)'
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {qn(meta.db_table)} SET {popularity_col} = {popularity}, {trending_col} = {trending} '
+            f'WHERE {where}',
+            params,
+        )
+        return cursor.rowcount
+
+
+def _refresh_scores_orm(ids, id_range, force):
+    """PostgreSQL 이 아닌 DB(개발용 SQLite 등)에서의 대체 구현"""
+    videos = Video.objects.only('video_created_at', 'video_popularity', 'video_trending_score', *POPULARITY_WEIGHTS)
+    if ids is not None:
+        videos = videos.filter(pk__in=ids)
+    elif id_range is not None:
+        videos = videos.filter(pk__gte=id_range[0], pk__lt=id_range[1])
+
+    changed = []
+    for video in videos:
+        popularity = popularity_of(video)
+        if not force and video.video_popularity == popularity and video.video_trending_score:
+            continue
+        video.video_popularity = popularity
+        video.video_trending_score = trending_score(popularity, video.video_created_at)
+        changed.append(video)
+    Video.objects.bulk_update(changed, ['video_popularity', 'video_trending_score'], batch_size=1000)
+    return len(changed)
+
+
+def id_ranges(chunk_size):
+    """video id 범위를 chunk_size 구간으로 분할 (백필용)"""
+    bounds = Video.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    return [
+        (start, min(start + chunk_size, bounds['high'] + 1))
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size)
+    ]
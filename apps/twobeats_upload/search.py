@@ -0,0 +1,102 @@
+"""
+곡/영상 제목·가수 검색
+
+icontains(LIKE '%검색어%')는 키 입력마다 테이블 전체를 읽으므로 PostgreSQL 에서는 인덱스로 후보를 줄인다.
+
+- music_search / video_search: 제목+가수의 글자 1-gram/2-gram tsvector (생성 컬럼, GIN 인덱스)
+  한국어는 형태소 분석기 없이도 부분 문자열이 2-gram 으로 잡히므로 n-gram 을 씀
+  (마이그레이션 0008 에서 PostgreSQL 에만 추가, 모델 필드가 아님)
+- 검색어의 2-gram(한 글자면 1-gram)이 모두 있는 행만 GIN 인덱스로 고른 뒤
+  기존과 같은 icontains 조건으로 다시 확인하므로 결과 집합은 기존과 같다
+- 제목/가수 pg_trgm GIN 인덱스: 정렬 점수의 similarity() 와 ILIKE 재확인에 사용
+- 정렬: 완전 일치 > 앞부분 일치 > 트라이그램 유사도, 여기에 인기(ln) 를 조금 더함
+  점수는 일치하는 행마다 계산해야 하므로 icontains 조건의 일치 행 수(EXPLAIN 추정)가 RANKED_MATCH_LIMIT 를 넘는
+  짧은/흔한 검색어("나", "love" 등)는 n-gram 조건/점수 없이 검색 인덱스 이전과 같은 icontains + 최신순
+  (생성일 인덱스를 따라 읽다가 LIMIT 에서 멈춤, 결과 집합은 같음)
+  n-gram 조건을 붙이면 플래너가 2-gram 들을 서로 독립으로 보고 일치 수를 크게 낮춰 잡으므로 추정은 icontains 만으로
+- 그 외 DB(SQLite 등 개발용): icontains + 인기순
+- 초성/자모 검색어: 저장된 초성/자모 키 부분 일치 + 인기순 (PostgreSQL 은 키 컬럼 트라이그램 인덱스)
+- 정렬은 문자열 필드/annotate 이름(+pk)으로만 지정 (커서 페이지네이션이 정렬 키를 읽음, pagination.py)
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .hangul import chosung_key, has_jamo, is_chosung_query, jamo_key
+from .models import Music, Video
+from .pagination import estimated_count
+
+# 모델 -> (제목 필드, 가수 필드, 인기 필드, n-gram 컬럼)
+SEARCH_FIELDS = {
+    Music: ('music_title', 'music_singer', 'music_count', 'music_search'),
+    Video: ('video_title', 'video_singer', 'video_popularity', 'video_search'),
+}
+
+# 인기 ln(1 + 값) 에 곱하는 가중치 (일치 점수는 0~4 범위)
+POPULARITY_WEIGHT = 0.1
+
+# 일치 점수로 정렬할 최대 예상 일치 행 수 (넘으면 icontains + 최신순)
+RANKED_MATCH_LIMIT = 500
+
+
+def ngrams(text):
+    """검색어의 n-gram (단어별 2-gram, 두 글자 미만 단어는 그 글자 자체)"""
+    grams = []
+    for word in re.split(r'\s+', text.lower()):
+        if len(word) < 2:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return list(dict.fromkeys(gram for gram in grams if gram))
+
+
+def _tsquery(grams):
+    """n-gram 을 모두 포함하는 tsquery 문자열 (정규화 없이 ::tsquery 로 캐스팅)"""
+    return ' & '.join("'" + gram.replace('\\', '\\\\').replace("'", "''") + "'" for gram in grams)
+
+
+def search(queryset, query):
+    """
+    검색어로 거른 쿼리셋 (search_rank 로 정렬, 다른 정렬이 필요하면 order_by 로 덮어씀)
+    PostgreSQL 에서 일치 행이 RANKED_MATCH_LIMIT 개를 넘을 것으로 추정되면 search_rank 없이 최신순
+    :param queryset: 곡 또는 영상 쿼리셋 (장르/태그 등 다른 조건을 붙여도 됨)
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    title, singer, popularity, vector = SEARCH_FIELDS[queryset.model]
+
+    # 초성만("ㅅㄱㅇ") 또는 치는 중인 낱자가 섞인("아이ㅇ") 검색어는 저장된 초성/자모 키에서 찾음 (hangul.py)
+    if is_chosung_query(query) or has_jamo(query):
+        suffix, key = ('chosung', chosung_key(query)) if is_chosung_query(query) else ('jamo', jamo_key(query))
+        return queryset.filter(
+            Q(**{f'{title}_{suffix}__contains': key}) | Q(**{f'{singer}_{suffix}__contains': key})
+        ).order_by(f'-{popularity}', '-pk')
+
+    matched = queryset.filter(Q(**{f'{title}__icontains': query}) | Q(**{f'{singer}__icontains': query}))
+    if connection.vendor != 'postgresql':
+        return matched.order_by(f'-{popularity}', '-pk')
+    if estimated_count(matched) > RANKED_MATCH_LIMIT:
+        return matched.order_by(*queryset.model._meta.ordering, '-pk')
+
+    qn = connection.ops.quote_name
+    meta = queryset.model._meta
+    table = qn(meta.db_table)
+    title_col = f'{table}.{qn(meta.get_field(title).column)}'
+    singer_col = f'{table}.{qn(meta.get_field(singer).column)}'
+    popularity_col = f'{table}.{qn(meta.get_field(popularity).column)}'
+    rank = f"""
+        CASE WHEN lower({title_col}) = lower(%s) OR lower({singer_col}) = lower(%s) THEN 2 ELSE 0 END
+        + CASE WHEN {title_col} ILIKE %s OR {singer_col} ILIKE %s THEN 1 ELSE 0 END
+        + GREATEST(similarity({title_col}, %s), similarity({singer_col}, %s))
+        + {POPULARITY_WEIGHT} * ln(1 + GREATEST({popularity_col}, 0))
+    """
+    prefix = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    return (
+        matched
+        .filter(RawSQL(f'{table}.{qn(vector)} @@ %s::tsquery', [_tsquery(ngrams(query))], output_field=BooleanField()))
+        .annotate(search_rank=RawSQL(rank, [query, query, prefix, prefix, query, query], output_field=FloatField()))
+        .order_by('-search_rank', '-pk')
+    )
@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.twobeats_music_explore.models import MusicLike
+from apps.twobeats_video_explore.models import VideoLike
+
+from .autocomplete import autocomplete_deleted_scope, autocomplete_scope
+from .facets import facet_scope
+from .hangul import chosung_key, jamo_key
+from .invalidation import invalidate, invalidate_videos, music_scopes, video_scopes
+from .models import Music, Video
+from .scores import refresh_scores
+from .tag_index import INDEX_FIELDS, index_scope
+
+# 캐시에 영향을 주는 필드 (조회수/재생수는 queryset.update 라 시그널이 오지 않고 TTL 로 반영)
+_TYPE_FIELDS = {Music: 'music_type', Video: 'video_type'}
+_SCOPES = {Music: music_scopes, Video: video_scopes}
+
+
+@receiver(pre_save, sender=Music)
+@receiver(pre_save, sender=Video)
+def remember_previous_type(sender, instance, **kwargs):
+    """타입(장르)이 바뀌면 이전 타입 캐시도 무효화하도록 저장 전 값을 기억"""
+    field = _TYPE_FIELDS[sender]
+    instance._previous_type = None
+    if instance.pk:
+        instance._previous_type = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(pre_save, sender=Music)
+@receiver(pre_save, sender=Video)
+def fill_search_keys(sender, instance, **kwargs):
+    """제목/가수 초성, 자모 검색 키 계산 (검색할 때마다 풀지 않도록 저장 시 한 번)"""
+    for source in ('title', 'singer'):
+        name = f'{sender._meta.model_name}_{source}'
+        text = getattr(instance, name)
+        for suffix, key_func in (('chosung', chosung_key), ('jamo', jamo_key)):
+            field = sender._meta.get_field(f'{name}_{suffix}')
+            setattr(instance, field.name, key_func(text)[:field.max_length])
+
+
+@receiver(post_save, sender=Music)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Music)
+@receiver(post_delete, sender=Video)
+def invalidate_item(sender, instance, **kwargs):
+    """곡/영상 업로드, 수정, 삭제 시 해당 타입의 캐시와 태그/자동완성 인덱스, 필터 개수 무효화"""
+    scopes = set(_SCOPES[sender](getattr(instance, _TYPE_FIELDS[sender])))
+    previous = getattr(instance, '_previous_type', None)
+    if previous:
+        scopes |= _SCOPES[sender](previous)
+    invalidate(index_scope(sender), autocomplete_scope(sender), facet_scope(sender), *scopes)
+
+
+@receiver(post_delete, sender=Music)
+@receiver(post_delete, sender=Video)
+def invalidate_deleted_item(sender, **kwargs):
+    """곡/영상 삭제 시 자동완성 인덱스가 삭제된 행을 걸러 내도록 삭제 세대 번호도 바꿈"""
+    invalidate(autocomplete_deleted_scope(sender))
+
+
+@receiver(post_save, sender=Video)
+def score_new_video(sender, instance, created, **kwargs):
+    """새 영상의 인기/트렌딩 점수 계산 (업로드 화면, 관리자 화면, 셸 등 어디서 만들든 업로드 시각 기준 점수를 채움)"""
+    if created:
+        transaction.on_commit(lambda: refresh_scores(ids=[instance.pk]))
+
+
+@receiver(post_save, sender=MusicLike)
+@receiver(post_save, sender=VideoLike)
+@receiver(post_delete, sender=MusicLike)
+@receiver(post_delete, sender=VideoLike)
+def invalidate_like(sender, instance, **kwargs):
+    """
+    좋아요 추가/취소 시 좋아요수가 들어가는 캐시 무효화
+    - 영상: 인기 점수(좋아요수 포함)로 고르는 인기 영상 TOP3
+    - 음악: 세대 번호로 캐싱하는 것 중 좋아요수를 쓰는 곳이 아직 없음 (차트는 스냅샷, 월드컵 풀은 좋아요수 미포함)
+    PostgreSQL 좋아요 토글(likes._toggle_like_sql)은 raw SQL 이라 모델 시그널이 오지 않으므로 직접 호출한다.
+    """
+    if sender is VideoLike:
+        invalidate_videos([instance.video_id])
+
+
+@receiver(m2m_changed, sender=Music.tags.through)
+@receiver(m2m_changed, sender=Video.tags.through)
+def invalidate_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    곡/영상 태그 변경 시 태그 필터 인기 영상 캐시, 태그 인덱스, 필터 개수 무효화
+    + 수정 시각 갱신 (태그 인덱스/관련 영상 증분 갱신이 수정 시각으로 대상을 찾음)
+    """
+    model = Music if sender is Music.tags.through else Video
+    if action == 'pre_clear' and reverse:
+        # tag.musics.clear() 는 post_clear 에 pk_set 이 없으므로 지워지기 전에 대상 id 를 기억
+        instance._cleared_item_ids = list(
+            sender.objects.filter(tag_id=instance.pk).values_list(f'{model._meta.model_name}_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # tag.musics / tag.videos 쪽에서 바꾼 경우 (clear 는 pre_clear 에서 기억한 id)
+        if pk_set is None:
+            pk_set = getattr(instance, '_cleared_item_ids', [])
+        items = model.objects.filter(pk__in=pk_set)
+    else:
+        items = model.objects.filter(pk=instance.pk)
+
+    scopes = {index_scope(model), facet_scope(model)}
+    if model is Video:
+        for video_type in set(items.values_list('video_type', flat=True)):
+            scopes |= video_scopes(video_type)
+    invalidate(*scopes)
+    items.update(**{INDEX_FIELDS[model][3]: timezone.now()})
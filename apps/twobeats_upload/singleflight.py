@@ -0,0 +1,78 @@
+"""
+캐시 재계산 몰림(stampede) 방지
+
+인기 키가 만료되는 순간 동시에 들어온 요청이 모두 같은 무거운 쿼리를 다시 실행하지 않도록
+캐시 값에 계산 시각/소요 시간을 함께 저장하고 재계산은 한 워커만 하게 한다.
+
+- 신선 기간(timeout)이 지나도 stale_timeout 동안은 이전 값을 보관해
+  락(cache.add)을 잡은 워커 하나만 다시 계산하고 나머지는 이전 값을 바로 반환
+- 만료 직전에는 확률적으로 미리 재계산 (XFetch: 계산이 오래 걸릴수록, 만료가 가까울수록 일찍)
+  -> 락 대기 없이 대부분 만료 전에 갱신됨
+- generation 을 주면 저장된 값의 세대가 다를 때도 오래된 값으로 보고 같은 방식으로 갱신
+  (invalidation.py 세대 번호, 무효화 직후에도 몰리지 않음)
+- 캐시에 값이 아예 없으면(처음/삭제) 락을 못 잡은 요청은 잠깐 기다렸다가 결과를 읽고,
+  그래도 없으면 직접 계산
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+LOCK_PREFIX = 'sf_lock'
+
+# 락 보관 시간(초), 계산하던 워커가 죽어도 이 시간 뒤에는 다른 워커가 재계산
+LOCK_TIMEOUT = 30
+# 값이 없을 때 다른 워커의 계산 결과를 기다리는 최대 시간(초)과 확인 간격
+WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.05
+
+
+def _is_fresh(entry, generation, beta):
+    _, expires_at, delta, stored_generation = entry
+    if stored_generation != generation:
+        return False
+    # XFetch: now - delta * beta * ln(rand) >= expires_at 이면 미리 재계산
+    return time.time() - delta * beta * math.log(1.0 - random.random()) < expires_at
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout, generation):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    cache.set(key, (value, time.time() + timeout, delta, generation), timeout + stale_timeout)
+    return value
+
+
+def cached(key, compute, timeout, stale_timeout=None, generation=0, beta=1.0):
+    """
+    캐시된 값 (없거나 오래되었으면 한 워커만 compute() 로 다시 계산)
+    :param compute: 인자 없는 계산 함수
+    :param timeout: 신선 기간(초)
+    :param stale_timeout: 신선 기간이 지난 뒤 이전 값을 보관하는 시간(초), None 이면 timeout 과 같음
+    :param generation: 값의 세대 (다르면 오래된 값)
+    :param beta: 미리 재계산 정도 (클수록 일찍, 0 이면 미리 하지 않음)
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry, generation, beta):
+        return entry[0]
+
+    lock_key = f'{LOCK_PREFIX}:{key}'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            return _compute_and_store(key, compute, timeout, stale_timeout, generation)
+        finally:
+            cache.delete(lock_key)
+
+    # 다른 워커가 계산 중
+    if entry is not None:
+        return entry[0]
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return compute()
@@ -0,0 +1,172 @@
+"""
+태그 비트셋 유사도 인덱스 (곡/영상)
+
+태그는 init_tags 로 만든 작은 고정 목록이므로 추천마다 M2M 을 조인해 겹치는 태그를 세지 않고
+워커 메모리에 항목별 태그를 비트셋(uint64 배열)으로 들고 전체 목록에 대해 한 번에 계산한다.
+
+- 항목별: 태그 비트셋, 장르 번호, 아티스트 번호, 좋아요 수(동점 정렬용)
+- 유사도: 태그 Jaccard = popcount(a & b) / popcount(a | b) (+ 장르/아티스트 가중치, 선택)
+- 곡/영상 저장, 삭제, 태그 변경 시 세대 번호(invalidation.py)가 바뀌면
+  다음 조회 때 그 사이 수정된 항목만 다시 읽어 반영 (새 태그가 생기면 전체 다시 읽음)
+"""
+import threading
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .invalidation import generations
+from .models import Music, Video
+
+# 모델 -> (장르 필드, 아티스트 필드, 좋아요수 필드, 수정 시각 필드)
+INDEX_FIELDS = {
+    Music: ('music_type', 'music_singer', 'music_like_count', 'music_updated_at'),
+    Video: ('video_type', 'video_singer', 'video_like_count', 'video_updated_at'),
+}
+
+# 증분 반영 시 수정 시각 비교 여유 (워커/DB 시계 차이, 커밋 지연)
+SYNC_SLACK = timedelta(minutes=1)
+
+
+def index_scope(model):
+    return f'tag_index:{model._meta.model_name}'
+
+
+def popcount(words):
+    """uint64 비트셋 배열의 행별 1 비트 수"""
+    return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+
+class _Snapshot:
+    """한 시점의 인덱스 (읽는 동안 바뀌지 않도록 갱신 시 통째로 교체)"""
+
+    def __init__(self, ids, bits, genres, artists, likes, tag_positions):
+        self.ids = ids
+        self.bits = bits
+        self.genres = genres
+        self.artists = artists
+        self.likes = likes
+        self.tag_positions = tag_positions
+        self.index = {pk: position for position, pk in enumerate(ids.tolist())}
+
+
+class TagIndex:
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._generation = None
+        self._synced_at = None
+        # 장르/아티스트 문자열 -> 번호 (워커가 살아 있는 동안 유지)
+        self._codes = ({}, {})
+
+    # --- 적재 ---
+
+    def _rows(self, queryset):
+        genre_field, artist_field, like_field, _ = INDEX_FIELDS[self.model]
+        return list(queryset.order_by('pk').values_list('pk', genre_field, artist_field, like_field))
+
+    def _tag_pairs(self, ids=None):
+        through = self.model.tags.through.objects.all()
+        fk = f'{self.model._meta.model_name}_id'
+        if ids is not None:
+            through = through.filter(**{f'{fk}__in': ids})
+        return through.values_list(fk, 'tag_id')
+
+    def _encode(self, rows, pairs, tag_positions):
+        genre_codes, artist_codes = self._codes
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        genres = np.array([genre_codes.setdefault(row[1], len(genre_codes)) for row in rows], dtype=np.int32)
+        artists = np.array([artist_codes.setdefault(row[2], len(artist_codes)) for row in rows], dtype=np.int32)
+        likes = np.array([row[3] for row in rows], dtype=np.int64)
+
+        words = max(1, (len(tag_positions) + 63) // 64)
+        bits = np.zeros((len(rows), words), dtype=np.uint64)
+        position_of = {pk: position for position, pk in enumerate(ids.tolist())}
+        for pk, tag_id in pairs:
+            if pk in position_of:
+                bit = tag_positions[tag_id]
+                bits[position_of[pk], bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return ids, bits, genres, artists, likes
+
+    def _build(self):
+        pairs = list(self._tag_pairs())
+        tag_positions = {tag_id: position for position, tag_id in enumerate(sorted({tag for _, tag in pairs}))}
+        return _Snapshot(*self._encode(self._rows(self.model.objects.all()), pairs, tag_positions), tag_positions)
+
+    def _update(self, snapshot, since):
+        """since 이후 수정된 항목과 삭제된 항목만 반영한 새 스냅샷 (새 태그가 있으면 None)"""
+        updated_field = INDEX_FIELDS[self.model][3]
+        rows = self._rows(self.model.objects.filter(**{f'{updated_field}__gte': since}))
+        pairs = list(self._tag_pairs([row[0] for row in rows]))
+        if any(tag_id not in snapshot.tag_positions for _, tag_id in pairs):
+            return None
+        changed = self._encode(rows, pairs, snapshot.tag_positions)
+
+        alive = np.isin(snapshot.ids, np.array(self.model.objects.values_list('pk', flat=True)))
+        keep = alive & ~np.isin(snapshot.ids, changed[0])
+        merged = [
+            np.concatenate([old[keep], new])
+            for old, new in zip((snapshot.ids, snapshot.bits, snapshot.genres, snapshot.artists, snapshot.likes), changed)
+        ]
+        order = np.argsort(merged[0], kind='stable')
+        return _Snapshot(*(array[order] for array in merged), snapshot.tag_positions)
+
+    def sync(self):
+        """세대 번호가 바뀌었으면 반영 (처음이면 전체 적재)"""
+        generation, = generations(index_scope(self.model))
+        if self._snapshot is not None and generation == self._generation:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is not None and generation == self._generation:
+                return self._snapshot
+            started = timezone.now()
+            snapshot = None
+            if self._snapshot is not None:
+                snapshot = self._update(self._snapshot, self._synced_at - SYNC_SLACK)
+            self._snapshot = snapshot or self._build()
+            self._generation = generation
+            self._synced_at = started
+        return self._snapshot
+
+    # --- 조회 ---
+
+    def similar(self, pk, limit, same_genre=False, genre_weight=0.0, artist_weight=0.0, min_common=1):
+        """
+        태그가 비슷한 항목
+        :param same_genre: 같은 장르만
+        :param genre_weight: 같은 장르일 때 더할 점수 (Jaccard 는 0~1)
+        :param artist_weight: 같은 아티스트일 때 더할 점수
+        :param min_common: 최소 공통 태그 수
+        :return: [(id, 점수)] 점수 내림차순, 같으면 좋아요 많은 순, id 순
+        """
+        snapshot = self.sync()
+        position = snapshot.index.get(pk)
+        if position is None:
+            return []
+
+        target = snapshot.bits[position]
+        common = popcount(snapshot.bits & target)
+        union = popcount(snapshot.bits | target)
+        scores = np.divide(common, union, out=np.zeros(len(common)), where=union > 0)
+        same_genres = snapshot.genres == snapshot.genres[position]
+        scores += genre_weight * same_genres + artist_weight * (snapshot.artists == snapshot.artists[position])
+
+        candidates = common >= min_common
+        if same_genre:
+            candidates &= same_genres
+        candidates[position] = False
+
+        found = np.flatnonzero(candidates)
+        top = found[np.lexsort((snapshot.ids[found], -snapshot.likes[found], -scores[found]))[:limit]]
+        return list(zip(snapshot.ids[top].tolist(), scores[top].tolist()))
+
+    def similar_objects(self, pk, limit, queryset=None, **options):
+        """similar 결과를 모델 객체 리스트로 (유사도 순)"""
+        ids = [item_id for item_id, _ in self.similar(pk, limit, **options)]
+        items = (queryset if queryset is not None else self.model.objects.all()).in_bulk(ids)
+        return [items[item_id] for item_id in ids if item_id in items]
+
+
+music_tags = TagIndex(Music)
+video_tags = TagIndex(Video)
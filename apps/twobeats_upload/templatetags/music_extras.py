@@ -1,19 +1,16 @@
 from django import template
-from apps.twobeats_music_explore.models import MusicLike
-from apps.twobeats_video_explore.models import VideoLike
+from apps.twobeats_upload.likes import liked_ids
 
 register = template.Library()
 
 @register.filter
 def has_liked(user, music):
-    """사용자가 해당 음악에 좋아요를 눌렀는지 확인"""
-    if user.is_authenticated:
-        return MusicLike.objects.filter(user=user, music=music).exists()
-    return False
+    """사용자가 해당 음악에 좋아요를 눌렀는지 확인 (요청 안에서 이미 확인한 곡은 다시 조회하지 않음)"""
+    pk = getattr(music, 'pk', music)
+    return int(pk) in liked_ids(user, 'music', [pk])
 
 @register.filter
 def has_liked_video(user, video):
-    """영상 좋아요 여부"""
-    if user.is_authenticated:
-        return VideoLike.objects.filter(user=user, video=video).exists()
-    return False
\ No newline at end of file
+    """영상 좋아요 여부 (요청 안에서 이미 확인한 영상은 다시 조회하지 않음)"""
+    pk = getattr(video, 'pk', video)
+    return int(pk) in liked_ids(user, 'video', [pk])
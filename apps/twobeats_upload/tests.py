@@ -1,3 +1,438 @@
-from django.test import TestCase
+import base64
+import json
+import os
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connection
+from django.db.models import ExpressionWrapper, F, FloatField, Q
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.twobeats_music_explore.models import MusicLike
+from apps.twobeats_video_explore.models import VideoLike
+
+from .autocomplete import AutocompleteIndex
+from .cache_tier import TieredCache, check_shared_cache
+from .charts import CHART_SIZE
+from .counters import PlayCounterBuffer
+from .facets import facet_counts, refresh_facets
+from .hangul import chosung_key, has_jamo, is_chosung_query, jamo_key
+from .invalidation import generations, invalidator
+from .likes import _toggle_like_orm, _toggle_like_sql
+from .models import Music, Tag, Video
+from .pagination import LAST_CURSOR, CursorPaginator, encode_cursor
+from .search import RANKED_MATCH_LIMIT, search
+from .templatetags.music_extras import has_liked
+
+
+def create_music(uploader, title, singer='', music_type='ballad', count=0):
+    return Music.objects.create(
+        music_title=title, music_singer=singer, music_type=music_type, music_count=count,
+        music_root='music/test.mp3', uploader=uploader,
+    )
+
+
+def raw_cursor(payload):
+    """손으로 만든 커서 (encode_cursor 를 거치지 않은 값)"""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class PlayCounterBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='counter', password='pw')
+        cls.first = create_music(user, '첫 곡')
+        cls.second = create_music(user, '둘째 곡')
+
+    def setUp(self):
+        self.buffer = PlayCounterBuffer(autoflush=False)
+
+    def _counts(self):
+        return dict(Music.objects.filter(pk__in=[self.first.pk, self.second.pk]).values_list('pk', 'music_count'))
+
+    def test_incr_accumulates_per_item(self):
+        self.assertEqual(self.buffer.incr('music_play', self.first.pk), 1)
+        self.assertEqual(self.buffer.incr('music_play', str(self.first.pk)), 2)
+        self.assertEqual(self.buffer.incr('music_play', self.first.pk, amount=3), 5)
+        self.assertEqual(self.buffer.incr('music_play', self.second.pk), 1)
+        self.assertEqual(self.buffer.pending('music_play', self.first.pk), 5)
+        self.assertEqual(self._counts(), {self.first.pk: 0, self.second.pk: 0})
+        with self.assertRaises(ValueError):
+            self.buffer.incr('unknown', self.first.pk)
+
+    def test_flush_writes_summed_deltas(self):
+        for _ in range(3):
+            self.buffer.incr('music_play', self.first.pk)
+        self.buffer.incr('music_play', self.second.pk)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self._counts(), {self.first.pk: 3, self.second.pk: 1})
+        self.assertEqual(self.buffer.pending('music_play', self.first.pk), 0)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_failed_flush_puts_deltas_back(self):
+        self.buffer.incr('music_play', self.first.pk, amount=2)
+        with mock.patch.object(self.buffer, '_write', side_effect=DatabaseError('down')), \
+                self.assertLogs('apps.twobeats_upload.counters', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.pending('music_play', self.first.pk), 2)
+        self.assertEqual(self._counts()[self.first.pk], 0)
+
+        # 되돌린 증가분에 새 증가분이 더해져 다음 반영에서 한 번에 기록
+        self.buffer.incr('music_play', self.first.pk)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self._counts()[self.first.pk], 3)
+
+    def test_shutdown_flushes_remaining(self):
+        self.buffer.incr('music_play', self.second.pk, amount=4)
+        self.buffer.shutdown()
+        self.assertEqual(self._counts()[self.second.pk], 4)
+
+
+class LikeToggleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='liker', password='pw')
+        cls.music = create_music(cls.user, '좋아요 곡')
+        cls.video = Video.objects.create(
+            video_title='좋아요 영상', video_type='ballad', video_root='videos/test.mp4', video_user=cls.user,
+        )
+
+    def _assert_toggles(self, toggle):
+        self.assertEqual(toggle(self.user, 'music', self.music.pk), (True, 1))
+        self.assertTrue(MusicLike.objects.filter(user=self.user, music=self.music).exists())
+        self.assertEqual(toggle(self.user, 'music', self.music.pk), (False, 0))
+        self.assertFalse(MusicLike.objects.filter(user=self.user, music=self.music).exists())
+        self.assertIsNone(toggle(self.user, 'music', self.music.pk + 1000))
+
+    def test_orm_fallback(self):
+        self._assert_toggles(_toggle_like_orm)
+
+    def test_count_never_below_zero(self):
+        Music.objects.filter(pk=self.music.pk).update(music_like_count=0)
+        MusicLike.objects.create(user=self.user, music=self.music)
+        self.assertEqual(_toggle_like_orm(self.user, 'music', self.music.pk), (False, 0))
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL CTE 경로')
+    def test_sql(self):
+        self._assert_toggles(_toggle_like_sql)
+
+    def _assert_invalidates_top_videos(self, change):
+        scopes = ('top_videos:ballad', 'top_videos:all')
+        before = generations(*scopes)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        invalidator.flush()
+        after = generations(*scopes)
+        self.assertTrue(all(old != new for old, new in zip(before, after)))
+
+    def test_like_signals_invalidate_top_videos(self):
+        cache.clear()
+        self._assert_invalidates_top_videos(lambda: VideoLike.objects.create(user=self.user, video=self.video))
+        self._assert_invalidates_top_videos(lambda: VideoLike.objects.filter(user=self.user).delete())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL CTE 경로')
+    def test_sql_toggle_invalidates_top_videos(self):
+        cache.clear()
+        for _ in range(2):
+            self._assert_invalidates_top_videos(lambda: _toggle_like_sql(self.user, 'video', self.video.pk))
+
+
+class LikedIdsPreloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='charter', password='pw')
+        cls.musics = [create_music(cls.user, f'차트 곡 {i}', count=i) for i in range(CHART_SIZE)]
+        MusicLike.objects.create(user=cls.user, music=cls.musics[0])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_chart_checks_likes_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('music_explore:chart_popular'))
+        like_table = 'FROM ' + connection.ops.quote_name(MusicLike._meta.db_table)
+        self.assertEqual(len(response.context['musics']), CHART_SIZE)
+        self.assertEqual(sum(like_table in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual(response.context['liked_music_ids'], {self.musics[0].pk})
+
+        # 같은 요청 안의 has_liked 는 미리 확인한 결과를 씀
+        user = response.wsgi_request.user
+        with self.assertNumQueries(0):
+            self.assertEqual([has_liked(user, music) for music in self.musics].count(True), 1)
+
+    def test_batch_ignores_non_ascii_digits(self):
+        response = self.client.get(reverse('twobeats_upload:like_status_batch'), {'music': f'²,①,{self.musics[0].pk}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()['music']), [str(self.musics[0].pk)])
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = caches['shared']
+        self.shared.clear()
+        self.cache = TieredCache('tests', {'OPTIONS': {'L1_FAMILIES': ['hot'], 'L1_TIMEOUT': 60}})
+        self.addCleanup(self.cache.clear)
+
+    def test_values_live_in_shared_cache(self):
+        self.cache.set('hot:a', 1)
+        self.cache.set('cold:a', 2)
+        self.assertEqual(self.shared.get('hot:a'), 1)
+        self.assertEqual(self.shared.get('cold:a'), 2)
+
+    def test_only_l1_families_are_kept_in_memory(self):
+        self.cache.set('hot:a', 1)
+        self.cache.set('cold:a', 2)
+        self.shared.clear()
+        self.assertEqual(self.cache.get('hot:a'), 1)
+        self.assertIsNone(self.cache.get('cold:a'))
+        self.assertEqual(self.cache.get_many(['hot:a', 'cold:a']), {'hot:a': 1})
+
+    def test_writes_drop_l1_copy(self):
+        self.cache.set('hot:n', 1)
+        self.assertEqual(self.cache.incr('hot:n'), 2)
+        self.assertEqual(self.cache.get('hot:n'), 2)
+        self.cache.delete('hot:n')
+        self.assertIsNone(self.cache.get('hot:n'))
+
+    def test_shared_hit_fills_l1(self):
+        self.shared.set('hot:b', 'x')
+        self.assertEqual(self.cache.get('hot:b'), 'x')
+        self.shared.delete('hot:b')
+        self.assertEqual(self.cache.get('hot:b'), 'x')
+
+    def test_zero_timeout_skips_l1(self):
+        self.cache.set('hot:c', 1, timeout=0)
+        self.assertIsNone(self.cache.get('hot:c'))
+
+    def test_locmem_with_several_workers(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '3'}):
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_cache()
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '1'}):
+            check_shared_cache()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'n-gram 생성 컬럼은 PostgreSQL 에만 있음 (0008_search_index)')
+class PostgresSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='searcher', password='pw')
+        for title, singer in (('사랑의 노래', '아이유'), ('사랑비', '김태우'), ('Love Dive', '아이브'),
+                              ('Glove', '아이유'), ("it's love", 'o\'neil'), ('밤편지', '아이유')):
+            create_music(user, title, singer)
+
+    def test_results_match_icontains(self):
+        for query in ('사랑', '랑의', 'love', 'ove', '아이', '유', "it's", 'o\'n', '없는곡'):
+            with self.subTest(query=query):
+                expected = set(Music.objects.filter(
+                    Q(music_title__icontains=query) | Q(music_singer__icontains=query)
+                ).values_list('pk', flat=True))
+                self.assertEqual(set(search(Music.objects.all(), query).values_list('pk', flat=True)), expected)
+
+    def test_uses_ngram_column(self):
+        sql = str(search(Music.objects.all(), '사랑').query)
+        self.assertIn('@@', sql)
+        self.assertIn('music_search', sql)
+
+    def test_exact_match_ranks_first(self):
+        self.assertEqual(search(Music.objects.all(), '사랑비').first().music_title, '사랑비')
+
+    def test_broad_query_is_newest_first(self):
+        with mock.patch('apps.twobeats_upload.search.estimated_count', return_value=RANKED_MATCH_LIMIT + 1):
+            results = search(Music.objects.all(), '아이')
+        self.assertNotIn('@@', str(results.query))
+        self.assertEqual(
+            list(results.values_list('pk', flat=True)),
+            list(Music.objects.filter(music_singer__contains='아이').order_by('-music_created_at', '-pk')
+                 .values_list('pk', flat=True)),
+        )
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='typer', password='pw')
+        create_music(cls.user, '사랑의 노래', '아이유', count=10)
+        create_music(cls.user, '사랑비', '김태우', count=50)
+        create_music(cls.user, 'Love Dive', '아이브', count=30)
+        create_music(cls.user, 'Glove', '아이유', count=5)
+
+    def setUp(self):
+        cache.clear()
+        self.index = AutocompleteIndex(Music, background=False)
+
+    def test_prefix_then_infix_by_popularity(self):
+        titles, _ = self.index.suggest('사랑')
+        self.assertEqual(titles, ['사랑비', '사랑의 노래'])
+        titles, _ = self.index.suggest('LOVE')
+        self.assertEqual(titles, ['Love Dive', 'Glove'])
+
+    def test_singer_weight_is_max_of_items(self):
+        _, singers = self.index.suggest('아이')
+        self.assertEqual(singers, ['아이브', '아이유'])
+
+    def test_reflects_saves_and_deletes(self):
+        self.index.suggest('사랑')
+        with self.captureOnCommitCallbacks(execute=True):
+            create_music(self.user, '사랑아', count=100)
+            Music.objects.get(music_title='사랑비').delete()
+        invalidator.flush()
+        self.assertEqual(self.index.suggest('사랑')[0], ['사랑아', '사랑의 노래'])
+
+    def test_chosung_and_jamo_queries(self):
+        self.assertEqual(self.index.suggest('ㅅㄹ')[0], ['사랑비', '사랑의 노래'])
+        self.assertEqual(self.index.suggest('ㄴㄹ')[0], ['사랑의 노래'])
+        self.assertEqual(self.index.suggest('사랑ㅂ')[0], ['사랑비'])
+        self.assertEqual(self.index.suggest('아ㅇ')[1], ['아이브', '아이유'])
+
+
+class HangulKeyTests(SimpleTestCase):
+    def test_chosung_key(self):
+        self.assertEqual(chosung_key('사랑의 노래'), 'ㅅㄹㅇㄴㄹ')
+        self.assertEqual(chosung_key('Love 노래'), 'loveㄴㄹ')
+
+    def test_jamo_key_splits_compound_jamo(self):
+        # 치는 중인 "달ㄱ" 과 완성된 "닭" 의 키가 같아야 함
+        self.assertEqual(jamo_key('닭'), 'ㄷㅏㄹㄱ')
+        self.assertEqual(jamo_key('달ㄱ'), jamo_key('닭'))
+        self.assertEqual(jamo_key('과'), 'ㄱㅗㅏ')
+
+    def test_query_kind(self):
+        self.assertTrue(is_chosung_query('ㅅ ㄹ'))
+        self.assertFalse(is_chosung_query('사ㄹ'))
+        self.assertFalse(is_chosung_query(' '))
+        self.assertTrue(has_jamo('사ㄹ'))
+        self.assertFalse(has_jamo('사랑'))
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='pager', password='pw')
+        # 재생수가 같은 곡이 섞여 있어도 (재생수, id) 순서가 고정되어야 함
+        cls.musics = [create_music(user, f'곡 {i}', count=i // 3) for i in range(8)]
+        cls.expected = [music.pk for music in sorted(cls.musics, key=lambda music: (-music.music_count, -music.pk))]
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Music.objects.order_by('-music_count'), 3)
+
+    def _pks(self, page):
+        return [music.pk for music in page]
+
+    def test_round_trip(self):
+        pages = [self.paginator.page()]
+        while pages[-1].has_next():
+            pages.append(self.paginator.page(pages[-1].next_cursor))
+        self.assertEqual([pk for page in pages for pk in self._pks(page)], self.expected)
+        self.assertFalse(pages[0].has_previous())
+        self.assertEqual(len(pages), 3)
+
+        # 이전 커서로 되돌아가면 같은 페이지
+        for page, previous in zip(pages[:-1], pages[1:]):
+            self.assertEqual(self._pks(self.paginator.page(previous.previous_cursor)), self._pks(page))
+
+    def test_last_page(self):
+        # 마지막 페이지는 끝에서부터 per_page 개 (앞 페이지 경계와 맞추지 않음)
+        page = self.paginator.page(LAST_CURSOR)
+        self.assertEqual(self._pks(page), self.expected[-3:])
+        self.assertFalse(page.has_next())
+        self.assertEqual(self._pks(self.paginator.page(page.previous_cursor)), self.expected[2:5])
+
+    def test_estimated_total(self):
+        paginator = CursorPaginator(Music.objects.order_by('-music_count'), 3, estimate=True)
+        first = paginator.page()
+        if connection.vendor != 'postgresql':
+            self.assertEqual(first.estimated_total, len(self.musics))
+        # 다음 페이지는 커서에 실린 개수를 그대로 씀
+        with self.assertNumQueries(1):
+            second = paginator.page(first.next_cursor)
+        self.assertEqual(second.estimated_total, first.estimated_total)
+
+    def test_invalid_cursor_starts_from_first_page(self):
+        first = self._pks(self.paginator.page())
+        cursors = [
+            'not-base64!',
+            base64.urlsafe_b64encode(b'not json').decode(),
+            raw_cursor({'v': [1, 2], 'd': 'x', 't': None}),
+            raw_cursor({'v': [1], 'd': 'n', 't': None}),
+            raw_cursor({'v': [], 'd': 'n', 't': None}),
+            raw_cursor({'v': [{}, 1], 'd': 'n', 't': None}),
+            raw_cursor({'v': [None, None], 'd': 'n', 't': None}),
+            raw_cursor({'v': [[1], 1], 'd': 'n', 't': None}),
+            raw_cursor({'v': ['many', 'plays'], 'd': 'n', 't': None}),
+            raw_cursor({'v': [1, 1], 'd': 'n', 't': '3'}),
+            encode_cursor(['2026-01-01', 1], 'n'),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self._pks(self.paginator.page(cursor)), first)
+
+    def test_annotation_keys(self):
+        # search_rank 처럼 annotate 한 실수 정렬 키 (커서 값은 output_field 로 변환)
+        queryset = Music.objects.annotate(score=ExpressionWrapper(F('music_count') * 1.5, output_field=FloatField()))
+        paginator = CursorPaginator(queryset.order_by('-score'), 3)
+        first = paginator.page()
+        self.assertEqual(self._pks(first), self.expected[:3])
+        self.assertEqual(self._pks(paginator.page(first.next_cursor)), self.expected[3:6])
+        # 문자열로 온 값도 실수로 비교
+        boundary = Music.objects.get(pk=self.expected[2])
+        cursor = raw_cursor({'v': [str(boundary.music_count * 1.5), boundary.pk], 'd': 'n', 't': None})
+        self.assertEqual(self._pks(paginator.page(cursor)), self.expected[3:6])
+        for value in ['abc', '', '1.5.0']:
+            with self.subTest(value=value):
+                cursor = raw_cursor({'v': [value, 1], 'd': 'n', 't': None})
+                self.assertEqual(self._pks(paginator.page(cursor)), self.expected[:3])
+
+
+class FacetCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='facet', password='pw')
+        calm, loud = Tag.objects.create(name='calm'), Tag.objects.create(name='loud')
+        create_music(user, 'love song').tags.add(calm)
+        create_music(user, 'night walk').tags.add(loud)
+        create_music(user, 'love dance', music_type='dance').tags.add(calm, loud)
+
+    def setUp(self):
+        cache.clear()
+
+    def _counts(self, result):
+        return (
+            {genre['value']: genre['count'] for genre in result['genres'] if genre['count']},
+            {tag['name']: tag['count'] for tag in result['tags']},
+        )
+
+    def test_query_counts(self):
+        self.assertEqual(
+            self._counts(facet_counts(Music, 'LOVE ')),
+            ({'ballad': 1, 'dance': 1}, {'calm': 2, 'loud': 1}),
+        )
+
+    def test_selected_filters_apply_to_the_other_facet(self):
+        # 장르 개수에는 태그 조건만, 태그 개수에는 장르 조건만
+        self.assertEqual(
+            self._counts(facet_counts(Music, 'love', genre='ballad', tag='loud')),
+            ({'dance': 1}, {'calm': 1, 'loud': 0}),
+        )
+        self.assertEqual(facet_counts(Music, 'love', genre='ballad', tag='loud')['tags'][-1], {'name': 'loud', 'count': 0})
+
+    def test_stored_counts_match_computed(self):
+        for genre, tag in (('', ''), ('ballad', ''), ('', 'calm'), ('dance', 'loud')):
+            with self.subTest(genre=genre, tag=tag):
+                cache.clear()
+                computed = facet_counts(Music, genre=genre, tag=tag)
+                refresh_facets([Music])
+                cache.clear()
+                with self.assertNumQueries(1):
+                    stored = facet_counts(Music, genre=genre, tag=tag)
+                self.assertEqual(stored, computed)
+        self.assertEqual(
+            self._counts(facet_counts(Music)),
+            ({'ballad': 2, 'dance': 1}, {'calm': 2, 'loud': 2}),
+        )
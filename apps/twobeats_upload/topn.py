@@ -0,0 +1,21 @@
+"""
+그룹(장르 등)별 상위 N개 조회
+
+그룹마다 쿼리를 따로 날리지 않고
+ROW_NUMBER() OVER (PARTITION BY 그룹 ORDER BY 정렬) <= N 한 번으로 모든 그룹의 상위 N개를 가져온다.
+(Django 가 윈도 함수 조건을 서브쿼리로 감싸 주므로 PostgreSQL, SQLite 3.25+ 공통)
+"""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def top_per_group(queryset, group_field, ordering, limit):
+    """
+    :param group_field: 그룹 기준 필드 (예: 'music_type')
+    :param ordering: 그룹 안 정렬, order_by 와 같은 형식 (예: ['-total_score', '-pk'])
+    :param limit: 그룹당 개수
+    :return: 그룹, 그룹 내 순위(group_position) 순으로 정렬된 쿼리셋
+    """
+    return queryset.annotate(
+        group_position=Window(RowNumber(), partition_by=F(group_field), order_by=ordering)
+    ).filter(group_position__lte=limit).order_by(group_field, 'group_position')
@@ -52,4 +52,9 @@ urlpatterns = [
     path('video/<int:video_id>/like/', views.video_like, name='video_like'),
     path('video/<int:video_id>/comment/create/', views.video_comment_create, name='video_comment_create'),
     path('video-comment/<int:comment_id>/delete/', views.video_comment_delete, name='video_comment_delete'),
+    
+    # ============================================
+    # Like API (음악/영상 공용)
+    # ============================================
+    path('like-status/', views.like_status_batch_view, name='like_status_batch'),
 ]
\ No newline at end of file
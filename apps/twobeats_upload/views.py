@@ -3,10 +3,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from .models import Music, Video, Tag
 from .forms import MusicForm, VideoForm, MusicFileForm, VideoFileForm
-from django.db.models import F
+from .counters import play_counter
+from .events import play_events
+from .likes import toggle_like, like_status_batch
+from .comments import create_comment, delete_comment
 from django.urls import reverse
-from apps.twobeats_music_explore.models import MusicLike, MusicComment
-from apps.twobeats_video_explore.models import VideoLike, VideoComment
+from apps.twobeats_music_explore.models import MusicComment
+from apps.twobeats_video_explore.models import VideoComment
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
 from django.core.files.base import ContentFile
@@ -444,9 +447,10 @@ def cleanup_temp_video(request):
 @require_POST
 def music_play(request, music_id):
     try:
-        music = Music.objects.get(id=music_id)
-        music.music_count += 1
-        music.save(update_fields=['music_count'])
+        music = Music.objects.only('music_count').get(id=music_id)
+        # 재생수는 버퍼에 모았다가 일괄 반영 (counters.py 참고)
+        music.music_count += play_counter.incr('music_play', music.pk)
+        play_events.record('music_play', music.pk)
         return JsonResponse({'success': True, 'play_count': music.music_count})
     except Music.DoesNotExist:
         return JsonResponse({'success': False, 'error': '음악을 찾을 수 없습니다.'}, status=404)
@@ -455,25 +459,13 @@ def music_play(request, music_id):
 @require_POST
 @login_required
 def music_like(request, music_id):
-    try:
-        music = Music.objects.get(id=music_id)
-        user = request.user
-        like_exists = MusicLike.objects.filter(user=user, music=music).exists()
-        
-        if like_exists:
-            MusicLike.objects.filter(user=user, music=music).delete()
-            music.music_like_count = max(0, music.music_like_count - 1)
-            is_liked = False
-        else:
-            MusicLike.objects.create(user=user, music=music)
-            music.music_like_count += 1
-            is_liked = True
-        
-        music.save(update_fields=['music_like_count'])
-        return JsonResponse({'success': True, 'is_liked': is_liked, 'like_count': music.music_like_count})
-    except Music.DoesNotExist:
+    result = toggle_like(request.user, 'music', music_id)
+    if result is None:
         return JsonResponse({'success': False, 'error': '음악을 찾을 수 없습니다.'}, status=404)
 
+    is_liked, like_count = result
+    return JsonResponse({'success': True, 'is_liked': is_liked, 'like_count': like_count})
+
 
 @require_POST
 @login_required
@@ -485,7 +477,8 @@ def music_comment_create(request, music_id):
         if not content:
             return JsonResponse({'success': False, 'error': '댓글 내용을 입력해주세요.'}, status=400)
         
-        comment = MusicComment.objects.create(user=request.user, music=music, content=content)
+        # 댓글 추가 + 댓글수 증가를 한 트랜잭션에서, 응답에는 저장된 댓글수 (comments.py)
+        comment, comment_count = create_comment(request.user, 'music', music, content)
         
         return JsonResponse({
             'success': True,
@@ -497,7 +490,7 @@ def music_comment_create(request, music_id):
                 'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M'),
                 'is_owner': True
             },
-            'comment_count': music.comments.count()
+            'comment_count': comment_count
         })
     except Music.DoesNotExist:
         return JsonResponse({'success': False, 'error': '음악을 찾을 수 없습니다.'}, status=404)
@@ -512,11 +505,9 @@ def music_comment_delete(request, comment_id):
         if comment.user != request.user:
             return JsonResponse({'success': False, 'error': '본인의 댓글만 삭제할 수 있습니다.'}, status=403)
         
-        music_id = comment.music.id
-        comment.delete()
-        music = Music.objects.get(id=music_id)
+        comment_count = delete_comment('music', comment)
         
-        return JsonResponse({'success': True, 'comment_count': music.comments.count()})
+        return JsonResponse({'success': True, 'comment_count': comment_count})
     except MusicComment.DoesNotExist:
         return JsonResponse({'success': False, 'error': '댓글을 찾을 수 없습니다.'}, status=404)
 
@@ -524,9 +515,9 @@ def music_comment_delete(request, comment_id):
 @require_POST
 def video_play(request, video_id):
     try:
-        video = Video.objects.get(id=video_id)
-        video.video_views += 1
-        video.save(update_fields=['video_views'])
+        video = Video.objects.only('video_views').get(id=video_id)
+        video.video_views += play_counter.incr('video_view', video.pk)
+        play_events.record('video_view', video.pk)
         return JsonResponse({'success': True, 'view_count': video.video_views})
     except Video.DoesNotExist:
         return JsonResponse({'success': False, 'error': '영상을 찾을 수 없습니다.'}, status=404)
@@ -535,25 +526,13 @@ def video_play(request, video_id):
 @require_POST
 @login_required
 def video_like(request, video_id):
-    try:
-        video = Video.objects.get(id=video_id)
-        user = request.user
-        like_exists = VideoLike.objects.filter(user=user, video=video).exists()
-        
-        if like_exists:
-            VideoLike.objects.filter(user=user, video=video).delete()
-            video.video_like_count = max(0, video.video_like_count - 1)
-            is_liked = False
-        else:
-            VideoLike.objects.create(user=user, video=video)
-            video.video_like_count += 1
-            is_liked = True
-        
-        video.save(update_fields=['video_like_count'])
-        return JsonResponse({'success': True, 'is_liked': is_liked, 'like_count': video.video_like_count})
-    except Video.DoesNotExist:
+    result = toggle_like(request.user, 'video', video_id)
+    if result is None:
         return JsonResponse({'success': False, 'error': '영상을 찾을 수 없습니다.'}, status=404)
 
+    is_liked, like_count = result
+    return JsonResponse({'success': True, 'is_liked': is_liked, 'like_count': like_count})
+
 
 @require_POST
 @login_required
@@ -565,7 +544,7 @@ def video_comment_create(request, video_id):
         if not content:
             return JsonResponse({'success': False, 'error': '댓글 내용을 입력해주세요.'}, status=400)
         
-        comment = VideoComment.objects.create(user=request.user, video=video, content=content)
+        comment, comment_count = create_comment(request.user, 'video', video, content)
         
         return JsonResponse({
             'success': True,
@@ -577,7 +556,7 @@ def video_comment_create(request, video_id):
                 'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M'),
                 'is_owner': True
             },
-            'comment_count': video.comments.count()
+            'comment_count': comment_count
         })
     except Video.DoesNotExist:
         return JsonResponse({'success': False, 'error': '영상을 찾을 수 없습니다.'}, status=404)
@@ -592,10 +571,30 @@ def video_comment_delete(request, comment_id):
         if comment.user != request.user:
             return JsonResponse({'success': False, 'error': '본인의 댓글만 삭제할 수 있습니다.'}, status=403)
         
-        video_id = comment.video.id
-        comment.delete()
-        video = Video.objects.get(id=video_id)
+        comment_count = delete_comment('video', comment)
         
-        return JsonResponse({'success': True, 'comment_count': video.comments.count()})
+        return JsonResponse({'success': True, 'comment_count': comment_count})
     except VideoComment.DoesNotExist:
-        return JsonResponse({'success': False, 'error': '댓글을 찾을 수 없습니다.'}, status=404)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': '댓글을 찾을 수 없습니다.'}, status=404)
+
+
+# 한 번에 조회할 수 있는 최대 id 수
+LIKE_STATUS_BATCH_LIMIT = 200
+
+
+def _parse_ids(value):
+    """'1,2,3' -> [1, 2, 3] (숫자가 아닌 값은 무시, '²' '①' 처럼 int() 가 못 읽는 숫자 문자 포함)"""
+    return [int(v) for v in value.split(',') if v.strip().isdecimal()][:LIKE_STATUS_BATCH_LIMIT]
+
+
+def like_status_batch_view(request):
+    """
+    여러 음악/영상의 좋아요 상태 일괄 조회 (AJAX)
+    GET ?music=1,2,3&video=4,5 -> 종류별 쿼리 1회
+    """
+    result = {}
+    for kind in ('music', 'video'):
+        ids = _parse_ids(request.GET.get(kind, ''))
+        statuses = like_status_batch(request.user, kind, ids) if ids else {}
+        result[kind] = {str(pk): status for pk, status in statuses.items()}
+    return JsonResponse({'success': True, **result})
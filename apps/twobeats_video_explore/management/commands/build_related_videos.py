@@ -0,0 +1,32 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.twobeats_video_explore.related import changed_since, rebuild
+
+
+class Command(BaseCommand):
+    help = '관련 영상 테이블 재계산 (기본: 전체, 매일 실행 / --since-minutes: 바뀐 영상만)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since-minutes', type=int,
+            help='최근 N분 동안 업로드/수정되었거나 좋아요가 달린 영상만 다시 계산 (주기 실행용, 실행 주기보다 길게)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        video_ids = None
+        if options['since_minutes'] is not None:
+            video_ids = changed_since(timezone.now() - timedelta(minutes=options['since_minutes']))
+            if not video_ids:
+                self.stdout.write('[SKIP] 바뀐 영상 없음')
+                return
+
+        videos, rows = rebuild(video_ids)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'관련 영상 갱신 완료! 영상 {videos}개, {rows}행 ({elapsed:.2f}s)'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0007_video_scores'),
+        ('twobeats_video_explore', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(db_column='vn_rank', verbose_name='순위')),
+                ('score', models.FloatField(db_column='vn_score', verbose_name='추천 점수')),
+                ('neighbor', models.ForeignKey(db_column='vn_neighbor_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='twobeats_upload.video', verbose_name='관련 영상')),
+                ('video', models.ForeignKey(db_column='vn_video_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='twobeats_upload.video', verbose_name='영상')),
+            ],
+            options={
+                'verbose_name': '관련 영상',
+                'verbose_name_plural': '관련 영상',
+                'db_table': 'video_neighbor',
+                'unique_together': {('video', 'rank')},
+            },
+        ),
+    ]
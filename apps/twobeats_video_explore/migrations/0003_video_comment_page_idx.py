@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_video_explore', '0002_video_neighbor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='videocomment',
+            index=models.Index(fields=['video', 'created_at', 'id'], name='video_comment_page_idx'),
+        ),
+    ]
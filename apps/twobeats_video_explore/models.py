@@ -65,8 +65,50 @@ class VideoComment(models.Model):
     class Meta:
         db_table = 'video_comment'
         ordering = ['-created_at']
+        indexes = [
+            # 영상별 댓글 커서 페이지네이션 (ORDER BY 작성일 DESC, id DESC)
+            models.Index(fields=['video', 'created_at', 'id'], name='video_comment_page_idx'),
+        ]
         verbose_name = '영상 댓글'
         verbose_name_plural = '영상 댓글'
     
     def __str__(self):
-        return f"{self.user.username}: {self.content[:20]}"
\ No newline at end of file
+        return f"{self.user.username}: {self.content[:20]}"
+
+class VideoNeighbor(models.Model):
+    """
+    관련 영상 (영상별 추천 점수 상위 20개)
+    - build_related_videos 명령이 매일 전체, 주기적으로 바뀐 영상만 다시 계산 (related.py 참고)
+    - 영상 상세 페이지는 (영상, 순위) 인덱스 조회 한 번
+    """
+    video = models.ForeignKey(
+        'twobeats_upload.Video',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='vn_video_id',
+        verbose_name='영상'
+    )
+    neighbor = models.ForeignKey(
+        'twobeats_upload.Video',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='vn_neighbor_id',
+        verbose_name='관련 영상'
+    )
+    rank = models.PositiveSmallIntegerField(
+        db_column='vn_rank',
+        verbose_name='순위'
+    )
+    score = models.FloatField(
+        db_column='vn_score',
+        verbose_name='추천 점수'
+    )
+
+    class Meta:
+        db_table = 'video_neighbor'
+        unique_together = ('video', 'rank')
+        verbose_name = '관련 영상'
+        verbose_name_plural = '관련 영상'
+
+    def __str__(self):
+        return f"{self.video_id} -> {self.neighbor_id} #{self.rank} ({self.score:.1f})"
@@ -0,0 +1,188 @@
+"""
+관련 영상 (영상 상세 페이지 추천)
+
+영상 상세 페이지마다 태그/좋아요를 조인해 점수를 매기지 않도록
+같은 점수를 전체 영상에 대해 한 번에 계산해 영상별 상위 RELATED_SIZE 개를 video_neighbor 에 저장한다.
+
+점수 (기존 하이브리드 추천과 같음)
+- 같은 아티스트 30, 같은 장르 20, 겹치는 태그 1개당 10
+- 이 영상을 좋아요한 유저 중 후보 영상도 좋아요한 유저 1명당 15
+- 조회수 / 100, 최근 7일 내 업로드 10
+- 후보는 아티스트/장르/태그 중 하나 이상 같은 영상
+
+- 전체 재계산: build_related_videos (매일)
+- 바뀐 영상만: build_related_videos --since-minutes N
+  (업로드/수정되었거나 새 좋아요가 달린 영상의 목록만 다시 계산,
+   새 영상이 다른 영상의 목록에 들어가는 것은 다음 전체 재계산 때 반영)
+  바뀐 영상과 아티스트/장르/태그가 겹치는 후보 영상, 바뀐 영상을 좋아요한 유저의 좋아요만 읽는다
+- 함께 좋아요 쌍은 유저당 (좋아요 수)^2 개이므로 최근 좋아요 MAX_LIKES_PER_USER 개만 사용
+  (apps/twobeats_worldcup/recommender.py 의 MAX_ITEMS_PER_USER 와 같은 방식)
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.twobeats_upload.models import Video
+from apps.twobeats_upload.tag_index import popcount
+
+from .models import VideoLike, VideoNeighbor
+
+# 영상별로 저장할 관련 영상 수
+RELATED_SIZE = 20
+
+SCORE_WEIGHTS = {
+    'artist': 30,
+    'type': 20,
+    'tag': 10,
+    'collab': 15,
+    'recency': 10,
+}
+POPULARITY_DIVISOR = 100.0
+RECENCY_DAYS = 7
+
+# 유저별로 함께 좋아요 쌍을 만들 최근 좋아요 수
+MAX_LIKES_PER_USER = 300
+
+
+class _Catalog:
+    """
+    점수 계산에 필요한 영상 정보 (NumPy 배열, 영상 id 순)
+    video_ids 를 주면 그 영상들과 후보가 될 수 있는 영상(아티스트/장르/태그가 겹침)만 읽는다.
+    """
+
+    def __init__(self, video_ids=None):
+        videos = Video.objects.all()
+        likes = VideoLike.objects.all()
+        if video_ids is not None:
+            video_ids = list(video_ids)
+            targets = Video.objects.filter(pk__in=video_ids)
+            target_tags = Video.tags.through.objects.filter(video_id__in=video_ids).values('tag_id')
+            videos = videos.filter(
+                Q(pk__in=video_ids)
+                | Q(video_singer__in=targets.values('video_singer'))
+                | Q(video_type__in=targets.values('video_type'))
+                | Q(pk__in=Video.tags.through.objects.filter(tag_id__in=target_tags).values('video_id'))
+            )
+            # 바뀐 영상을 좋아요한 유저의 좋아요만 (유저별 최근 좋아요 제한은 전체 계산과 같게 적용)
+            likes = likes.filter(user_id__in=VideoLike.objects.filter(video_id__in=video_ids).values('user_id'))
+
+        rows = list(videos.order_by('pk').values_list(
+            'pk', 'video_singer', 'video_type', 'video_views', 'video_created_at'
+        ))
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.index = {pk: position for position, pk in enumerate(self.ids.tolist())}
+        size = len(rows)
+        # 목록을 다시 계산할 영상 위치 (None = 전체)
+        self.targets = None
+        if video_ids is not None:
+            self.targets = np.array(sorted(self.index[pk] for pk in video_ids if pk in self.index), dtype=np.int64)
+
+        _, self.artists = np.unique([row[1] for row in rows], return_inverse=True)
+        _, self.types = np.unique([row[2] for row in rows], return_inverse=True)
+        recent_from = timezone.now() - timedelta(days=RECENCY_DAYS)
+        self.base_scores = (
+            np.array([row[3] for row in rows], dtype=np.float64) / POPULARITY_DIVISOR
+            + SCORE_WEIGHTS['recency'] * np.array([row[4] >= recent_from for row in rows], dtype=np.float64)
+        )
+
+        tag_rows = Video.tags.through.objects.values_list('video_id', 'tag_id')
+        if video_ids is not None:
+            tag_rows = tag_rows.filter(video_id__in=videos.order_by().values('pk'))
+        video_tags = [
+            (self.index[video_id], tag_id)
+            for video_id, tag_id in tag_rows
+            if video_id in self.index
+        ]
+        # 영상별 태그 비트셋 (uint64 배열, 겹치는 태그 수 = popcount(a & b), tag_index.py 와 같은 방식)
+        tag_ids = sorted({tag_id for _, tag_id in video_tags})
+        tag_index = {tag_id: position for position, tag_id in enumerate(tag_ids)}
+        self.tags = np.zeros((size, max(1, (len(tag_ids) + 63) // 64)), dtype=np.uint64)
+        for position, tag_id in video_tags:
+            bit = tag_index[tag_id]
+            self.tags[position, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+
+        # 함께 좋아요한 유저 수 (영상 쌍별, 정렬된 키 = 영상 * size + 후보)
+        liked_by = {}
+        for user_id, video_id, created_at in likes.values_list('user_id', 'video_id', 'created_at').iterator(chunk_size=10000):
+            liked_by.setdefault(user_id, []).append((created_at, video_id))
+        keys = []
+        for user_likes in liked_by.values():
+            if len(user_likes) > MAX_LIKES_PER_USER:
+                user_likes = sorted(user_likes, reverse=True)[:MAX_LIKES_PER_USER]
+            positions = np.array([self.index[video_id] for _, video_id in user_likes if video_id in self.index], dtype=np.int64)
+            if len(positions) < 2:
+                continue
+            # 바뀐 영상만 계산할 때는 그 영상들이 앞(기준)인 쌍만 필요
+            left = positions if self.targets is None else positions[np.isin(positions, self.targets)]
+            keys.append(np.add.outer(left * size, positions).ravel())
+        if keys:
+            self.pair_keys, self.pair_counts = np.unique(np.concatenate(keys), return_counts=True)
+        else:
+            self.pair_keys, self.pair_counts = np.empty(0, np.int64), np.empty(0, np.int64)
+
+    def related(self, position, limit):
+        """한 영상의 관련 영상 (위치 배열, 점수 배열), 점수 내림차순"""
+        size = len(self.ids)
+        same_artist = self.artists == self.artists[position]
+        same_type = self.types == self.types[position]
+        common_tags = popcount(self.tags & self.tags[position])
+
+        candidates = same_artist | same_type | (common_tags > 0)
+        candidates[position] = False
+
+        scores = (
+            self.base_scores
+            + SCORE_WEIGHTS['artist'] * same_artist
+            + SCORE_WEIGHTS['type'] * same_type
+            + SCORE_WEIGHTS['tag'] * common_tags
+        )
+        start, end = np.searchsorted(self.pair_keys, [position * size, (position + 1) * size])
+        scores[self.pair_keys[start:end] % size] += SCORE_WEIGHTS['collab'] * self.pair_counts[start:end]
+
+        found = np.flatnonzero(candidates)
+        # 점수 내림차순, 같으면 id 순
+        top = found[np.lexsort((self.ids[found], -scores[found]))[:limit]]
+        return top, scores[top]
+
+
+def rebuild(video_ids=None, limit=RELATED_SIZE):
+    """
+    관련 영상 재계산
+    :param video_ids: 다시 계산할 영상 id 목록, None 이면 전체 (테이블 통째로 교체)
+    :return: (계산한 영상 수, 저장한 행 수)
+    """
+    catalog = _Catalog(video_ids)
+    positions = range(len(catalog.ids)) if catalog.targets is None else catalog.targets.tolist()
+
+    rows = []
+    for position in positions:
+        video_id = int(catalog.ids[position])
+        top, scores = catalog.related(position, limit)
+        rows += [
+            VideoNeighbor(video_id=video_id, neighbor_id=neighbor_id, rank=rank, score=score)
+            for rank, (neighbor_id, score) in enumerate(zip(catalog.ids[top].tolist(), scores.tolist()), start=1)
+        ]
+
+    with transaction.atomic():
+        stale = VideoNeighbor.objects.all()
+        if video_ids is not None:
+            stale = stale.filter(video_id__in=list(video_ids))
+        stale.delete()
+        VideoNeighbor.objects.bulk_create(rows, batch_size=1000)
+    return len(positions), len(rows)
+
+
+def changed_since(since):
+    """since 이후 업로드/수정되었거나 새 좋아요가 달린 영상 id"""
+    changed = set(Video.objects.filter(video_updated_at__gte=since).values_list('pk', flat=True))
+    changed.update(VideoLike.objects.filter(created_at__gte=since).values_list('video_id', flat=True))
+    return changed
+
+
+def related_videos(video_id, limit=RELATED_SIZE):
+    """미리 계산해 둔 관련 영상 (점수 순 Video 리스트)"""
+    rows = VideoNeighbor.objects.filter(video_id=video_id).select_related('neighbor').order_by('rank')[:limit]
+    return [row.neighbor for row in rows]
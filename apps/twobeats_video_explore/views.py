@@ -1,24 +1,33 @@
 # -*- coding: utf-8 -*-
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
-from django.core.paginator import Paginator
-from django.core.cache import cache  # video_detail: 관련 영상 추천 캐싱
-from django.db.models import Q, Count, F, ExpressionWrapper, IntegerField, Case, When, FloatField  # video_detail: 하이브리드 추천 알고리즘
+from django.http import JsonResponse, Http404
+from django.db.models import Q
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
-from apps.twobeats_account.models import VideoHistory, VideoPlaylist
-from django.utils import timezone  # video_detail: 신규 영상 보너스 계산, 히스토리 시각 업데이트
-from datetime import timedelta  # video_detail: 최근 7일 필터링
+from apps.twobeats_account.models import VideoPlaylist
+from apps.twobeats_account.history import record_play
 import mimetypes
-import logging  # video_detail: 추천 알고리즘 에러 로깅
 import random  # video_detail: 랜덤 추천 (다양성 확보)
 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from ranged_response import RangedFileResponse
 
-from apps.twobeats_upload.models import Video, Tag
+from apps.twobeats_upload.models import Video
+from apps.twobeats_upload.autocomplete import video_autocomplete
+from apps.twobeats_upload.charts import chart_items
+from apps.twobeats_upload.comments import create_comment, delete_comment as delete_comment_service
+from apps.twobeats_upload.counters import play_counter
+from apps.twobeats_upload.events import play_events
+from apps.twobeats_upload.facets import facet_counts
+from apps.twobeats_upload.dedup import first_play
+from apps.twobeats_upload.invalidation import generations
+from apps.twobeats_upload.search import search
+from apps.twobeats_upload.singleflight import cached
+from apps.twobeats_upload.likes import toggle_like as toggle_like_service, liked_ids
+from apps.twobeats_upload.pagination import CursorPaginator
 from .models import VideoLike, VideoComment
+from .related import related_videos as related_videos_of
 
 
 def video_list(request, video_type=None):
@@ -42,33 +51,30 @@ def video_list(request, video_type=None):
     # 검색 기능
     search_query = request.GET.get('q', '').strip()
     if search_query:
-        videos = videos.filter(
-            Q(video_title__icontains=search_query) |
-            Q(video_singer__icontains=search_query)
-        )
+        # 제목/가수 검색 (PostgreSQL: n-gram/트라이그램 인덱스, search.py 참고)
+        videos = search(videos, search_query)
+
+    # 인기 영상 TOP3 (5분 캐싱, 만료/무효화 시 한 워커만 다시 계산: singleflight.py)
+    # 타입별 세대 번호가 바뀌면(업로드/좋아요/태그 변경) 오래된 값으로 보고 새로 계산 (invalidation.py)
+    generation, = generations(f'top_videos:{video_type or "all"}')
+    top_videos = cached(
+        f'top_videos:{video_type}:{selected_tag}:{search_query}',
+        # 저장된 인기 점수(조회수*3 + 재생수*2 + 좋아요*4) 인덱스로 상위 3개 (scores.py 참고)
+        lambda: list(videos.order_by('-video_popularity', '-id')[:3]),
+        60 * 5,
+        generation=generation,
+    )
+
+    # 일반 영상 리스트 (최신순 또는 트렌딩순, 좋아요 수는 video_like_count 필드 사용)
+    # 트렌딩순은 저장된 트렌딩 점수 인덱스(video_trending_idx)로 읽음 (scores.py 참고)
+    sort = 'trending' if request.GET.get('sort') == 'trending' else 'latest'
+    if sort == 'trending':
+        videos = videos.order_by('-video_trending_score', '-id')
+    else:
+        videos = videos.order_by('-video_created_at')
 
-    # 인기 영상 TOP3 (캐싱 + 간단한 점수 계산)
-    cache_key = f'top_videos_{video_type}_{selected_tag}_{search_query}'
-    top_videos = cache.get(cache_key)
-
-    if not top_videos:
-        # DB에 저장된 값만 사용 (조회수, 재생수, 좋아요수)
-        top_videos = list(videos.annotate(
-            popularity_score=ExpressionWrapper(
-                (F('video_views') * 3) + (F('video_play_count') * 2) + (F('video_like_count') * 4),
-                output_field=IntegerField()
-            )
-        ).order_by('-popularity_score')[:3])
-        # 5분간 캐싱
-        cache.set(cache_key, top_videos, 60 * 5)
-
-    # 일반 영상 리스트 (최신순, 좋아요 수는 video_like_count 필드 사용)
-    videos = videos.order_by('-video_created_at')
-
-    # 페이지네이션 (한 페이지당 16개)
-    paginator = Paginator(videos, 16)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # 커서 페이지네이션 (한 페이지당 16개, 검색 결과 수는 첫 페이지에서 추정해 커서로 넘김: pagination.py)
+    page_obj = CursorPaginator(videos, 16, estimate=bool(search_query)).page(request.GET.get('cursor'))
 
     # 각 영상에 포맷팅된 재생 시간 추가
     for video in page_obj.object_list:
@@ -76,23 +82,23 @@ def video_list(request, video_type=None):
         seconds = video.video_time % 60
         video.formatted_time = f"{minutes}:{seconds:02d}"
 
-    # 영상 타입 선택지 가져오기
-    video_types = Video.GENRE_CHOICES
-
-    # 모든 태그 가져오기 (사용 빈도순)
-    all_tags = Tag.objects.annotate(
-        video_count=Count('videos')
-    ).filter(video_count__gt=0).order_by('-video_count')
+    # 장르/태그 필터별 결과 수 (현재 검색 조건 기준, 개수 많은 태그순, facets.py 참고)
+    facets = facet_counts(Video, search_query, video_type or '', selected_tag or '')
 
     context = {
         'videos': page_obj,
         'top_videos': top_videos,
         'current_type': video_type,
-        'video_types': video_types,
+        'genre_facets': facets['genres'],
         'search_query': search_query,
         'page_obj': page_obj,
-        'all_tags': all_tags,
+        'tag_facets': facets['tags'],
         'selected_tag': selected_tag,
+        'current_sort': sort,
+        # TOP3 + 이 페이지 영상들의 좋아요 여부 (요청당 1회, has_liked_video 필터도 이 결과를 씀: likes.py)
+        'liked_video_ids': liked_ids(
+            request.user, 'video', [video.pk for video in [*top_videos, *page_obj.object_list]]
+        ),
     }
 
     return render(request, 'video_explore/video_list.html', context)
@@ -108,12 +114,11 @@ def video_detail(request, video_id):
 
     video = get_object_or_404(Video, pk=video_id)
 
-    # 조회수 증가 (세션으로 중복 방지)
-    viewed_key = f'viewed_video_{video_id}'
-    if not request.session.get(viewed_key):
-        video.video_views += 1
-        video.save(update_fields=['video_views'])
-        request.session[viewed_key] = True
+    # 조회수 증가 (방문자별 블룸 필터로 중복 방지, dedup.py 참고)
+    if first_play(request, 'video_view', video.pk):
+        # 조회수는 버퍼에 모았다가 일괄 반영 (counters.py 참고)
+        video.video_views += play_counter.incr('video_view', video.pk)
+        play_events.record('video_view', video.pk)
 
     # 현재 사용자의 좋아요 상태 확인
     is_liked = False
@@ -129,10 +134,8 @@ def video_detail(request, video_id):
     # 댓글 목록 (최신순)
     comments = VideoComment.objects.filter(video=video).select_related('user').order_by('-created_at')
 
-    # 댓글 페이지네이션 (한 페이지당 10개)
-    paginator = Paginator(comments, 10)
-    page_number = request.GET.get('page', 1)
-    comments_page = paginator.get_page(page_number)
+    # 댓글 커서 페이지네이션 (한 페이지당 10개, (작성 시각, id) 다음부터 읽음)
+    comments_page = CursorPaginator(comments, 10).page(request.GET.get('cursor'))
 
     # 태그 목록
     tags = video.tags.all()
@@ -147,127 +150,26 @@ def video_detail(request, video_id):
     #     Q(video_singer=video.video_singer) | Q(video_type=video.video_type)
     # ).exclude(pk=video_id).order_by('-video_views')[:6]
 
-    # --- [방법 2] 하이브리드 추천 (콘텐츠 + 협업 필터링 + 캐싱 + 랜덤성) ---
-    # 필요한 모듈들: cache, Case, When, FloatField, random, timezone, timedelta, logging
-    # (모두 파일 최상단에서 import됨)
-
-    logger = logging.getLogger(__name__)
-
-    # 1. 캐시 확인
-    cache_key = f'related_videos_{video_id}'
-    related_videos = cache.get(cache_key)
+    # --- [방법 2] 하이브리드 추천 (콘텐츠 + 협업 필터링 + 랜덤성) ---
+    # 점수 계산은 build_related_videos 명령이 미리 해 두고 여기서는 상위 20개만 읽음 (related.py 참고)
+    related_videos = related_videos_of(video.pk)
 
-    if not related_videos:
-        try:
-            # 2. 10% 확률로 다양성 추천 (인기 편향 방지)
-            if random.random() < 0.1:
-                # 무작위 추천 (최신 영상 우선)
-                related_videos = Video.objects.exclude(
-                    pk=video_id
-                ).order_by('-video_created_at')[:6]
-            else:
-                # 90% 확률로 하이브리드 추천
-                video_tags = video.tags.all()
-
-                # 후보 영상 필터링 (같은 아티스트, 장르, 태그)
-                candidate_videos = Video.objects.filter(
-                    Q(video_singer=video.video_singer) |
-                    Q(video_type=video.video_type) |
-                    Q(tags__in=video_tags)
-                ).exclude(pk=video_id).distinct()
-
-                # 현재 영상을 좋아요한 사용자들
-                users_who_liked = VideoLike.objects.filter(
-                    video=video
-                ).values_list('user', flat=True)
-
-                # 점수 계산
-                if users_who_liked.exists():
-                    # 좋아요 데이터 있을 때: 협업 필터링 포함
-                    related_videos = candidate_videos.annotate(
-                        # 콘텐츠 유사도 점수
-                        same_artist_score=Case(
-                            When(video_singer=video.video_singer, then=30),
-                            default=0,
-                            output_field=IntegerField()
-                        ),
-                        same_type_score=Case(
-                            When(video_type=video.video_type, then=20),
-                            default=0,
-                            output_field=IntegerField()
-                        ),
-                        common_tags_score=Count('tags', filter=Q(tags__in=video_tags)) * 10,
-                        # 협업 필터링 점수 (좋아요 기반)
-                        collab_score=Count('videolike', filter=Q(videolike__user__in=users_who_liked), distinct=True) * 15,
-                        # 인기도 점수 (조회수 정규화)
-                        popularity_score=ExpressionWrapper(
-                            F('video_views') / 100.0,
-                            output_field=FloatField()
-                        ),
-                        # 신규 영상 보너스 (최근 7일)
-                        recency_bonus=Case(
-                            When(
-                                video_created_at__gte=timezone.now() - timedelta(days=7),
-                                then=10
-                            ),
-                            default=0,
-                            output_field=IntegerField()
-                        ),
-                        # 최종 점수
-                        final_score=ExpressionWrapper(
-                            F('same_artist_score') + F('same_type_score') +
-                            F('common_tags_score') + F('collab_score') +
-                            F('popularity_score') + F('recency_bonus'),
-                            output_field=FloatField()
-                        )
-                    ).order_by('-final_score')[:6]
-                else:
-                    # 좋아요 데이터 없을 때: 콘텐츠 기반만
-                    related_videos = candidate_videos.annotate(
-                        same_artist_score=Case(
-                            When(video_singer=video.video_singer, then=30),
-                            default=0,
-                            output_field=IntegerField()
-                        ),
-                        same_type_score=Case(
-                            When(video_type=video.video_type, then=20),
-                            default=0,
-                            output_field=IntegerField()
-                        ),
-                        common_tags_score=Count('tags', filter=Q(tags__in=video_tags)) * 10,
-                        popularity_score=ExpressionWrapper(
-                            F('video_views') / 100.0,
-                            output_field=FloatField()
-                        ),
-                        recency_bonus=Case(
-                            When(
-                                video_created_at__gte=timezone.now() - timedelta(days=7),
-                                then=10
-                            ),
-                            default=0,
-                            output_field=IntegerField()
-                        ),
-                        final_score=ExpressionWrapper(
-                            F('same_artist_score') + F('same_type_score') +
-                            F('common_tags_score') + F('popularity_score') + F('recency_bonus'),
-                            output_field=FloatField()
-                        )
-                    ).order_by('-final_score')[:6]
-
-            # 3. 캐시에 저장 (1시간)
-            cache.set(cache_key, list(related_videos), 60*60)
-
-        except Exception as e:
-            # 에러 발생 시 기본 추천으로 폴백
-            logger.error(f'추천 알고리즘 에러 (video_id={video_id}): {str(e)}')
-
-            # 간단한 추천으로 대체 (같은 아티스트 또는 같은 장르, 조회수 높은 순)
-            related_videos = Video.objects.filter(
+    if related_videos:
+        # 10% 확률로 다양성 추천 (인기 편향 방지): 상위 20개 중 무작위
+        if random.random() < 0.1:
+            related_videos = random.sample(related_videos, min(6, len(related_videos)))
+        else:
+            related_videos = related_videos[:6]
+    else:
+        # 아직 계산되지 않은 새 영상: 같은 아티스트 또는 같은 장르, 조회수 높은 순
+        # (다음 증분 갱신까지 10분 캐싱, 업로드 직후 몰려도 한 번만 조회)
+        related_videos = cached(
+            f'related_fallback:{video.pk}',
+            lambda: list(Video.objects.filter(
                 Q(video_singer=video.video_singer) | Q(video_type=video.video_type)
-            ).exclude(pk=video_id).order_by('-video_views')[:6]
-
-            # 폴백 추천도 캐시에 저장 (10분만)
-            cache.set(cache_key, list(related_videos), 60*10)
+            ).exclude(pk=video_id).order_by('-video_views')[:6]),
+            60 * 10,
+        )
 
     # ===================================================================
 
@@ -302,31 +204,11 @@ def video_detail(request, video_id):
 def toggle_like(request, video_id):
     """좋아요 토글 (AJAX)"""
 
-    video = get_object_or_404(Video, pk=video_id)
-
-    # 좋아요 확인
-    like_obj = VideoLike.objects.filter(user=request.user, video=video).first()
-
-    if like_obj:
-        # 이미 좋아요한 경우: 취소
-        like_obj.delete()
-        # 좋아요 수 감소
-        Video.objects.filter(pk=video_id).update(
-            video_like_count=F('video_like_count') - 1
-        )
-        liked = False
-    else:
-        # 좋아요하지 않은 경우: 추가
-        VideoLike.objects.create(user=request.user, video=video)
-        # 좋아요 수 증가
-        Video.objects.filter(pk=video_id).update(
-            video_like_count=F('video_like_count') + 1
-        )
-        liked = True
-
-    # 업데이트된 좋아요 수 가져오기
-    video.refresh_from_db()
-    like_count = video.video_like_count
+    # 좋아요 추가/취소 + 좋아요 수 증감 + 새 좋아요 수 조회를 한 문장으로 처리
+    result = toggle_like_service(request.user, 'video', video_id)
+    if result is None:
+        raise Http404('영상을 찾을 수 없습니다.')
+    liked, like_count = result
 
     return JsonResponse({
         'success': True,
@@ -341,25 +223,16 @@ def increase_play_count(request, video_id):
 
     video = get_object_or_404(Video, pk=video_id)
 
-    # 재생수 증가는 세션으로 중복 방지
-    played_key = f'played_video_{video_id}'
-    if not request.session.get(played_key):
-        video.video_play_count += 1
-        video.save(update_fields=['video_play_count'])
-        request.session[played_key] = True
+    # 재생수 증가는 방문자별 블룸 필터로 중복 방지
+    if first_play(request, 'video_play', video.pk):
+        video.video_play_count += play_counter.incr('video_play', video.pk)
+        play_events.record('video_play', video.pk)
 
-    # 히스토리는 세션과 관계없이 항상 업데이트 (로그인 사용자만)
+    # 히스토리는 중복 방지와 관계없이 항상 업데이트 (로그인 사용자만)
     if request.user.is_authenticated:
         try:
-            # 기존 히스토리가 있으면 재생 시각만 업데이트
-            updated = VideoHistory.objects.filter(
-                user=request.user,
-                video=video
-            ).update(played_at=timezone.now())
-
-            # 기존 히스토리가 없으면 새로 생성
-            if not updated:
-                VideoHistory.objects.create(user=request.user, video=video)
+            # 없으면 추가, 있으면 재생 시각 갱신 + 재생횟수 증가 (upsert 한 문장)
+            record_play(request.user, 'video', video.pk)
         except Exception:
             pass
 
@@ -385,12 +258,8 @@ def add_comment(request, video_id):
             'error': '댓글 내용을 입력해주세요.',
         }, status=400)
 
-    # 댓글 생성
-    comment = VideoComment.objects.create(
-        user=request.user,
-        video=video,
-        content=content,
-    )
+    # 댓글 생성 (댓글수 증가와 한 트랜잭션, apps/twobeats_upload/comments.py)
+    comment, comment_count = create_comment(request.user, 'video', video, content)
 
     return JsonResponse({
         'success': True,
@@ -401,6 +270,7 @@ def add_comment(request, video_id):
             'created_at': comment.created_at.strftime('%Y.%m.%d %H:%M'),
             'user_image': comment.user.profile_image.url if comment.user.profile_image else None,
         },
+        'comment_count': comment_count,
     })
 
 
@@ -454,11 +324,12 @@ def delete_comment(request, comment_id):
             'error': '본인의 댓글만 삭제할 수 있습니다.',
         }, status=403)
 
-    # 댓글 삭제
-    comment.delete()
+    # 댓글 삭제 (댓글 수 함께 감소)
+    comment_count = delete_comment_service('video', comment)
 
     return JsonResponse({
         'success': True,
+        'comment_count': comment_count,
     })
 
 
@@ -542,19 +413,24 @@ def download_video(request, video_id):
 
 def video_chart_all(request):
     """영상 통합 차트 (탭)"""
+    # 차트는 refresh_charts 가 미리 계산한 스냅샷에서 읽음 (charts.py 참고)
+    video_type = request.GET.get('type', '')
+    if video_type not in dict(Video.GENRE_CHOICES):
+        video_type = ''
+    videos = Video.objects.prefetch_related('tags')
+
     # 인기 차트 (조회수*3 + 재생수*2 + 좋아요*4)
-    popular_videos = Video.objects.annotate(
-        popularity_score=ExpressionWrapper(
-            (F('video_views') * 3) + (F('video_play_count') * 2) + (F('video_like_count') * 4),
-            output_field=IntegerField()
-        )
-    ).order_by('-popularity_score')[:30]
+    popular_videos = chart_items('video_popular', video_type, limit=30, queryset=videos)
 
     # 최신 차트 (업로드순)
-    latest_videos = Video.objects.all().order_by('-video_created_at')[:30]
+    latest_videos = chart_items('video_latest', video_type, limit=30, queryset=videos)
 
     # 좋아요 차트 (좋아요순)
-    liked_videos = Video.objects.all().order_by('-video_like_count')[:30]
+    liked_videos = chart_items('video_liked', video_type, limit=30, queryset=videos)
+
+    # 오늘/주간 차트 (조회/재생/좋아요 이벤트 일 단위 집계 기준)
+    today_videos = chart_items('video_today', video_type, limit=30, queryset=videos)
+    week_videos = chart_items('video_week', video_type, limit=30, queryset=videos)
 
     # 각 차트의 영상에 포맷팅된 재생 시간 추가
     for video in popular_videos:
@@ -567,7 +443,7 @@ def video_chart_all(request):
         seconds = video.video_time % 60
         video.formatted_time = f"{minutes}:{seconds:02d}"
 
-    for video in liked_videos:
+    for video in liked_videos + today_videos + week_videos:
         minutes = video.video_time // 60
         seconds = video.video_time % 60
         video.formatted_time = f"{minutes}:{seconds:02d}"
@@ -576,6 +452,13 @@ def video_chart_all(request):
         'popular_videos': popular_videos,
         'latest_videos': latest_videos,
         'liked_videos': liked_videos,
+        'today_videos': today_videos,
+        'week_videos': week_videos,
+        # 모든 탭의 영상 좋아요 여부를 요청당 1회로 (has_liked_video 필터도 이 결과를 씀: likes.py)
+        'liked_video_ids': liked_ids(request.user, 'video', [
+            video.pk for videos in (popular_videos, latest_videos, liked_videos, today_videos, week_videos)
+            for video in videos
+        ]),
     }
     return render(request, 'video_explore/video_chart.html', context)
 
@@ -589,21 +472,8 @@ def autocomplete(request):
     if len(query) < 1:
         return JsonResponse({'results': []})
 
-    # 영상 제목 검색
-    video_titles_query = Video.objects.filter(
-        video_title__icontains=query
-    ).values_list('video_title', flat=True)
-
-    # Python에서 중복 제거 (순서 유지)
-    video_titles = list(dict.fromkeys(video_titles_query))[:5]
-
-    # 아티스트명 검색
-    artists_query = Video.objects.filter(
-        video_singer__icontains=query
-    ).values_list('video_singer', flat=True)
-
-    # Python에서 중복 제거 (순서 유지)
-    artists = list(dict.fromkeys(artists_query))[:5]
+    # 영상 제목/아티스트명 검색 (워커 메모리 인덱스, 중복 없이 앞부분 일치 먼저 인기순, autocomplete.py 참고)
+    video_titles, artists = video_autocomplete.suggest(query, 5)
 
     # 결과 조합
     results = []
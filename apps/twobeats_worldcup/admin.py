@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WorldCupGame, WorldCupResult
+from .models import WorldCupGame, WorldCupResult, WorldCupLeaderboard
 
 # 게임 상세 페이지(WorldCupGame) 들어가면 결과(WorldCupResult)를 바로 볼 수 있게 설정
 class WorldCupResultInline(admin.TabularInline):
@@ -18,4 +18,11 @@ class WorldCupGameAdmin(admin.ModelAdmin):
 class WorldCupResultAdmin(admin.ModelAdmin):
     list_display = ['wc_game', 'wc_music', 'wc_final_rank', 'wc_score']
     list_filter = ['wc_final_rank']
-    search_fields = ['wc_music__music_title', 'wc_game__wc_user__username']
\ No newline at end of file
+    search_fields = ['wc_music__music_title', 'wc_game__wc_user__username']
+
+@admin.register(WorldCupLeaderboard)
+class WorldCupLeaderboardAdmin(admin.ModelAdmin):
+    list_display = ['music', 'music_type', 'total_score', 'win_count', 'games_played', 'genre_rank']
+    list_filter = ['music_type']
+    search_fields = ['music__music_title']
+    ordering = ['-total_score', '-win_count']
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TwobeatsWorldcupConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.twobeats_worldcup'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,72 @@
+"""
+월드컵 후보곡 선정
+
+get_candidates API 와 후보곡 풀(pools.py) 백그라운드 갱신이 함께 쓴다.
+"""
+import math
+import random
+
+from apps.twobeats_upload.models import Music
+from apps.twobeats_upload.sampling import sample
+
+from .leaderboard import top_ranked, top_ranked_per_genre
+
+
+def select_candidates(genre, count, sort_mode, custom_musics=None):
+    """
+    [모드 설명]
+    1. sort=random: 그냥 무작위 (기존)
+    2. sort=rank & genre=특정: 해당 장르 내 랭킹순
+    3. sort=rank & genre=all: 모든 장르의 '장르별 1등'들을 모아서 선정 (쿼터제)
+
+    :param custom_musics: 커스텀 월드컵 곡 쿼리셋, None 이면 전체 곡
+    :return: Music 리스트 (곡이 부족하면 count 보다 적을 수 있음)
+    """
+    base_musics = Music.objects.all() if custom_musics is None else custom_musics
+
+    # ---------------------------------------------------------
+    # CASE A: 랭킹 모드 (인기곡 대결)
+    # ---------------------------------------------------------
+    if sort_mode == 'rank':
+        
+        # A-1. 전체 장르 통합 랭킹 (장르별 쿼터제 적용)
+        if genre == 'all':
+            candidates_list = []
+            
+            # 1. 모든 장르 목록 가져오기 ['ballad', 'dance', ...]
+            all_genres = [choice[0] for choice in Music.GENRE_CHOICES]
+            
+            # 2. 장르별 할당량 계산 (예: 16강 / 11개 장르 = 장르당 약 2곡)
+            quota_per_genre = math.ceil(count / len(all_genres))
+            
+            # 3. 모든 장르의 상위곡을 한 번에 수집 (ROW_NUMBER() OVER (PARTITION BY 장르), topn.py 참고)
+            candidates_list.extend(top_ranked_per_genre(quota_per_genre, custom_musics))
+            
+            # 4. 중복 제거 및 셔플 (장르 순서 섞기)
+            # (쿼터제로 뽑다보면 count보다 많이 뽑힐 수 있으므로 셔플 후 자름)
+            candidates_list = list(set(candidates_list)) # 중복제거
+            random.shuffle(candidates_list)
+            candidates = candidates_list[:count]
+            
+            # 5. 부족분 채우기 (만약 장르별 곡이 없어서 16개가 안 되면 랜덤으로 채움)
+            if len(candidates) < count:
+                needed = count - len(candidates)
+                existing_ids = [m.id for m in candidates]
+                
+                extras = sample(base_musics.exclude(id__in=existing_ids), needed)
+                candidates.extend(extras)
+
+        # A-2. 특정 장르 내 랭킹 (기존 로직 유지)
+        else:
+            candidates = top_ranked(genre, count, custom_musics)
+            random.shuffle(candidates)
+
+    # ---------------------------------------------------------
+    # CASE B: 랜덤 모드 (기존 로직)
+    # ---------------------------------------------------------
+    else:
+        if genre and genre != 'all':
+            base_musics = base_musics.filter(music_type=genre)
+        candidates = sample(base_musics, count)
+
+    return list(candidates)
@@ -0,0 +1,155 @@
+"""
+월드컵 랭킹 집계
+
+랭킹 화면/후보곡 선정이 매번 world_cup_result 전체를 SUM/COUNT 하지 않도록
+곡별 누적 점수/우승 횟수/참가 게임 수를 world_cup_leaderboard 에 저장해 두고
+(장르, 점수) 인덱스로 상위 N곡을 읽는다.
+
+- 게임 저장 시: INSERT ... ON CONFLICT DO UPDATE 한 문장으로 증가 (PostgreSQL, SQLite 3.24+ 공통 문법)
+- 장르 내 순위(genre_rank)와 전체 재계산: rebuild_wc_leaderboard 명령
+- 곡 장르 복사본(music_type)은 곡 수정 시(signals.py)와 순위 재계산 때 곡 테이블에 맞춤
+"""
+from django.db import connection, transaction
+
+from apps.twobeats_upload.models import Music
+from apps.twobeats_upload.topn import top_per_group
+
+from .models import WorldCupLeaderboard, WorldCupResult
+
+# 점수 > 우승횟수 > 최신곡(id) 순
+LEADERBOARD_ORDERING = ['-total_score', '-win_count', '-music_id']
+
+
+def _columns():
+    qn = connection.ops.quote_name
+    meta = WorldCupLeaderboard._meta
+    return qn(meta.db_table), {
+        name: qn(meta.get_field(name).column)
+        for name in ('music', 'music_type', 'total_score', 'win_count', 'games_played', 'genre_rank')
+    }
+
+
+def record_game(results):
+    """
+    한 게임의 결과를 랭킹에 반영 (save_game_result 트랜잭션 안에서 호출)
+    :param results: 저장한 WorldCupResult 리스트
+    """
+    totals = {}
+    for result in results:
+        score, wins, games = totals.get(result.wc_music_id, (0, 0, 0))
+        totals[result.wc_music_id] = (score + result.wc_score, wins + (result.wc_final_rank == 1), games + 1)
+    if not totals:
+        return
+
+    music_types = dict(Music.objects.filter(pk__in=totals).values_list('pk', 'music_type'))
+    # id 순으로 정렬해 동시에 저장되는 게임끼리 데드락 방지
+    rows = [
+        (music_id, music_types[music_id], *totals[music_id])
+        for music_id in sorted(totals) if music_id in music_types
+    ]
+
+    table, col = _columns()
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({col["music"]}, {col["music_type"]}, {col["total_score"]}, '
+            f'{col["win_count"]}, {col["games_played"]}) VALUES {values} '
+            f'ON CONFLICT ({col["music"]}) DO UPDATE SET '
+            f'{col["music_type"]} = EXCLUDED.{col["music_type"]}, '
+            f'{col["total_score"]} = {table}.{col["total_score"]} + EXCLUDED.{col["total_score"]}, '
+            f'{col["win_count"]} = {table}.{col["win_count"]} + EXCLUDED.{col["win_count"]}, '
+            f'{col["games_played"]} = {table}.{col["games_played"]} + EXCLUDED.{col["games_played"]}',
+            [value for row in rows for value in row],
+        )
+
+
+def rebuild():
+    """
+    world_cup_result 전체에서 랭킹을 다시 집계 (백필/불일치 복구용)
+    :return: 랭킹에 들어간 곡 수
+    """
+    table, col = _columns()
+    qn = connection.ops.quote_name
+    result_meta = WorldCupResult._meta
+    music_meta = Music._meta
+    result_table = qn(result_meta.db_table)
+    result_music = qn(result_meta.get_field('wc_music').column)
+    result_game = qn(result_meta.get_field('wc_game').column)
+    result_rank = qn(result_meta.get_field('wc_final_rank').column)
+    result_score = qn(result_meta.get_field('wc_score').column)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # 다시 채우는 동안 저장되는 게임 결과는 끝날 때까지 대기
+            cursor.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(
+            f'INSERT INTO {table} ({col["music"]}, {col["music_type"]}, {col["total_score"]}, '
+            f'{col["win_count"]}, {col["games_played"]}) '
+            f'SELECT r.{result_music}, m.{qn(music_meta.get_field("music_type").column)}, '
+            f'SUM(r.{result_score}), SUM(CASE WHEN r.{result_rank} = 1 THEN 1 ELSE 0 END), '
+            f'COUNT(DISTINCT r.{result_game}) '
+            f'FROM {result_table} r JOIN {qn(music_meta.db_table)} m ON m.{qn(music_meta.pk.column)} = r.{result_music} '
+            f'GROUP BY r.{result_music}, m.{qn(music_meta.get_field("music_type").column)}'
+        )
+        count = cursor.rowcount
+    refresh_genre_ranks()
+    return count
+
+
+def refresh_genre_ranks():
+    """
+    장르 내 순위 다시 매기기 (윈도 함수 한 문장, 순위가 바뀐 행만 갱신)
+    순위를 매기기 전에 곡 장르가 바뀐 행의 music_type 을 곡 테이블에 맞춘다 (시그널을 거치지 않은 수정 포함)
+    :return: 갱신된 행 수
+    """
+    table, col = _columns()
+    qn = connection.ops.quote_name
+    music_meta = Music._meta
+    music_type = qn(music_meta.get_field('music_type').column)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET {col["music_type"]} = m.{music_type} '
+            f'FROM {qn(music_meta.db_table)} m '
+            f'WHERE m.{qn(music_meta.pk.column)} = {table}.{col["music"]} '
+            f'AND m.{music_type} <> {table}.{col["music_type"]}'
+        )
+        cursor.execute(
+            f'UPDATE {table} SET {col["genre_rank"]} = r.rnk FROM ('
+            f'SELECT {col["music"]} AS music_id, ROW_NUMBER() OVER ('
+            f'PARTITION BY {col["music_type"]} '
+            f'ORDER BY {col["total_score"]} DESC, {col["win_count"]} DESC, {col["music"]} DESC'
+            f') AS rnk FROM {table}) r '
+            f'WHERE {table}.{col["music"]} = r.music_id '
+            f'AND ({table}.{col["genre_rank"]} IS NULL OR {table}.{col["genre_rank"]} <> r.rnk)'
+        )
+        return cursor.rowcount
+
+
+def top_ranked(genre, limit, musics=None):
+    """
+    장르 랭킹 상위 곡 (랭킹 순)
+    랭킹 기록이 있는 곡이 limit 보다 적으면 기록 없는(0점) 곡으로 채운다.
+    :param musics: 후보를 제한할 Music 쿼리셋 (커스텀 월드컵), None 이면 전체
+    """
+    boards = WorldCupLeaderboard.objects.filter(music_type=genre)
+    if musics is not None:
+        boards = boards.filter(music__in=musics)
+    ranked = [board.music for board in boards.select_related('music').order_by(*LEADERBOARD_ORDERING)[:limit]]
+
+    if len(ranked) < limit:
+        rest = (Music.objects.all() if musics is None else musics).filter(music_type=genre)
+        ranked += list(rest.exclude(pk__in=[music.pk for music in ranked]).order_by('-pk')[:limit - len(ranked)])
+    return ranked
+
+
+def top_ranked_per_genre(limit, musics=None):
+    """
+    모든 장르의 랭킹 상위 limit 곡씩 (쿼리 1회, 장르 수와 무관)
+    랭킹 기록이 없는 장르/곡은 포함되지 않으므로 부족분은 호출하는 쪽에서 채운다.
+    :param musics: 후보를 제한할 Music 쿼리셋 (커스텀 월드컵), None 이면 전체
+    """
+    boards = WorldCupLeaderboard.objects.select_related('music')
+    if musics is not None:
+        boards = boards.filter(music__in=musics)
+    return [board.music for board in top_per_group(boards, 'music_type', LEADERBOARD_ORDERING, limit)]
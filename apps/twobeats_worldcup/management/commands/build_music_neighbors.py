@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.twobeats_worldcup.recommender import TOP_K, rebuild
+
+
+class Command(BaseCommand):
+    help = '곡-곡 추천 이웃 테이블 재계산 (좋아요/월드컵 우승/재생 기록 동시 출현, 매일 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='곡별로 저장할 이웃 수')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        musics, rows = rebuild(options['top_k'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'추천 이웃 갱신 완료! 곡 {musics}개, {rows}행 ({elapsed:.2f}s)'
+        ))
@@ -0,0 +1,72 @@
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.twobeats_worldcup.recommender import TOP_K, build_neighbors, load_interactions
+
+
+class Command(BaseCommand):
+    help = '추천 이웃 오프라인 평가 (유저별 마지막 곡을 빼고 학습, 나머지 곡으로 추천해 적중률 측정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='곡별 이웃 수')
+        parser.add_argument('--n', type=int, default=10, help='추천 개수 (HitRate@N)')
+
+    def handle(self, *args, **options):
+        users, musics, weights, times = load_interactions()
+        holdout = self._holdout(users, musics, times)
+        if not holdout:
+            self.stdout.write(self.style.ERROR('평가할 유저가 없습니다. (곡 2개 이상과 상호작용한 유저 필요)'))
+            return
+
+        # 평가 대상 유저의 마지막 곡과 관련된 행은 모두 학습에서 제외
+        held = np.array([holdout.get(user) == music for user, music in zip(users.tolist(), musics.tolist())])
+        train = ~held
+
+        started = time.perf_counter()
+        left, right, _, scores = build_neighbors(users[train], musics[train], weights[train], options['top_k'])
+        build_time = time.perf_counter() - started
+
+        table = defaultdict(list)
+        for music_id, neighbor_id, score in zip(left.tolist(), right.tolist(), scores.tolist()):
+            table[music_id].append((neighbor_id, score))
+        seeds = defaultdict(set)
+        for user, music in zip(users[train].tolist(), musics[train].tolist()):
+            seeds[user].add(music)
+        popular = [music for music, _ in Counter(
+            music for user_musics in seeds.values() for music in user_musics
+        ).most_common()]
+
+        n = options['n']
+        hits = popular_hits = covered = 0
+        for user, target in holdout.items():
+            user_seeds = seeds[user]
+            totals = defaultdict(float)
+            for music in user_seeds:
+                for neighbor_id, score in table.get(music, ()):
+                    if neighbor_id not in user_seeds:
+                        totals[neighbor_id] += score
+            covered += bool(totals)
+            ranked = sorted(totals, key=lambda music: (-totals[music], music))[:n]
+            hits += target in ranked
+            popular_hits += target in [music for music in popular if music not in user_seeds][:n]
+
+        total = len(holdout)
+        self.stdout.write(f'상호작용 {len(users)}건 / 평가 유저 {total}명 / 이웃 {len(left)}행 (곡별 최대 {options["top_k"]}개)')
+        self.stdout.write(f'빌드 시간: {build_time * 1000:.1f}ms')
+        self.stdout.write(f'추천 가능 유저: {covered / total:.1%}')
+        self.stdout.write(self.style.SUCCESS(
+            f'HitRate@{n}: 동시 출현 {hits / total:.1%} / 인기곡 기준선 {popular_hits / total:.1%}'
+        ))
+
+    def _holdout(self, users, musics, times):
+        """곡 2개 이상과 상호작용한 유저별 가장 최근 곡 {유저: 곡}"""
+        latest = {}
+        distinct = defaultdict(set)
+        for user, music, at in zip(users.tolist(), musics.tolist(), times.tolist()):
+            distinct[user].add(music)
+            if user not in latest or at > latest[user][0]:
+                latest[user] = (at, music)
+        return {user: music for user, (_, music) in latest.items() if len(distinct[user]) >= 2}
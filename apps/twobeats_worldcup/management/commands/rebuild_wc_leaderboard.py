@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.twobeats_worldcup.leaderboard import rebuild, refresh_genre_ranks
+
+
+class Command(BaseCommand):
+    help = '월드컵 랭킹 집계 테이블 재계산 (world_cup_result 전체 재집계 + 장르 내 순위)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ranks-only', action='store_true',
+            help='누적 점수는 그대로 두고 장르 내 순위만 다시 매김 (주기 실행용)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['ranks_only']:
+            updated = refresh_genre_ranks()
+            self.stdout.write(f'[OK] 장르 내 순위 {updated}건 갱신')
+        else:
+            count = rebuild()
+            self.stdout.write(f'[OK] 랭킹 {count}곡 재집계')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'월드컵 랭킹 갱신 완료! ({elapsed:.2f}s)'))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_leaderboard(apps, schema_editor):
+    WorldCupResult = apps.get_model('twobeats_worldcup', 'WorldCupResult')
+    WorldCupLeaderboard = apps.get_model('twobeats_worldcup', 'WorldCupLeaderboard')
+    totals = WorldCupResult.objects.values('wc_music', 'wc_music__music_type').annotate(
+        total_score=Sum('wc_score'),
+        win_count=Count('pk', filter=Q(wc_final_rank=1)),
+        games_played=Count('wc_game', distinct=True),
+    )
+    WorldCupLeaderboard.objects.bulk_create([
+        WorldCupLeaderboard(
+            music_id=row['wc_music'],
+            music_type=row['wc_music__music_type'],
+            total_score=row['total_score'],
+            win_count=row['win_count'],
+            games_played=row['games_played'],
+        )
+        for row in totals.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0007_video_scores'),
+        ('twobeats_worldcup', '0002_customworldcup_worldcupgame_custom_worldcup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorldCupLeaderboard',
+            fields=[
+                ('music', models.OneToOneField(db_column='lb_music_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='wc_leaderboard', serialize=False, to='twobeats_upload.music', verbose_name='음악')),
+                ('music_type', models.CharField(db_column='lb_music_type', max_length=20, verbose_name='장르')),
+                ('total_score', models.IntegerField(db_column='lb_total_score', default=0, verbose_name='누적 점수')),
+                ('win_count', models.IntegerField(db_column='lb_win_count', default=0, verbose_name='우승 횟수')),
+                ('games_played', models.IntegerField(db_column='lb_games_played', default=0, verbose_name='참가 게임 수')),
+                ('genre_rank', models.IntegerField(blank=True, db_column='lb_genre_rank', null=True, verbose_name='장르 내 순위')),
+            ],
+            options={
+                'verbose_name': '월드컵 랭킹',
+                'verbose_name_plural': '월드컵 랭킹',
+                'db_table': 'world_cup_leaderboard',
+                'indexes': [models.Index(fields=['-total_score', '-win_count', '-music'], name='wc_lb_score_idx'), models.Index(fields=['music_type', '-total_score', '-win_count', '-music'], name='wc_lb_genre_score_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twobeats_upload', '0007_video_scores'),
+        ('twobeats_worldcup', '0003_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusicNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(db_column='nb_rank', verbose_name='순위')),
+                ('score', models.FloatField(db_column='nb_score', verbose_name='유사도')),
+                ('music', models.ForeignKey(db_column='nb_music_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='twobeats_upload.music', verbose_name='음악')),
+                ('neighbor', models.ForeignKey(db_column='nb_neighbor_id', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='twobeats_upload.music', verbose_name='추천곡')),
+            ],
+            options={
+                'verbose_name': '추천 이웃',
+                'verbose_name_plural': '추천 이웃',
+                'db_table': 'music_neighbor',
+                'unique_together': {('music', 'rank')},
+            },
+        ),
+    ]
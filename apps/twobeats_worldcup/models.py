@@ -128,4 +128,105 @@ class WorldCupResult(models.Model):
         ]
 
     def __str__(self):
-        return f"Game {self.wc_game.pk} - {self.wc_music} ({self.wc_final_rank}위)"
\ No newline at end of file
+        return f"Game {self.wc_game.pk} - {self.wc_music} ({self.wc_final_rank}위)"
+
+class WorldCupLeaderboard(models.Model):
+    """
+    월드컵 랭킹 집계 (곡별 누적 점수/우승 횟수/참가 게임 수)
+    - save_game_result 가 결과 저장과 같은 트랜잭션에서 증가시킴 (leaderboard.py 참고)
+    - genre_rank 는 rebuild_wc_leaderboard --ranks-only 가 주기적으로 다시 매김
+    """
+    music = models.OneToOneField(
+        'twobeats_upload.Music',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='wc_leaderboard',
+        db_column='lb_music_id',
+        verbose_name='음악'
+    )
+    # 장르별 랭킹을 인덱스로 읽기 위해 곡 장르를 함께 저장
+    music_type = models.CharField(
+        max_length=20,
+        db_column='lb_music_type',
+        verbose_name='장르'
+    )
+    total_score = models.IntegerField(
+        default=0,
+        db_column='lb_total_score',
+        verbose_name='누적 점수'
+    )
+    win_count = models.IntegerField(
+        default=0,
+        db_column='lb_win_count',
+        verbose_name='우승 횟수'
+    )
+    games_played = models.IntegerField(
+        default=0,
+        db_column='lb_games_played',
+        verbose_name='참가 게임 수'
+    )
+    genre_rank = models.IntegerField(
+        null=True,
+        blank=True,
+        db_column='lb_genre_rank',
+        verbose_name='장르 내 순위'
+    )
+
+    class Meta:
+        db_table = 'world_cup_leaderboard'
+        verbose_name = '월드컵 랭킹'
+        verbose_name_plural = '월드컵 랭킹'
+        indexes = [
+            # 정렬: 점수 > 우승횟수 > 최신곡(id), leaderboard.LEADERBOARD_ORDERING
+            models.Index(fields=['-total_score', '-win_count', '-music'], name='wc_lb_score_idx'),
+            models.Index(fields=['music_type', '-total_score', '-win_count', '-music'], name='wc_lb_genre_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.music_id}: {self.total_score}점 ({self.win_count}회 우승)"
+
+    @property
+    def win_rate(self):
+        """우승률(%)"""
+        if not self.games_played:
+            return 0
+        return round(self.win_count * 100 / self.games_played, 1)
+
+
+class MusicNeighbor(models.Model):
+    """
+    곡별 추천 이웃 (함께 좋아요/우승/재생된 곡, 유사도 순 상위 k개)
+    - build_music_neighbors 명령이 매일 통째로 다시 계산해 교체 (recommender.py 참고)
+    - 결과 페이지 추천은 (곡, 순위) 인덱스 조회 한 번
+    """
+    music = models.ForeignKey(
+        'twobeats_upload.Music',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='nb_music_id',
+        verbose_name='음악'
+    )
+    neighbor = models.ForeignKey(
+        'twobeats_upload.Music',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='nb_neighbor_id',
+        verbose_name='추천곡'
+    )
+    rank = models.PositiveSmallIntegerField(
+        db_column='nb_rank',
+        verbose_name='순위'
+    )
+    score = models.FloatField(
+        db_column='nb_score',
+        verbose_name='유사도'
+    )
+
+    class Meta:
+        db_table = 'music_neighbor'
+        unique_together = ('music', 'rank')
+        verbose_name = '추천 이웃'
+        verbose_name_plural = '추천 이웃'
+
+    def __str__(self):
+        return f"{self.music_id} -> {self.neighbor_id} #{self.rank} ({self.score:.3f})"
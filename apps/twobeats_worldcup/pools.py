@@ -0,0 +1,165 @@
+"""
+월드컵 후보곡 풀
+
+대진을 시작할 때마다 후보곡을 새로 뽑고 직렬화하지 않도록
+(장르, 강수, 모드, 커스텀 코드) 별로 미리 뽑아 직렬화해 둔 후보곡 묶음(풀)을 캐시에 몇 개씩 쌓아 둔다.
+
+- 요청이 오면 풀 하나를 꺼내 그대로 반환하고, 꺼낸 자리는 백그라운드 스레드가 다시 채운다
+  (한 번 쓴 풀은 다시 내주지 않음)
+- 풀은 칸(<키>:<번호>)마다 따로 저장하고, 꺼낼 칸 번호는 <키>:next 카운터를 incr 해서 정한다
+  incr 은 원자적이라 동시에 꺼내도 같은 칸을 두 요청이 받지 않는다 (<키>:end = 채워 둔 칸 수)
+- 풀이 없으면 그 자리에서 뽑아 반환한 뒤 채워 두므로 자주 쓰이는 대진만 풀이 유지된다 (WC_POOL_TTL)
+- 곡이 업로드/수정/삭제되거나 커스텀 월드컵 곡 목록이 바뀌면 세대 번호를 바꿔 이전 풀을 버린다
+  (apps/twobeats_upload/invalidation.py, signals.py)
+"""
+import atexit
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.twobeats_upload.counters import BufferedWriter
+from apps.twobeats_upload.invalidation import generations, invalidate
+from apps.twobeats_upload.models import Music
+
+from .candidates import select_candidates
+from .models import CustomWorldCup
+from .serializers import CandidateSerializer
+
+logger = logging.getLogger(__name__)
+
+# 풀을 만들어 둘 대진 (임의의 파라미터로 캐시가 늘어나지 않도록 화면에서 고를 수 있는 값만)
+POOL_COUNTS = {4, 8, 16, 32, 64}
+POOL_SORT_MODES = {'random', 'rank'}
+POOL_GENRES = {'all'} | {value for value, _ in Music.GENRE_CHOICES}
+
+
+def pool_key(genre, count, sort_mode, custom_code=None):
+    # 장르(곡 업로드/수정/삭제) 또는 커스텀 월드컵 곡 목록이 바뀌면 세대 번호가 바뀌어 새 키가 됨
+    scopes = [f'wc_pool:genre:{genre}']
+    if custom_code:
+        scopes.append(f'wc_pool:custom:{custom_code}')
+    version = ':'.join(str(generation) for generation in generations(*scopes))
+    return f'wc_pool:{sort_mode}:{genre}:{count}:{custom_code or "-"}:{version}'
+
+
+def is_poolable(genre, count, sort_mode):
+    return count in POOL_COUNTS and sort_mode in POOL_SORT_MODES and genre in POOL_GENRES
+
+
+def _slot_keys(key):
+    return f'{key}:next', f'{key}:end'
+
+
+def take_pool(genre, count, sort_mode, custom_code=None):
+    """
+    미리 뽑아 둔 후보곡 하나를 꺼냄
+    :return: 직렬화된 후보곡 리스트, 풀이 없으면 None
+    """
+    if not is_poolable(genre, count, sort_mode):
+        return None
+    key = pool_key(genre, count, sort_mode, custom_code)
+    next_key, end_key = _slot_keys(key)
+    end = cache.get(end_key)
+    if not end:
+        return None
+
+    pool_refresher.request(genre, count, sort_mode, custom_code)
+    if cache.add(next_key, 0, settings.WC_POOL_TTL):
+        # 칸 번호 카운터가 사라졌으면(만료/축출) 이미 내준 칸을 구분할 수 없으므로 버리고 새로 채움
+        cache.delete(end_key)
+        return None
+    try:
+        index = cache.incr(next_key) - 1
+    except ValueError:
+        return None
+    if index >= end:
+        return None
+    pool = cache.get(f'{key}:{index}')
+    cache.delete(f'{key}:{index}')
+    return pool
+
+
+def refill(genre, count, sort_mode, custom_code=None):
+    """
+    풀을 WC_POOL_SIZE 개까지 채움 (남은 칸 뒤에 이어서 저장)
+    :return: 새로 만든 풀 수
+    """
+    custom_musics = None
+    if custom_code:
+        custom_wc = CustomWorldCup.objects.filter(access_code=custom_code).first()
+        if custom_wc is None:
+            return 0
+        custom_musics = custom_wc.musics.all()
+
+    key = pool_key(genre, count, sort_mode, custom_code)
+    next_key, end_key = _slot_keys(key)
+    values = cache.get_many([next_key, end_key])
+    head, end = values.get(next_key), values.get(end_key, 0)
+    if head is None:
+        # 처음 채우거나 카운터가 사라진 경우 0번 칸부터 새로
+        head = end = 0
+    # 빈 풀에서 꺼내려던 요청이 카운터를 end 너머로 올렸을 수 있으므로 그 뒤부터 채움
+    start = max(head, end)
+    available = max(end - head, 0)
+
+    slots = {}
+    while available + len(slots) < settings.WC_POOL_SIZE:
+        candidates = select_candidates(genre, count, sort_mode, custom_musics)
+        if len(candidates) < count:
+            break
+        slots[f'{key}:{start + len(slots)}'] = [dict(item) for item in CandidateSerializer(candidates, many=True).data]
+    if slots:
+        # 칸을 먼저 저장한 뒤 end 를 올려야 꺼내는 쪽이 빈 칸을 받지 않음
+        cache.set_many(slots, settings.WC_POOL_TTL)
+        if values.get(next_key) is None:
+            cache.set(next_key, head, settings.WC_POOL_TTL)
+        else:
+            cache.touch(next_key, settings.WC_POOL_TTL)
+        cache.set(end_key, start + len(slots), settings.WC_POOL_TTL)
+    return len(slots)
+
+
+def invalidate_custom(custom_code):
+    """커스텀 월드컵의 모든 풀 무효화 (키에 들어가는 세대 번호를 바꿈)"""
+    invalidate(f'wc_pool:custom:{custom_code}')
+
+
+class PoolRefresher(BufferedWriter):
+    """다시 채울 풀을 모아 두었다가 백그라운드에서 채우는 큐"""
+
+    thread_name = 'wc-pool-refill'
+    interval_setting = 'WC_POOL_REFILL_INTERVAL'
+
+    def __init__(self, interval=None, autoflush=True):
+        super().__init__(interval, autoflush)
+        self._pending = set()
+
+    def request(self, genre, count, sort_mode, custom_code=None):
+        if not is_poolable(genre, count, sort_mode):
+            return
+        with self._lock:
+            self._pending.add((genre, count, sort_mode, custom_code or None))
+        self._schedule_flush()
+
+    def flush(self):
+        """
+        요청된 풀 채우기
+        :return: 새로 만든 풀 수
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, set()
+
+        added = 0
+        for config in pending:
+            try:
+                added += refill(*config)
+            except Exception:
+                logger.exception('월드컵 후보곡 풀 채우기 실패: %s', config)
+        return added
+
+
+pool_refresher = PoolRefresher()
+atexit.register(pool_refresher.shutdown)
@@ -0,0 +1,149 @@
+"""
+곡-곡 동시 출현 추천 (오프라인 배치)
+
+결과 페이지마다 '비슷한 유저 -> 그 유저들의 좋아요/우승곡' 을 서브쿼리로 다시 세지 않도록
+매일 한 번 유저-곡 상호작용 전체로 곡-곡 유사도를 계산해 곡별 상위 k개를 music_neighbor 에 저장한다.
+
+- 상호작용: 좋아요, 월드컵 우승(로그인 유저), 재생 기록 (SIGNAL_WEIGHTS 로 가중합)
+- 유사도: 유저-곡 가중치 행렬 X 의 X^T X 를 곡 벡터 크기로 나눈 코사인 유사도
+  (희소 행렬 곱 대신 유저별 곡 쌍을 만들어 NumPy 로 합산)
+- SciPy(csr_matrix 의 X.T @ X)를 쓰지 않는 이유: 하루 한 번 도는 배치 하나 때문에 웹 서버 이미지에
+  NumPy 외의 수치 라이브러리를 추가하지 않으려고. 대신 유저당 곡 수를 MAX_ITEMS_PER_USER 로 잘라
+  쌍 전개 메모리(유저당 곡 수의 제곱)를 묶어 둔다. 곡/유저가 늘어 이 상한이 결과를 바꿀 정도가 되면 SciPy 로 옮길 것
+- 결과 페이지는 (곡, 순위) 인덱스 조회 한 번 (neighbors)
+- build_music_neighbors 명령이 재계산, eval_recommender 명령이 적중률/빌드 시간 측정
+"""
+import numpy as np
+from django.db import transaction
+
+from apps.twobeats_account.models import MusicHistory
+from apps.twobeats_music_explore.models import MusicLike
+
+from .models import MusicNeighbor, WorldCupResult
+
+# 신호별 가중치 (한 유저가 같은 곡에 여러 신호를 남기면 더함)
+SIGNAL_WEIGHTS = {
+    'like': 1.0,
+    'win': 2.0,
+    'history': 0.5,
+}
+
+# 곡별로 저장할 이웃 수
+TOP_K = 20
+
+# 한 유저가 만드는 곡 쌍은 (곡 수)^2 이므로 가중치 높은 곡부터 이 수만큼만 사용
+MAX_ITEMS_PER_USER = 300
+
+
+def load_interactions():
+    """
+    유저-곡 상호작용 전체
+    :return: (유저 번호, 곡 id, 가중치, 발생 시각(epoch 초)) NumPy 배열, 같은 유저-곡이 여러 행일 수 있음
+    """
+    sources = (
+        ('like', MusicLike.objects.values_list('user_id', 'music_id', 'created_at')),
+        ('win', WorldCupResult.objects.filter(wc_final_rank=1, wc_game__wc_user__isnull=False)
+            .values_list('wc_game__wc_user_id', 'wc_music_id', 'wc_game__wc_created_at')),
+        ('history', MusicHistory.objects.values_list('user_id', 'music_id', 'played_at')),
+    )
+    # 유저 pk 는 UUID 이므로 0부터 매긴 번호로 바꿔 담음
+    user_index = {}
+    users, musics, weights, times = [], [], [], []
+    for signal, rows in sources:
+        for user_id, music_id, at in rows.order_by().iterator(chunk_size=10000):
+            users.append(user_index.setdefault(user_id, len(user_index)))
+            musics.append(music_id)
+            weights.append(SIGNAL_WEIGHTS[signal])
+            times.append(at.timestamp())
+    return (
+        np.array(users, dtype=np.int64),
+        np.array(musics, dtype=np.int64),
+        np.array(weights, dtype=np.float64),
+        np.array(times, dtype=np.float64),
+    )
+
+
+def build_neighbors(users, musics, weights, top_k=TOP_K):
+    """
+    곡별 유사도 상위 top_k 이웃
+    :return: (곡 id, 이웃 곡 id, 순위(1부터), 유사도) NumPy 배열, 곡/순위 순 정렬
+    """
+    empty = (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0))
+    if not len(users):
+        return empty
+
+    # 유저-곡 쌍별 가중치 합 (희소 행렬 X 의 0 이 아닌 칸)
+    pairs, inverse = np.unique(np.stack([users, musics], axis=1), axis=0, return_inverse=True)
+    values = np.bincount(inverse.ravel(), weights=weights)
+    item_ids, items = np.unique(pairs[:, 1], return_inverse=True)
+    row_users = pairs[:, 0]
+    size = len(item_ids)
+
+    # 유저별로 가중치 높은 곡부터
+    order = np.lexsort((-values, row_users))
+    row_users, items, values = row_users[order], items[order], values[order]
+    starts = np.flatnonzero(np.r_[True, row_users[1:] != row_users[:-1]])
+    ends = np.r_[starts[1:], len(row_users)]
+
+    norms = np.zeros(size)
+    lefts, rights, products = [], [], []
+    for start, end in zip(starts, ends):
+        end = min(end, start + MAX_ITEMS_PER_USER)
+        user_items, user_values = items[start:end], values[start:end]
+        norms += np.bincount(user_items, weights=user_values ** 2, minlength=size)
+        count = end - start
+        if count < 2:
+            continue
+        left = np.repeat(user_items, count)
+        right = np.tile(user_items, count)
+        product = np.outer(user_values, user_values).ravel()
+        different = left != right
+        lefts.append(left[different])
+        rights.append(right[different])
+        products.append(product[different])
+    if not lefts:
+        return empty
+
+    # X^T X 의 대각선 밖 칸 (같은 곡 쌍끼리 합산)
+    keys, inverse = np.unique(
+        np.concatenate(lefts) * size + np.concatenate(rights), return_inverse=True
+    )
+    cooccurrence = np.bincount(inverse.ravel(), weights=np.concatenate(products))
+    left, right = keys // size, keys % size
+    scores = cooccurrence / np.sqrt(norms[left] * norms[right])
+
+    # 곡별 유사도 내림차순 (같으면 id 순), 앞에서 top_k 개
+    order = np.lexsort((right, -scores, left))
+    left, right, scores = left[order], right[order], scores[order]
+    ranks = np.arange(len(left)) - np.searchsorted(left, left)
+    keep = ranks < top_k
+    return item_ids[left[keep]], item_ids[right[keep]], ranks[keep] + 1, scores[keep]
+
+
+def store_neighbors(music_ids, neighbor_ids, ranks, scores):
+    """music_neighbor 통째로 교체 (한 트랜잭션이라 읽는 쪽은 이전/새 결과 중 하나만 봄)"""
+    with transaction.atomic():
+        MusicNeighbor.objects.all().delete()
+        MusicNeighbor.objects.bulk_create([
+            MusicNeighbor(music_id=music_id, neighbor_id=neighbor_id, rank=rank, score=score)
+            for music_id, neighbor_id, rank, score in zip(
+                music_ids.tolist(), neighbor_ids.tolist(), ranks.tolist(), scores.tolist()
+            )
+        ], batch_size=1000)
+    return len(music_ids)
+
+
+def rebuild(top_k=TOP_K):
+    """
+    상호작용 전체로 이웃 테이블 재계산
+    :return: (이웃이 있는 곡 수, 저장한 행 수)
+    """
+    users, musics, weights, _ = load_interactions()
+    table = build_neighbors(users, musics, weights, top_k)
+    return len(np.unique(table[0])), store_neighbors(*table)
+
+
+def neighbors(music_id, limit=5):
+    """곡의 추천 이웃 (유사도 순 Music 리스트)"""
+    rows = MusicNeighbor.objects.filter(music_id=music_id).select_related('neighbor').order_by('rank')[:limit]
+    return [row.neighbor for row in rows]
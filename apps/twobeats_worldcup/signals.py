@@ -0,0 +1,31 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from apps.twobeats_upload.models import Music
+
+from .models import CustomWorldCup, WorldCupLeaderboard
+from .pools import invalidate_custom
+
+
+@receiver(m2m_changed, sender=CustomWorldCup.musics.through)
+def invalidate_custom_pools(sender, instance, action, reverse, pk_set, **kwargs):
+    """커스텀 월드컵 곡 목록이 바뀌면 해당 월드컵의 후보곡 풀 무효화"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_custom(instance.access_code)
+        return
+    # music.included_custom_wcs 쪽에서 바꾼 경우 (clear 는 pk_set 이 없으므로 전부)
+    custom_wcs = CustomWorldCup.objects.all() if pk_set is None else CustomWorldCup.objects.filter(pk__in=pk_set)
+    for access_code in custom_wcs.values_list('access_code', flat=True):
+        invalidate_custom(access_code)
+
+
+@receiver(post_save, sender=Music)
+def sync_leaderboard_type(sender, instance, created, **kwargs):
+    """곡 장르가 바뀌면 랭킹의 장르 복사본도 맞춤 (장르 내 순위는 다음 순위 재계산에서 반영)"""
+    if created:
+        return
+    WorldCupLeaderboard.objects.filter(music=instance).exclude(
+        music_type=instance.music_type
+    ).update(music_type=instance.music_type)
@@ -1,3 +1,95 @@
-from django.test import TestCase
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from apps.twobeats_upload.models import Music
+
+from .leaderboard import record_game, refresh_genre_ranks, top_ranked, top_ranked_per_genre
+from .models import WorldCupLeaderboard, WorldCupResult
+from .recommender import build_neighbors
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='player', password='pw')
+        cls.musics = [
+            Music.objects.create(
+                music_title=f'곡 {i}', music_type=music_type, music_root='music/test.mp3', uploader=user,
+            )
+            for i, music_type in enumerate(['ballad', 'ballad', 'ballad', 'ballad', 'dance'])
+        ]
+
+    def _play(self, *rows):
+        """(곡, 점수, 최종 순위) 들을 한 게임 결과로 반영"""
+        record_game([WorldCupResult(wc_music=music, wc_score=score, wc_final_rank=rank) for music, score, rank in rows])
+
+    def test_record_game_accumulates(self):
+        first = self.musics[0]
+        self._play((first, 10, 1), (self.musics[1], 5, 2))
+        self._play((first, 3, 2))
+        board = WorldCupLeaderboard.objects.get(music=first)
+        self.assertEqual((board.total_score, board.win_count, board.games_played), (13, 1, 2))
+
+    def test_ties_break_by_wins_then_newest(self):
+        a, b, c, d, _ = self.musics
+        self._play((a, 10, 2), (b, 10, 2), (c, 10, 1), (d, 20, 3))
+        expected = [d, c, b, a]
+        self.assertEqual(top_ranked('ballad', 4), expected)
+        self.assertEqual(top_ranked_per_genre(4), expected)
+
+        refresh_genre_ranks()
+        ranks = dict(WorldCupLeaderboard.objects.values_list('music_id', 'genre_rank'))
+        self.assertEqual([ranks[music.pk] for music in expected], [1, 2, 3, 4])
+
+    def test_top_ranked_fills_with_unranked_newest(self):
+        a, b, c, d, _ = self.musics
+        self._play((a, 10, 1))
+        self.assertEqual(top_ranked('ballad', 3), [a, d, c])
+        self.assertEqual(top_ranked('ballad', 2, musics=Music.objects.filter(pk__in=[a.pk, b.pk])), [a, b])
+
+    def test_genre_copy_follows_music(self):
+        a, b, *_ = self.musics
+        self._play((a, 10, 1), (b, 5, 2))
+
+        # 시그널을 거친 수정은 바로, 거치지 않은 수정은 순위 재계산 때 맞춤
+        a.music_type = 'dance'
+        a.save()
+        self.assertEqual(WorldCupLeaderboard.objects.get(music=a).music_type, 'dance')
+        Music.objects.filter(pk=b.pk).update(music_type='rock')
+        refresh_genre_ranks()
+        board = WorldCupLeaderboard.objects.get(music=b)
+        self.assertEqual((board.music_type, board.genre_rank), ('rock', 1))
+        self.assertEqual(top_ranked_per_genre(1), [a, b])
+
+
+class BuildNeighborsTests(SimpleTestCase):
+    # 유저-곡 가중치 (유저 1 의 곡 30 은 두 행이 더해져 2)
+    #         10  20  30
+    # 유저 0   1   1   0
+    # 유저 1   1   1   2
+    # 유저 2   0   1   1
+    users = np.array([0, 0, 1, 1, 1, 1, 2, 2])
+    musics = np.array([10, 20, 10, 20, 30, 30, 20, 30])
+    weights = np.ones(8)
+
+    def test_cosine_order_and_scores(self):
+        music_ids, neighbor_ids, ranks, scores = build_neighbors(self.users, self.musics, self.weights)
+        # 크기^2: 10 -> 2, 20 -> 3, 30 -> 5 / 내적: (10, 20) 2, (10, 30) 2, (20, 30) 3
+        self.assertEqual(music_ids.tolist(), [10, 10, 20, 20, 30, 30])
+        self.assertEqual(neighbor_ids.tolist(), [20, 30, 10, 30, 20, 10])
+        self.assertEqual(ranks.tolist(), [1, 2, 1, 2, 1, 2])
+        np.testing.assert_allclose(scores, [
+            2 / np.sqrt(6), 2 / np.sqrt(10),
+            2 / np.sqrt(6), 3 / np.sqrt(15),
+            3 / np.sqrt(15), 2 / np.sqrt(10),
+        ])
+
+    def test_top_k(self):
+        music_ids, neighbor_ids, ranks, _ = build_neighbors(self.users, self.musics, self.weights, top_k=1)
+        self.assertEqual(list(zip(music_ids.tolist(), neighbor_ids.tolist())), [(10, 20), (20, 10), (30, 20)])
+        self.assertEqual(ranks.tolist(), [1, 1, 1])
+
+    def test_no_shared_users(self):
+        music_ids, *_ = build_neighbors(np.array([0, 1]), np.array([10, 20]), np.ones(2))
+        self.assertEqual(len(music_ids), 0)
@@ -1,7 +1,3 @@
-import math
-import random
-from django.db.models import Sum, Count, Q
-from django.db.models.functions import Coalesce
 from rest_framework.decorators import api_view
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import permission_classes, authentication_classes
@@ -14,9 +10,14 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from apps.twobeats_upload.models import Music
-from apps.twobeats_music_explore.models import MusicLike
+from apps.twobeats_upload.sampling import sample
+from apps.twobeats_upload.tag_index import music_tags
 from apps.twobeats_account.models import MusicPlaylist, PlaylistTrack
-from .models import WorldCupGame, WorldCupResult, CustomWorldCup
+from .models import WorldCupGame, WorldCupResult, CustomWorldCup, WorldCupLeaderboard
+from .candidates import select_candidates
+from .leaderboard import LEADERBOARD_ORDERING, record_game
+from .pools import pool_refresher, take_pool
+from .recommender import neighbors
 from .serializers import CandidateSerializer, WorldCupSaveSerializer
 
 User = get_user_model()
@@ -37,67 +38,21 @@ def get_candidates(request):
     sort_mode = request.query_params.get('sort', 'random')
     custom_code = request.query_params.get('custom_code')
 
+    # 자주 쓰이는 대진은 미리 뽑아 둔 풀에서 바로 반환 (pools.py 참고)
+    pooled = take_pool(genre, count, sort_mode, custom_code)
+    if pooled is not None:
+        return Response({'candidates': pooled})
+
     # 기본 쿼리셋
     if custom_code:
         # 커스텀 월드컵인 경우 해당 곡들만 후보로 설정
         custom_wc = get_object_or_404(CustomWorldCup, access_code=custom_code)
-        base_musics = custom_wc.musics.all()
+        custom_musics = custom_wc.musics.all()
     else:
         # 일반 모드
-        base_musics = Music.objects.all()
+        custom_musics = None
 
-    # ---------------------------------------------------------
-    # CASE A: 랭킹 모드 (인기곡 대결)
-    # ---------------------------------------------------------
-    if sort_mode == 'rank':
-        
-        # A-1. 전체 장르 통합 랭킹 (장르별 쿼터제 적용)
-        if genre == 'all':
-            candidates_list = []
-            
-            # 1. 모든 장르 목록 가져오기 ['ballad', 'dance', ...]
-            all_genres = [choice[0] for choice in Music.GENRE_CHOICES]
-            
-            # 2. 장르별 할당량 계산 (예: 16강 / 11개 장르 = 장르당 약 2곡)
-            quota_per_genre = math.ceil(count / len(all_genres))
-            
-            # 3. 각 장르별로 1등곡들을 수집
-            for g in all_genres:
-                top_songs = base_musics.filter(music_type=g).annotate(
-                    total_score=Coalesce(Sum('worldcupresult__wc_score'), 0)
-                ).order_by('-total_score')[:quota_per_genre]
-                
-                candidates_list.extend(top_songs)
-            
-            # 4. 중복 제거 및 셔플 (장르 순서 섞기)
-            # (쿼터제로 뽑다보면 count보다 많이 뽑힐 수 있으므로 셔플 후 자름)
-            candidates_list = list(set(candidates_list)) # 중복제거
-            random.shuffle(candidates_list)
-            candidates = candidates_list[:count]
-            
-            # 5. 부족분 채우기 (만약 장르별 곡이 없어서 16개가 안 되면 랜덤으로 채움)
-            if len(candidates) < count:
-                needed = count - len(candidates)
-                existing_ids = [m.id for m in candidates]
-                
-                extras = list(base_musics.exclude(id__in=existing_ids).order_by('?')[:needed])
-                candidates.extend(extras)
-
-        # A-2. 특정 장르 내 랭킹 (기존 로직 유지)
-        else:
-            top_candidates = base_musics.filter(music_type=genre).annotate(
-                total_score=Coalesce(Sum('worldcupresult__wc_score'), 0)
-            ).order_by('-total_score')[:count]
-            candidates = list(top_candidates)
-            random.shuffle(candidates)
-
-    # ---------------------------------------------------------
-    # CASE B: 랜덤 모드 (기존 로직)
-    # ---------------------------------------------------------
-    else:
-        if genre and genre != 'all':
-            base_musics = base_musics.filter(music_type=genre)
-        candidates = base_musics.order_by('?')[:count]
+    candidates = select_candidates(genre, count, sort_mode, custom_musics)
 
     # ---------------------------------------------------------
     # 공통: 최종 검증 및 반환
@@ -110,6 +65,7 @@ def get_candidates(request):
         )
 
     serializer = CandidateSerializer(candidates, many=True)
+    pool_refresher.request(genre, count, sort_mode, custom_code)
     return Response({'candidates': serializer.data})
 
 
@@ -164,6 +120,9 @@ def save_game_result(request):
             # 한 번에 저장 (Bulk Insert) - 속도 빠름
             WorldCupResult.objects.bulk_create(results_to_create)
 
+            # 랭킹 집계 테이블도 같은 트랜잭션에서 반영
+            record_game(results_to_create)
+
             return Response(
                 {'message': '저장 완료', 'game_id': game.pk}, 
                 status=status.HTTP_201_CREATED
@@ -223,11 +182,8 @@ def ranking_page(request):
     # 1. 파라미터 받기
     selected_genre = request.GET.get('genre', 'all')
     
-    # 2. 기본 쿼리셋 (점수 계산)
-    rankings = Music.objects.annotate(
-        total_score=Coalesce(Sum('worldcupresult__wc_score'), 0),
-        win_count=Count('worldcupresult', filter=Q(worldcupresult__wc_final_rank=1))
-    ).filter(
+    # 2. 랭킹 집계 테이블에서 읽기 (leaderboard.py 참고)
+    rankings = WorldCupLeaderboard.objects.select_related('music').filter(
         total_score__gt=0 # 0점 제외
     )
 
@@ -236,7 +192,7 @@ def ranking_page(request):
         rankings = rankings.filter(music_type=selected_genre)
 
     # 4. 정렬 (점수 > 우승횟수 > 최신순)
-    rankings = rankings.order_by('-total_score', '-win_count', '-music_created_at')[:100]
+    rankings = rankings.order_by(*LEADERBOARD_ORDERING)[:100]
 
     # 5. 템플릿에 보낼 데이터
     context = {
@@ -249,17 +205,13 @@ def ranking_page(request):
 
 def wc_popular(request):
     """인기 차트 (월드컵점수기준)"""
-    wc_musics = Music.objects.annotate(
-        total_score=Coalesce(Sum('worldcupresult__wc_score'), 0)
-    ).exclude(
+    chart_data = WorldCupLeaderboard.objects.select_related('music').exclude(
         total_score=0 #0점은 순위 제외
-    ).order_by(
-        '-total_score',
-        '-music_created_at'
-    )[:50]
+    ).order_by(*LEADERBOARD_ORDERING)[:50]
     
     context = {
-        'musics': wc_musics,
+        'chart_data': chart_data,
+        'musics': [item.music for item in chart_data],
         'chart_type': 'wc_popular',
         'chart_title': 'worldcup 상위 차트',
     }
@@ -280,17 +232,14 @@ def result_page(request, game_id):
     winner = results.first()
     others = results[1:]
     
-    # 현재 로그인한 유저라면 ID를 넘겨서 본인을 제외시킴
-    current_user_id = game.wc_user.pk if game.wc_user else None
-    
-    # 협업 필터링 추천
-    recommendations = get_collaborative_recommendations(winner.wc_music.id, current_user_id)
+    # 협업 필터링 추천 (매일 미리 계산해 둔 곡-곡 이웃, recommender.py 참고)
+    recommendations = neighbors(winner.wc_music_id, 5)
     
     # 만약 협업 필터링 결과가 없으면(데이터 부족), 장르 기반 추천으로 대체 (Fail-over)
-    if not recommendations.exists():
-        recommendations = Music.objects.filter(
+    if not recommendations:
+        recommendations = sample(Music.objects.filter(
             music_type=winner.wc_music.music_type
-        ).exclude(id=winner.wc_music.id).order_by('?')[:5]
+        ).exclude(id=winner.wc_music.id), 5)
 
     context = {
         'game': game,
@@ -354,78 +303,8 @@ def recommend_by_tags(request, game_id):
     winner_result = game.results.filter(wc_final_rank=1).first()
     winner_music = winner_result.wc_music
 
-    # 우승곡의 태그들
-    winner_tags = winner_music.tags.all()
-
     # 같은 장르이면서 태그가 겹치는 곡 찾기 (우승곡 제외)
-    recommendations = Music.objects.filter(music_type=winner_music.music_type) \
-        .exclude(id=winner_music.id) \
-        .filter(tags__in=winner_tags) \
-        .annotate(common_tags=Count('tags')) \
-        .order_by('-common_tags', '-music_like_count')[:5]
+    # 태그 Jaccard 유사도 순, 같으면 좋아요 많은 순 (메모리 비트셋 인덱스, tag_index.py 참고)
+    recommendations = music_tags.similar_objects(winner_music.id, 5, same_genre=True)
 
     return render(request, 'twobeats_worldcup/recommend.html', {'musics': recommendations})
-
-
-def get_collaborative_recommendations(winner_music_id, user_id=None):
-    """
-    협업 필터링 추천 알고리즘
-    :param winner_music_id: 현재 월드컵 우승곡 ID
-    :param user_id: 현재 플레이한 유저 ID (본인 제외용, 없으면 None)
-    :return: 추천된 Music QuerySet (최대 5개)
-    """
-    
-    # 1. [동질 집단 찾기] 
-    # 이 노래(winner_music_id)를 '우승(rank=1)'시킨 다른 게임의 유저 ID들을 찾음
-    # (익명 유저(None)는 추적이 불가능하므로 제외)
-    similar_users = WorldCupResult.objects.filter(
-        wc_music_id=winner_music_id,
-        wc_final_rank=1,
-        wc_game__wc_user__isnull=False  # 로그인 유저만
-    ).exclude(
-        wc_game__wc_user_id=user_id     # 나 자신은 제외
-    ).values_list('wc_game__wc_user', flat=True).distinct()
-
-    # 데이터가 너무 적으면 빈 결과 반환 (혹은 랜덤/장르 추천으로 대체)
-    if not similar_users:
-        return Music.objects.none()
-
-    # 2. [선호 곡 수집 & 랭킹]
-    # 나와 취향이 비슷한 유저들(similar_users)이 좋아하는 다른 곡 찾기
-    
-    # 방식 A: 그들이 '좋아요(MusicLike)'를 누른 곡들
-    # 방식 B: 그들이 '다른 월드컵에서 우승(WorldCupResult)'시킨 곡들
-    # -> 여기서는 두 가지를 합쳐서 카운트해 봅니다.
-    
-    # A. 좋아요 누른 곡 ID
-    liked_music_ids = MusicLike.objects.filter(
-        user__in=similar_users
-    ).values_list('music_id', flat=True)
-    
-    # B. 다른 월드컵 우승 곡 ID
-    won_music_ids = WorldCupResult.objects.filter(
-        wc_game__wc_user__in=similar_users,
-        wc_final_rank=1
-    ).values_list('wc_music_id', flat=True)
-
-    # 3. [집계 및 정렬]
-    # 위 ID들을 모아서 가장 많이 언급된 곡 찾기
-    # (현재 우승곡 자체는 추천에서 제외)
-    all_related_music_ids = list(liked_music_ids) + list(won_music_ids)
-    
-    # Music 모델에서 해당 ID들을 필터링하고, 등장 횟수(frequency)로 정렬
-    # 꼼수: id__in으로 필터링 후 annotate로 점수 매기기가 복잡하므로,
-    # 파이썬 레벨에서 Counter를 쓰거나, DB 쿼리를 최적화할 수 있습니다.
-    
-    # DB 쿼리 최적화 방식:
-    recommendations = Music.objects.filter(
-        id__in=all_related_music_ids
-    ).exclude(
-        id=winner_music_id  # 방금 우승한 곡은 추천 제외
-    ).annotate(
-        # 좋아요나 우승 기록에 이 곡이 몇 번 등장했는지 카운트
-        popularity=Count('musiclike', filter=Q(musiclike__user__in=similar_users)) + 
-                   Count('worldcupresult', filter=Q(worldcupresult__wc_game__wc_user__in=similar_users, worldcupresult__wc_final_rank=1))
-    ).order_by('-popularity')[:5]  # 상위 5개
-
-    return recommendations
\ No newline at end of file
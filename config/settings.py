@@ -174,3 +174,48 @@ AUTH_USER_MODEL = 'twobeats_account.User'
 LOGIN_URL = '/account/login/'
 LOGIN_REDIRECT_URL = '/home/'
 LOGOUT_REDIRECT_URL = '/account/login/'
+
+# 재생수/조회수 write-behind 버퍼 반영 주기(초), 0이면 즉시 반영
+PLAY_COUNTER_FLUSH_INTERVAL = int(os.environ.get('PLAY_COUNTER_FLUSH_INTERVAL', 5))
+
+# 재생 기록(히스토리) 보관 기간(개월), manage_history_partitions 가 이보다 오래된 월 파티션을 정리
+HISTORY_RETENTION_MONTHS = int(os.environ.get('HISTORY_RETENTION_MONTHS', 12))
+
+# 재생/조회 중복 집계 방지 (dedup.py): 블룸 필터 구간 길이(초), 방문자당 필터 크기(비트)
+PLAY_DEDUP_WINDOW = int(os.environ.get('PLAY_DEDUP_WINDOW', 60 * 60 * 6))
+PLAY_DEDUP_BITS = int(os.environ.get('PLAY_DEDUP_BITS', 8192))
+
+# 월드컵 후보곡 풀 (pools.py): 대진별로 쌓아 둘 풀 수, 풀 유지 시간(초), 꺼낸 풀 다시 채우는 주기(초, 0이면 즉시)
+WC_POOL_SIZE = int(os.environ.get('WC_POOL_SIZE', 4))
+WC_POOL_TTL = int(os.environ.get('WC_POOL_TTL', 60 * 10))
+WC_POOL_REFILL_INTERVAL = int(os.environ.get('WC_POOL_REFILL_INTERVAL', 1))
+
+# 캐시 (cache_tier.py): 값은 공유 캐시에 두고, 읽기 위주 키 계열만 워커 메모리(L1)에 몇 초 더 둠
+# CACHE_URL: redis://host:6379/0, db://테이블명, file:///경로, locmem:// (기본, 워커마다 따로)
+# locmem 은 워커마다 따로라 gunicorn 워커가 여럿(WEB_CONCURRENCY > 1)이면 시작 시 오류 (config/wsgi.py)
+CACHE_URL = os.environ.get('CACHE_URL', 'locmem://')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}
+elif CACHE_URL.startswith('db://'):
+    # python manage.py createcachetable 로 테이블 생성
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': CACHE_URL[len('db://'):]}
+elif CACHE_URL.startswith('file://'):
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': CACHE_URL[len('file://'):]}
+else:
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'apps.twobeats_upload.cache_tier.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'L1_FAMILIES': ['top_videos', 'facets'],
+            'L1_TIMEOUT': int(os.environ.get('CACHE_L1_TIMEOUT', 5)),
+            'L1_MAX_ENTRIES': int(os.environ.get('CACHE_L1_MAX_ENTRIES', 1000)),
+        },
+    },
+    'shared': SHARED_CACHE,
+}
+
+# 계열별 캐시 적중/미스 횟수를 공유 캐시에 합산하는 주기(초), 0이면 조회마다 바로 합산 (개발용)
+CACHE_METRICS_FLUSH_INTERVAL = int(os.environ.get('CACHE_METRICS_FLUSH_INTERVAL', 30))
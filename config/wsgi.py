@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# 워커가 여럿인데 공유 캐시가 워커 메모리(locmem)면 시작하지 않음 (apps/twobeats_upload/cache_tier.py)
+from apps.twobeats_upload.cache_tier import check_shared_cache  # noqa: E402
+
+check_shared_cache()
+
+# 워커 시작 시 검색 자동완성 인덱스 미리 적재 (apps/twobeats_upload/autocomplete.py)
+from apps.twobeats_upload.autocomplete import warm_up  # noqa: E402
+
+warm_up()